@@ -1,24 +1,183 @@
 import json
+import os
+import tempfile
+import threading
 from pathlib import Path
+from data.system.log.log import logger
+
+CONFIG_PATH = Path(__file__).parent.parent.parent / 'config.json'
+# 旧版 config_management 使用的配置文件，首次加载时合并进统一配置
+LEGACY_CONFIG_PATH = Path(__file__).parent / 'config.json'
+# 配置修改后延迟写盘的时间（秒），连续修改只写一次
+SAVE_DELAY = 0.5
+
+# 配置项及其默认值，值的类型即配置项的类型
+DEFAULT_CONFIG = {
+    "sub_group_ratio": 20,
+    "window_width": 700,
+    "window_height": 700,
+    "content_dedup": False,
+    "prefetch_enabled": False,
+    "prefetch_delay_ms": 3000,
+    "prefetch_top_n": 10,
+    "prefetch_io_budget_mb": 256,
+    "launch_concurrency": 3,
+    "launch_stagger_ms": 500,
+    "health_check_interval_min": 0,
+    "catalog_poll_interval_ms": 2000,
+    "saved_tag_queries": [],
+    "undo_history_size": 50
+}
+
+class Config:
+    """
+    统一的配置对象
+    只在创建时从磁盘读取一次，之后所有读取都走内存；
+    修改配置时通知订阅者，并延迟、原子地写回配置文件
+    """
+
+    def __init__(self, path=CONFIG_PATH):
+        self.path = Path(path)
+        self._values = dict(DEFAULT_CONFIG)
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._save_timer = None
+        self._load()
+
+    def _load(self):
+        """
+        从配置文件加载配置，文件不存在时写入默认配置
+        文件无法解析或内容不是 JSON 对象时记录日志并忽略该文件，使用默认配置
+        """
+        stored = {}
+        for path in (LEGACY_CONFIG_PATH, self.path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+            except FileNotFoundError:
+                continue
+            except ValueError as e:
+                logger.error(f"从 {path} 加载配置时出错: {e}")
+                continue
+            if not isinstance(loaded, dict):
+                logger.error(f"{path} 中的配置不是 JSON 对象，使用默认配置")
+                continue
+            stored.update(loaded)
+        for key, value in stored.items():
+            self._values[key] = self._coerce(key, value)
+        if not self.path.exists():
+            self.flush()
+
+    def _coerce(self, key, value):
+        """
+        按默认值的类型转换配置值，转换失败时使用默认值
+        """
+        if key not in DEFAULT_CONFIG:
+            return value
+        value_type = type(DEFAULT_CONFIG[key])
+        if isinstance(value, value_type):
+            return value
+        try:
+            return value_type(value)
+        except (TypeError, ValueError):
+            return DEFAULT_CONFIG[key]
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __repr__(self):
+        return repr(self._values)
+
+    def as_dict(self):
+        return dict(self._values)
+
+    def set(self, key, value):
+        """
+        修改配置项，值有变化时通知订阅者并安排写盘
+        """
+        self.update({key: value})
+
+    def update(self, values):
+        """
+        批量修改配置项，全部写入后再通知订阅者，订阅者读到的总是修改后的完整配置
+        """
+        changed = []
+        for key, value in values.items():
+            value = self._coerce(key, value)
+            if self._values.get(key) != value:
+                self._values[key] = value
+                changed.append(key)
+        if not changed:
+            return
+        notified = set()
+        for key in changed:
+            for callback in list(self._subscribers.get(key, [])):
+                # 同一个回调订阅了多个配置项时只通知一次
+                if callback not in notified:
+                    notified.add(callback)
+                    callback(self._values[key])
+        self.schedule_save()
+
+    def subscribe(self, key, callback):
+        """
+        订阅配置项的变化，配置项修改后以新值调用 callback
+        """
+        self._subscribers.setdefault(key, []).append(callback)
+
+    def unsubscribe(self, key, callback):
+        if callback in self._subscribers.get(key, []):
+            self._subscribers[key].remove(callback)
+
+    def schedule_save(self):
+        """
+        延迟写盘，SAVE_DELAY 内的多次修改合并为一次写入
+        """
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """
+        立即将配置写入临时文件后替换配置文件，避免写到一半的文件
+        """
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            values = dict(self._values)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix='.config.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(values, f, indent=4)
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+_config = None
 
 def load_config():
     """
-    加载配置文件
-    
+    加载配置
+
     返回:
-        dict: 包含配置信息的字典，若文件不存在返回默认配置
+        Config: 进程内唯一的配置对象，首次调用时从文件加载，之后直接返回缓存
     """
-    config_path = Path(__file__).parent.parent.parent / 'config.json'
-    default_config = {
-        "sub_group_ratio": 20,
-        "window_width": 700,
-        "window_height": 700
-    }
-    
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(default_config, f, indent=4)
-        return default_config
\ No newline at end of file
+    global _config
+    if _config is None:
+        _config = Config()
+    return _config
@@ -2,13 +2,19 @@ import logging
 import os
 from datetime import datetime
 
+def get_log_dir():
+    """
+    返回日志目录（项目 data/data/log/ 目录）
+    """
+    # 修正日志目录路径为项目data/log/目录
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'log')
+
 def setup_logger():
     """
     配置日志记录器，实现按日期保存日志，并将日志输出到控制台和文件
     """
     # 创建日志目录
-    # 修正日志目录路径为项目data/log/目录
-    log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'log')
+    log_dir = get_log_dir()
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
@@ -0,0 +1,207 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from data.system.log.log import logger
+from data.system.tool.data_persistence import save_data
+from data.system.tool.catalog_sync import move_record
+from data.system.tool.file_entry import make_file_entry
+
+IMPORT_INDEX_FILE_PATH = 'data/save/import_index.json'
+# 导入的条目放在这个主分组下，子分组按分类（.desktop）或开始菜单文件夹（.lnk）划分
+IMPORT_MAIN_GROUP_NAME = "系统应用"
+DEFAULT_SUB_GROUP_NAME = "其他"
+
+def get_application_dirs():
+    """
+    返回当前系统上存在的应用程序入口目录
+    """
+    dirs = []
+    if os.name == 'nt':
+        for base in (os.environ.get('ProgramData'), os.environ.get('APPDATA')):
+            if base:
+                dirs.append(os.path.join(base, 'Microsoft', 'Windows', 'Start Menu', 'Programs'))
+    else:
+        data_home = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
+        data_dirs = os.environ.get('XDG_DATA_DIRS', '/usr/local/share:/usr/share').split(':')
+        for base in [data_home] + data_dirs + ['/var/lib/flatpak/exports/share']:
+            if base:
+                dirs.append(os.path.join(base, 'applications'))
+    # 去重并保留顺序
+    seen = set()
+    return [d for d in dirs if os.path.isdir(d) and not (d in seen or seen.add(d))]
+
+def read_desktop_entry(file_path):
+    """
+    逐行解析 .desktop 文件的 [Desktop Entry] 段，读到下一段即停止，返回 {键: 值}（只取未本地化的键）
+    """
+    entry = {}
+    in_entry = False
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('['):
+                if in_entry:
+                    break
+                in_entry = line == '[Desktop Entry]'
+                continue
+            if in_entry and '=' in line:
+                key, value = line.split('=', 1)
+                # 只取未本地化的键
+                if '[' not in key:
+                    entry[key.strip()] = value.strip()
+    return entry
+
+def parse_desktop_file(file_path):
+    """
+    解析 .desktop 文件，返回条目信息字典，不是可显示的应用时返回 None
+    """
+    entry = read_desktop_entry(file_path)
+    if entry.get('Type') != 'Application' or entry.get('NoDisplay') == 'true' or entry.get('Hidden') == 'true':
+        return None
+    categories = [c for c in entry.get('Categories', '').split(';') if c]
+    return {
+        "name": entry.get('Name') or os.path.splitext(os.path.basename(file_path))[0],
+        "category": categories[0] if categories else DEFAULT_SUB_GROUP_NAME
+    }
+
+def scan_application_dir(app_dir, known_mtimes):
+    """
+    扫描一个应用程序入口目录
+    返回 (当前存在的入口文件 {路径: 修改时间}, 需要新增或更新的条目列表, 不再是可显示应用的入口文件路径列表)
+    修改时间与上次导入一致的文件不再解析；修改后变为隐藏、不是应用或无法解析的入口放入第三个列表
+    """
+    current = {}
+    changed = []
+    dropped = []
+    for root, _, files in os.walk(app_dir):
+        for file_name in files:
+            ext = os.path.splitext(file_name)[1].lower()
+            if ext not in ('.desktop', '.lnk'):
+                continue
+            file_path = os.path.join(root, file_name).replace('\\', '/')
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            current[file_path] = stat.st_mtime_ns
+            if known_mtimes.get(file_path) == stat.st_mtime_ns:
+                continue
+            try:
+                if ext == '.desktop':
+                    info = parse_desktop_file(file_path)
+                    if info is None:
+                        dropped.append(file_path)
+                        continue
+                else:
+                    # 开始菜单快捷方式按所在文件夹分组
+                    folder = os.path.relpath(root, app_dir)
+                    info = {
+                        "name": os.path.splitext(file_name)[0],
+                        "category": DEFAULT_SUB_GROUP_NAME if folder == '.' else folder.split(os.sep)[0]
+                    }
+            except Exception as e:
+                logger.warning(f"解析应用入口 {file_path} 时出错: {e}")
+                dropped.append(file_path)
+                continue
+            info["path"] = file_path
+            info["size"] = stat.st_size
+            changed.append(info)
+    return current, changed, dropped
+
+def load_import_index():
+    """
+    加载上次导入时记录的入口文件修改时间
+    """
+    try:
+        if os.path.exists(IMPORT_INDEX_FILE_PATH):
+            with open(IMPORT_INDEX_FILE_PATH, 'r', encoding='utf-8') as file:
+                return json.load(file)
+    except Exception as e:
+        logger.error(f"从 {IMPORT_INDEX_FILE_PATH} 加载导入索引时出错: {e}")
+    return {}
+
+def save_import_index(index):
+    try:
+        if not os.path.exists(os.path.dirname(IMPORT_INDEX_FILE_PATH)):
+            os.makedirs(os.path.dirname(IMPORT_INDEX_FILE_PATH))
+        with open(IMPORT_INDEX_FILE_PATH, 'w', encoding='utf-8') as file:
+            json.dump(index, file, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"将导入索引保存到 {IMPORT_INDEX_FILE_PATH} 时出错: {e}")
+
+def import_system_applications(data, app_dirs=None):
+    """
+    并行扫描系统应用程序入口目录，增量导入到“系统应用”主分组
+    只处理修改时间变化或目录中没有对应条目的入口文件，按本次扫描结果同步已导入的条目：
+    删除已不存在、变为隐藏或无法解析的入口，分类变化的条目移动到新分类的子分组，最后一次性保存数据
+    返回 (新增数, 更新数, 删除数)，移动计入更新数
+    """
+    app_dirs = app_dirs if app_dirs is not None else get_application_dirs()
+    logger.info(f"开始导入系统应用，扫描目录: {app_dirs}")
+    main_group = next((g for g in data["mainGroups"] if g["name"] == IMPORT_MAIN_GROUP_NAME), None)
+    if main_group is None:
+        new_id = max((g["id"] for g in data["mainGroups"]), default=0) + 1
+        main_group = {"id": new_id, "name": IMPORT_MAIN_GROUP_NAME, "subGroups": []}
+        data["mainGroups"].append(main_group)
+
+    # 路径 -> (子分组, 文件条目)，用于定位已导入的条目
+    imported = {}
+    for sub_group in main_group["subGroups"]:
+        for file in sub_group["files"]:
+            imported[file["path"]] = (sub_group, file)
+
+    # 只有目录中仍有对应条目的入口文件才按修改时间跳过，被删除的条目在重新导入时恢复
+    known_mtimes = {path: mtime for path, mtime in load_import_index().items() if path in imported}
+    current = {}
+    changed = []
+    dropped = []
+    with ThreadPoolExecutor(max_workers=max(1, len(app_dirs))) as executor:
+        for dir_current, dir_changed, dir_dropped in executor.map(lambda d: scan_application_dir(d, known_mtimes), app_dirs):
+            current.update(dir_current)
+            changed.extend(dir_changed)
+            dropped.extend(dir_dropped)
+
+    # 每个子分组的下一个文件 ID，避免每次添加都重新计算最大值
+    next_file_ids = {id(s): max((f["id"] for f in s["files"]), default=0) + 1 for s in main_group["subGroups"]}
+    added = updated = removed = 0
+    for info in changed:
+        sub_group = next((s for s in main_group["subGroups"] if s["name"] == info["category"]), None)
+        if sub_group is None:
+            new_id = max((s["id"] for s in main_group["subGroups"]), default=0) + 1
+            sub_group = {"id": new_id, "name": info["category"], "files": []}
+            main_group["subGroups"].append(sub_group)
+            next_file_ids[id(sub_group)] = 1
+        if info["path"] in imported:
+            old_sub_group, file = imported[info["path"]]
+            file["name"] = info["name"]
+            file["size"] = info["size"]
+            if old_sub_group is not sub_group:
+                # 分类变化，移动到新分类的子分组末尾，ID 冲突时重新编号
+                move, _ = move_record(data, ("f", main_group["id"], old_sub_group["id"], file["id"]),
+                                      (main_group["id"], sub_group["id"]), len(sub_group["files"]))
+                next_file_ids[id(sub_group)] = max(next_file_ids[id(sub_group)], move["to"][-1] + 1)
+                imported[info["path"]] = (sub_group, file)
+            updated += 1
+            continue
+        new_file = make_file_entry(next_file_ids[id(sub_group)], info["name"], info["size"], info["path"])
+        sub_group["files"].append(new_file)
+        next_file_ids[id(sub_group)] += 1
+        imported[info["path"]] = (sub_group, new_file)
+        added += 1
+
+    # 删除上次导入过、但入口文件已不存在或不再是可显示应用的条目
+    for path in (set(known_mtimes) - set(current)) | set(dropped):
+        if path in imported:
+            sub_group, file = imported[path]
+            sub_group["files"].remove(file)
+            del imported[path]
+            removed += 1
+
+    if added or updated or removed:
+        save_data(data)
+    # 索引只记录目录中存在的条目
+    save_import_index({path: mtime for path, mtime in current.items() if path in imported})
+    logger.info(f"系统应用导入完成：新增 {added} 个，更新 {updated} 个，删除 {removed} 个")
+    return added, updated, removed
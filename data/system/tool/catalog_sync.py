@@ -0,0 +1,315 @@
+import os
+from contextlib import contextmanager
+from data.system.log.log import logger
+from data.system.tool.order_keys import assign_order_keys, key_between, sort_by_order
+
+@contextmanager
+def file_lock(lock_path):
+    """
+    跨进程的建议性文件锁，Windows 使用 msvcrt.locking，其他平台使用 fcntl.flock
+    """
+    lock_dir = os.path.dirname(lock_path)
+    if lock_dir and not os.path.exists(lock_dir):
+        os.makedirs(lock_dir)
+    with open(lock_path, 'a+b') as lock_file:
+        if os.name == 'nt':
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def file_stamp(path):
+    """
+    返回文件的 (修改时间, 大小, inode)，用于低成本判断文件是否被其他进程改写
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+def _fingerprint(kind, record):
+    if kind == "f":
+        return (record["name"], record["size"], record["path"], tuple(record.get("tags") or ()), record.get("order"))
+    return (record["name"], record.get("order"))
+
+def record_map(data):
+    """
+    把目录数据展开为 {记录键: 记录}
+    主分组键为 ("m", 主分组ID)，子分组键为 ("s", 主分组ID, 子分组ID)，文件键为 ("f", 主分组ID, 子分组ID, 文件ID)
+    """
+    records = {}
+    for main_group in data.get("mainGroups", []):
+        main_key = ("m", main_group["id"])
+        records[main_key] = main_group
+        for sub_group in main_group["subGroups"]:
+            sub_key = ("s", main_group["id"], sub_group["id"])
+            records[sub_key] = sub_group
+            for file in sub_group["files"]:
+                records[("f",) + sub_key[1:] + (file["id"],)] = file
+    return records
+
+def fingerprints(data):
+    """
+    返回 {记录键: 记录内容指纹}，不包含子记录和版本号
+    """
+    return {key: _fingerprint(key[0], record) for key, record in record_map(data).items()}
+
+def _record_rev(record):
+    rev = record.get("rev") if hasattr(record, "get") else None
+    return rev or 0
+
+def _children(data, key):
+    """
+    返回记录键所在的同级列表，父记录不存在时返回 None
+    """
+    if key[0] == "m":
+        return data["mainGroups"]
+    main_group = next((g for g in data["mainGroups"] if g["id"] == key[1]), None)
+    if main_group is None:
+        return None
+    if key[0] == "s":
+        return main_group["subGroups"]
+    sub_group = next((s for s in main_group["subGroups"] if s["id"] == key[2]), None)
+    return None if sub_group is None else sub_group["files"]
+
+def _shell(kind, record):
+    """
+    复制记录本身，不复制子记录（子记录作为独立的记录合并）
+    """
+    if kind == "m":
+        shell = {k: v for k, v in record.items() if k != "subGroups"}
+        shell["subGroups"] = []
+        return shell
+    if kind == "s":
+        shell = {k: v for k, v in record.items() if k != "files"}
+        shell["files"] = []
+        return shell
+    return record
+
+def _apply_fields(kind, local, remote):
+    local["name"] = remote["name"]
+    if kind == "f":
+        local["size"] = remote["size"]
+        local["path"] = remote["path"]
+        local["tags"] = remote.get("tags") or []
+    if remote.get("order") is not None:
+        local["order"] = remote["order"]
+    if _record_rev(remote):
+        local["rev"] = _record_rev(remote)
+
+def merge_external_changes(data, disk_data, baseline, base_generation):
+    """
+    把其他进程写入的修改合并进内存中的目录数据（原地修改 data）
+    baseline 为上次同步时的记录指纹，base_generation 为上次同步时的代数；
+    只处理磁盘上版本号比 base_generation 新（或指纹与 baseline 不同）的记录，
+    双方都修改的记录以本进程为准，双方新增了相同 ID 的记录时给本进程的记录重新编号
+    返回合并进来的记录数
+    """
+    disk_records = record_map(disk_data)
+    # 带版本号的记录只比较版本号，旧版本写入的无版本号记录才比较指纹
+    remote_changed = [
+        key for key, record in disk_records.items()
+        if (_record_rev(record) > base_generation if _record_rev(record) else baseline.get(key) != _fingerprint(key[0], record))
+    ]
+    remote_deleted = set(baseline) - set(disk_records)
+
+    # 双方新增了相同 ID 的不同记录：给本进程的记录分配新 ID
+    local_records = record_map(data)
+    for key in sorted(remote_changed, key=len):
+        if key in local_records and key not in baseline and \
+                _fingerprint(key[0], local_records[key]) != _fingerprint(key[0], disk_records[key]):
+            siblings = _children(data, key)
+            disk_siblings = _children(disk_data, key) or []
+            new_id = max([r["id"] for r in siblings] + [r["id"] for r in disk_siblings]) + 1
+            logger.warning(f"记录 {key} 与其他进程新增的记录 ID 冲突，重新编号为 {new_id}")
+            local_records[key]["id"] = new_id
+            local_records = record_map(data)
+
+    local_changed = {key for key, record in local_records.items() if baseline.get(key) != _fingerprint(key[0], record)}
+    local_deleted = set(baseline) - set(local_records)
+    merged = 0
+    # 合并进来的记录可能改变了排序键，结束后按排序键重新排列这些同级列表
+    touched = []
+
+    # 先处理上级记录再处理下级记录，保证插入子记录时父记录已存在
+    for key in sorted(remote_changed, key=len):
+        if key in local_deleted:
+            logger.warning(f"记录 {key} 已在本进程删除，忽略其他进程的修改")
+            continue
+        if key in local_changed and key in local_records:
+            if _fingerprint(key[0], local_records[key]) != _fingerprint(key[0], disk_records[key]):
+                logger.warning(f"记录 {key} 同时被多个进程修改，保留本进程的修改")
+            continue
+        siblings = _children(data, key)
+        if siblings is None:
+            continue
+        if key in local_records:
+            _apply_fields(key[0], local_records[key], disk_records[key])
+        else:
+            siblings.append(_shell(key[0], disk_records[key]))
+        touched.append(siblings)
+        merged += 1
+
+    for key in sorted(remote_deleted, key=len, reverse=True):
+        if key in local_changed or key not in local_records:
+            continue
+        siblings = _children(data, key) or []
+        for index, record in enumerate(siblings):
+            if record is local_records[key]:
+                del siblings[index]
+                merged += 1
+                break
+    for siblings in {id(siblings): siblings for siblings in touched}.values():
+        sort_by_order(siblings)
+    return merged
+
+def stamp_local_changes(data, baseline, generation):
+    """
+    给相对 baseline 有变化的记录写入新的版本号
+    """
+    for key, record in record_map(data).items():
+        if baseline.get(key) != _fingerprint(key[0], record):
+            record["rev"] = generation
+
+def find_record(data, key):
+    """
+    返回 (同级列表, 记录)，记录不存在时记录为 None，父记录也不存在时同级列表为 None
+    """
+    siblings = _children(data, key)
+    if siblings is None:
+        return None, None
+    for record in siblings:
+        if record["id"] == key[-1]:
+            return siblings, record
+    return siblings, None
+
+def apply_move(data, move):
+    """
+    应用一条移动记录 {"from": 原记录键, "to": 新记录键, "order": 新排序键}
+    记录已在目标位置时只更新排序键，因此重复应用同一条移动记录是安全的；
+    返回是否找到并移动了记录
+    """
+    source = tuple(move["from"])
+    target = tuple(move["to"])
+    target_siblings = _children(data, target)
+    if target_siblings is None:
+        return False
+    source_siblings, record = find_record(data, source)
+    if record is not None:
+        source_siblings.remove(record)
+    else:
+        _, record = find_record(data, target)
+        if record is None:
+            return False
+        target_siblings.remove(record)
+    record["id"] = target[-1]
+    record["order"] = move["order"]
+    _insert_by_order(target_siblings, record)
+    return True
+
+def _insert_by_order(siblings, record):
+    """
+    按排序键插入，保持同级列表有序；记录没有排序键时追加到末尾
+    """
+    index = len(siblings)
+    if record.get("order") is not None:
+        for position, sibling in enumerate(siblings):
+            order = sibling.get("order")
+            if order is None or order > record["order"]:
+                index = position
+                break
+    siblings.insert(index, record)
+
+def move_record(data, key, parent, index, record_id=None):
+    """
+    把记录 key 移动到父记录 parent 下（主分组为 ()，子分组为 (主分组ID,)，文件为 (主分组ID, 子分组ID)）
+    的第 index 个位置（不计被移动的记录本身），只修改被移动记录的排序键和必要时的 ID；
+    record_id 为移动后希望使用的 ID（撤销移动时恢复原 ID），目标中已被占用时忽略
+    返回 (移动记录, 是否给其他记录补充了排序键)，记录或目标不存在时返回 (None, False)
+    """
+    source_siblings, record = find_record(data, key)
+    target_siblings = _children(data, (key[0],) + tuple(parent) + (0,))
+    if record is None or target_siblings is None:
+        return None, False
+    rekeyed = assign_order_keys(target_siblings) > 0
+    if source_siblings is not target_siblings:
+        rekeyed = assign_order_keys(source_siblings) > 0 or rekeyed
+    others = [sibling for sibling in target_siblings if sibling is not record]
+    index = max(0, min(index, len(others)))
+    before = others[index - 1]["order"] if index > 0 else None
+    after = others[index]["order"] if index < len(others) else None
+    new_id = record["id"]
+    if record_id is not None and not any(sibling["id"] == record_id for sibling in others):
+        new_id = record_id
+    if source_siblings is not target_siblings and any(sibling["id"] == new_id for sibling in others):
+        new_id = max(sibling["id"] for sibling in others) + 1
+    move = {"from": list(key), "to": [key[0]] + list(parent) + [new_id], "order": key_between(before, after)}
+    apply_move(data, move)
+    return move, rekeyed
+
+def insert_record(data, key, record, index=None, renumber=False):
+    """
+    把记录（连同子记录）插入到记录键 key 对应的位置，index 为 None 时按排序键插入；
+    同级列表中已有相同 ID 的记录时，renumber 为 True 则分配新 ID，否则不插入
+    返回插入后的记录键，父记录不存在或 ID 冲突时返回 None
+    """
+    key = tuple(key)
+    siblings = _children(data, key)
+    if siblings is None:
+        return None
+    if any(sibling["id"] == key[-1] for sibling in siblings):
+        if not renumber:
+            return None
+        key = key[:-1] + (max(sibling["id"] for sibling in siblings) + 1,)
+    record["id"] = key[-1]
+    if index is None:
+        _insert_by_order(siblings, record)
+    else:
+        siblings.insert(max(0, min(index, len(siblings))), record)
+    return key
+
+def record_position(data, key):
+    """
+    返回记录键 key 对应的记录在同级列表中的位置，记录不存在时返回 None
+    """
+    siblings, record = find_record(data, tuple(key))
+    if record is None:
+        return None
+    return next(position for position, sibling in enumerate(siblings) if sibling is record)
+
+def delete_record(data, key, name=None):
+    """
+    删除记录键 key 对应的记录（连同子记录），name 不为 None 时只删除名称相同的记录
+    返回 (原位置, 记录)，记录不存在时返回 (None, None)
+    """
+    siblings, record = find_record(data, tuple(key))
+    if record is None or (name is not None and record["name"] != name):
+        return None, None
+    index = next(position for position, sibling in enumerate(siblings) if sibling is record)
+    del siblings[index]
+    return index, record
+
+def apply_journal_entry(data, entry):
+    """
+    应用增量日志中的一条记录：{"op": "insert", "key": 记录键, "record": 记录}、
+    {"op": "delete", "key": 记录键} 或没有 op 的移动记录（见 apply_move）
+    插入已存在的记录、删除不存在的记录都不做修改，因此重复应用是安全的；返回是否修改了数据
+    """
+    op = entry.get("op")
+    if op == "insert":
+        return insert_record(data, entry["key"], entry["record"]) is not None
+    if op == "delete":
+        return delete_record(data, entry["key"])[1] is not None
+    return apply_move(data, entry)
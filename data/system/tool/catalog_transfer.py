@@ -0,0 +1,160 @@
+import gzip
+import json
+from data.system.log.log import logger
+from data.system.tool.data_persistence import load_data, save_data
+from data.system.tool.file_entry import make_file_entry
+
+# 导出文件的格式标识，第一行为文件头
+CATALOG_FORMAT = 'kuusoo-catalog'
+CATALOG_VERSION = 1
+# 导入时每处理这么多条记录输出一次进度，每 COMMIT_EVERY 条保存一次
+IMPORT_BATCH_SIZE = 10000
+COMMIT_EVERY = 200000
+
+def open_catalog_stream(path, mode):
+    """
+    打开导出文件，扩展名为 .gz 时使用 gzip 压缩；mode 为 'r' 或 'w'
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8', newline='\n')
+
+def iter_catalog_records(data):
+    """
+    按 主分组、其子分组、子分组中的文件 的顺序逐条生成记录，不复制整个目录
+    记录的先后顺序即列表顺序，导入时按行追加即可保持顺序
+    """
+    yield {"type": "header", "format": CATALOG_FORMAT, "version": CATALOG_VERSION}
+    for main_group in data["mainGroups"]:
+        yield {"type": "main", "id": main_group["id"], "name": main_group["name"]}
+        for sub_group in main_group["subGroups"]:
+            yield {"type": "sub", "main": main_group["id"], "id": sub_group["id"], "name": sub_group["name"]}
+            for file in sub_group["files"]:
+                record = {"type": "file", "main": main_group["id"], "sub": sub_group["id"], "id": file["id"],
+                          "name": file["name"], "size": file["size"], "path": file["path"]}
+                if file.get("tags"):
+                    record["tags"] = file["tags"]
+                yield record
+
+def export_catalog(path, data=None):
+    """
+    把目录导出为 JSON Lines（每行一条记录），返回导出的记录数（不含文件头）
+    """
+    if data is None:
+        data = load_data(raise_errors=True)
+    count = 0
+    with open_catalog_stream(path, 'w') as stream:
+        for record in iter_catalog_records(data):
+            stream.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            stream.write('\n')
+            count += 1
+    logger.info(f"已将 {count - 1} 条记录导出到 {path}")
+    return count - 1
+
+class _ImportTarget:
+    """
+    导入过程中的 ID 映射：导出文件中的 ID 映射到目标目录中的分组，
+    同名的主分组和子分组合并，新建的分组和文件分配目标目录中未使用的 ID
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.main_groups = {}
+        self.sub_groups = {}
+        # 每个子分组的下一个文件 ID 和已有路径，只为导入涉及的子分组建立
+        self.next_file_id = {}
+        self.known_paths = {}
+
+    def main_group(self, record):
+        main_group = next((g for g in self.data["mainGroups"] if g["name"] == record["name"]), None)
+        if main_group is None:
+            new_id = max((g["id"] for g in self.data["mainGroups"]), default=0) + 1
+            main_group = {"id": new_id, "name": record["name"], "subGroups": []}
+            self.data["mainGroups"].append(main_group)
+        self.main_groups[record["id"]] = main_group
+        return main_group
+
+    def sub_group(self, record):
+        main_group = self.main_groups.get(record["main"])
+        if main_group is None:
+            raise ValueError(f"子分组 {record['name']} 所属的主分组 {record['main']} 不在它之前")
+        sub_group = next((s for s in main_group["subGroups"] if s["name"] == record["name"]), None)
+        if sub_group is None:
+            new_id = max((s["id"] for s in main_group["subGroups"]), default=0) + 1
+            sub_group = {"id": new_id, "name": record["name"], "files": []}
+            main_group["subGroups"].append(sub_group)
+        self.sub_groups[(record["main"], record["id"])] = sub_group
+        key = id(sub_group)
+        if key not in self.next_file_id:
+            self.next_file_id[key] = max((f["id"] for f in sub_group["files"]), default=0) + 1
+            self.known_paths[key] = {f["path"] for f in sub_group["files"]}
+        return sub_group
+
+    def add_file(self, record):
+        """
+        添加文件条目，子分组中已有相同路径的文件时跳过；返回是否添加
+        """
+        sub_group = self.sub_groups.get((record["main"], record["sub"]))
+        if sub_group is None:
+            raise ValueError(f"文件 {record['name']} 所属的子分组 {record['sub']} 不在它之前")
+        key = id(sub_group)
+        if record["path"] in self.known_paths[key]:
+            return False
+        entry = make_file_entry(self.next_file_id[key], record["name"], record["size"], record["path"])
+        if record.get("tags"):
+            entry["tags"] = record["tags"]
+        sub_group["files"].append(entry)
+        self.next_file_id[key] += 1
+        self.known_paths[key].add(record["path"])
+        return True
+
+def import_catalog(path, data=None, commit_every=COMMIT_EVERY, progress=None):
+    """
+    逐行读取 JSON Lines 导出文件并合并进目录，导出文件不会整个读入内存
+    同名分组合并、ID 重新分配、同一子分组中路径相同的文件跳过；
+    每 commit_every 条记录保存一次，中途失败时已提交的部分保留；
+    导入的记录排在目标列表末尾，排序键在保存时分配。
+    progress 为可选回调 progress(已处理记录数)。返回 (新增文件数, 跳过文件数)
+    """
+    if data is None:
+        data = load_data(raise_errors=True)
+    target = _ImportTarget(data)
+    added = skipped = processed = 0
+    pending = 0
+    with open_catalog_stream(path, 'r') as stream:
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                kind = record.get("type")
+                if kind == "header":
+                    if record.get("format") != CATALOG_FORMAT or record.get("version", 0) > CATALOG_VERSION:
+                        raise ValueError(f"不支持的导出文件格式: {record.get('format')} {record.get('version')}")
+                    continue
+                if kind == "main":
+                    target.main_group(record)
+                elif kind == "sub":
+                    target.sub_group(record)
+                elif kind == "file":
+                    if target.add_file(record):
+                        added += 1
+                    else:
+                        skipped += 1
+                else:
+                    raise ValueError(f"未知的记录类型: {kind}")
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path} 第 {line_number} 行: {e}") from e
+            processed += 1
+            pending += 1
+            if progress is not None and processed % IMPORT_BATCH_SIZE == 0:
+                progress(processed)
+            if pending >= commit_every:
+                save_data(data, raise_errors=True)
+                pending = 0
+                logger.info(f"导入 {path}: 已提交 {processed} 条记录")
+    if pending:
+        save_data(data, raise_errors=True)
+    logger.info(f"从 {path} 导入完成，新增 {added} 个文件，跳过 {skipped} 个重复文件")
+    return added, skipped
@@ -1,37 +1,27 @@
-import json
-import os
 from data.system.log.log import logger
-
-CONFIG_FILE_PATH = 'data/system/config/config.json'
+from data.system.config import config as config_module
 
 def load_config():
     """
-    从配置文件中加载配置信息，并记录日志
+    获取统一配置对象，配置只在首次调用时从磁盘加载
     """
-    try:
-        logger.info(f"开始从 {CONFIG_FILE_PATH} 加载配置信息")
-        if os.path.exists(CONFIG_FILE_PATH):
-            with open(CONFIG_FILE_PATH, 'r', encoding='utf-8') as file:
-                config = json.load(file)
-                logger.info(f"成功从 {CONFIG_FILE_PATH} 加载配置信息")
-                return config
-        else:
-            logger.warning(f"{CONFIG_FILE_PATH} 文件不存在，返回空配置")
-            return {}
-    except Exception as e:
-        logger.error(f"从 {CONFIG_FILE_PATH} 加载配置信息时出错: {e}")
-        return {}
+    config = config_module.load_config()
+    logger.info(f"使用配置文件 {config.path}")
+    return config
 
 def save_config(config):
     """
-    将配置信息保存到配置文件中，并记录日志
+    将配置信息立即写入配置文件，并记录日志
+    config 可以是统一配置对象，也可以是需要合并进去的配置字典
     """
     try:
-        logger.info(f"开始将配置信息保存到 {CONFIG_FILE_PATH}")
-        if not os.path.exists(os.path.dirname(CONFIG_FILE_PATH)):
-            os.makedirs(os.path.dirname(CONFIG_FILE_PATH))
-        with open(CONFIG_FILE_PATH, 'w', encoding='utf-8') as file:
-            json.dump(config, file, ensure_ascii=False, indent=2)
-            logger.info(f"成功将配置信息保存到 {CONFIG_FILE_PATH}")
+        if isinstance(config, config_module.Config):
+            # 传入的是配置对象（包括使用其他配置文件的对象）时直接写入它自己的文件
+            unified = config
+        else:
+            unified = config_module.load_config()
+            unified.update(config)
+        unified.flush()
+        logger.info(f"成功将配置信息保存到 {unified.path}")
     except Exception as e:
-        logger.error(f"将配置信息保存到 {CONFIG_FILE_PATH} 时出错: {e}")
\ No newline at end of file
+        logger.error(f"保存配置信息时出错: {e}")
\ No newline at end of file
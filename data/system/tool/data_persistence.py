@@ -1,37 +1,198 @@
 import json
 import os
+import tempfile
 from data.system.log.log import logger
+from data.system.tool.file_entry import file_entry_hook, file_entry_default
+from data.system.tool.catalog_sync import (file_lock, file_stamp, fingerprints, apply_journal_entry,
+                                           merge_external_changes, stamp_local_changes)
+from data.system.tool.order_keys import assign_all_order_keys
 
 DATA_FILE_PATH = 'data/save/data.json'
+LOCK_FILE_PATH = DATA_FILE_PATH + '.lock'
+# 增量日志，每行一条移动、插入或删除记录；完整保存数据文件时合并进数据文件并清空
+JOURNAL_FILE_PATH = DATA_FILE_PATH + '.journal'
 
-def load_data():
+# 与磁盘文件的同步状态：上次同步时的代数、文件戳和各记录指纹，以及已应用的增量日志位置
+_sync_state = {"generation": 0, "stamp": None, "baseline": {}, "journal_offset": 0, "journal_stamp": None}
+
+def _read_data_file():
+    with open(DATA_FILE_PATH, 'r', encoding='utf-8') as file:
+        # 文件条目加载为紧凑的 FileEntry，序列化格式不变
+        return json.load(file, object_hook=file_entry_hook)
+
+def _remember_sync(data, generation):
+    _sync_state["generation"] = generation
+    _sync_state["stamp"] = file_stamp(DATA_FILE_PATH)
+    _sync_state["baseline"] = fingerprints(data)
+
+def _replay_journal(data):
+    """
+    应用增量日志中尚未应用的记录，只读取以换行结尾的完整行，返回应用的记录数
+    日志中的记录按排序键插入，应用前先给没有排序键的记录（旧数据或刚合并进来的记录）补全排序键；
+    补全结果只取决于列表内容，与写入日志的进程加载时计算出的键相同
+    """
+    applied = 0
+    raw_lines = []
+    try:
+        with open(JOURNAL_FILE_PATH, 'rb') as file:
+            file.seek(_sync_state["journal_offset"])
+            for raw_line in file:
+                if not raw_line.endswith(b'\n'):
+                    break
+                raw_lines.append(raw_line)
+    except FileNotFoundError:
+        _sync_state["journal_offset"] = 0
+    if raw_lines:
+        assign_all_order_keys(data)
+    for raw_line in raw_lines:
+        _sync_state["journal_offset"] += len(raw_line)
+        try:
+            if apply_journal_entry(data, json.loads(raw_line, object_hook=file_entry_hook)):
+                applied += 1
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"增量日志中的记录无效: {e}")
+    _sync_state["journal_stamp"] = file_stamp(JOURNAL_FILE_PATH)
+    return applied
+
+def load_data(raise_errors=False):
     """
     从数据文件中加载数据，并记录日志
+    数据文件存在但无法读取时默认返回空数据结构；raise_errors 为 True 时记录日志后重新抛出异常
     """
     try:
         logger.info(f"开始从 {DATA_FILE_PATH} 加载数据")
         if os.path.exists(DATA_FILE_PATH):
-            with open(DATA_FILE_PATH, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                logger.info(f"成功从 {DATA_FILE_PATH} 加载数据")
-                return data
+            with file_lock(LOCK_FILE_PATH):
+                data = _read_data_file()
+                _sync_state["journal_offset"] = 0
+                _replay_journal(data)
+                # 旧数据没有排序键时按当前顺序补全，下次保存时写入
+                assign_all_order_keys(data)
+                # 基准取重放和补全之后的内容，这些变化不算作本进程的修改
+                _remember_sync(data, data.get("generation", 0))
+            logger.info(f"成功从 {DATA_FILE_PATH} 加载数据")
+            return data
         else:
             logger.warning(f"{DATA_FILE_PATH} 文件不存在，返回空数据结构")
             return {"mainGroups": []}
     except Exception as e:
         logger.error(f"从 {DATA_FILE_PATH} 加载数据时出错: {e}")
+        if raise_errors:
+            raise
         return {"mainGroups": []}
 
-def save_data(data):
+def save_data(data, raise_errors=False):
     """
     将数据保存到数据文件中，并记录日志
+    写入期间持有跨进程文件锁；若文件在上次同步后被其他进程改写，
+    先把其他进程修改过的记录合并进来再写入，避免覆盖对方的修改
+    raise_errors 为 True 时保存失败会在记录日志后重新抛出异常
     """
     try:
         logger.info(f"开始将数据保存到 {DATA_FILE_PATH}")
         if not os.path.exists(os.path.dirname(DATA_FILE_PATH)):
             os.makedirs(os.path.dirname(DATA_FILE_PATH))
-        with open(DATA_FILE_PATH, 'w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=2)
+        with file_lock(LOCK_FILE_PATH):
+            generation = _sync_state["generation"]
+            baseline = _sync_state["baseline"]
+            stamp = file_stamp(DATA_FILE_PATH)
+            if stamp is not None and stamp != _sync_state["stamp"]:
+                disk_data = _read_data_file()
+                merged = merge_external_changes(data, disk_data, baseline, generation)
+                generation = max(generation, disk_data.get("generation", 0))
+                # 合并后以磁盘内容为基准，只有本进程的修改会得到新版本号
+                baseline = fingerprints(disk_data)
+                # 其他进程改写数据文件时已清空增量日志，日志中的记录都基于新的数据文件
+                _sync_state["journal_offset"] = 0
+                logger.info(f"{DATA_FILE_PATH} 已被其他进程修改，合并了 {merged} 条记录")
+            # 其他进程追加的移动记录先应用，清空增量日志后它们只保存在数据文件中
+            _replay_journal(data)
+            assign_all_order_keys(data, rebalance=True)
+            generation += 1
+            stamp_local_changes(data, baseline, generation)
+            data["generation"] = generation
+            # 先写临时文件再替换，其他进程不会读到写了一半的文件
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(DATA_FILE_PATH), prefix='.data.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                    json.dump(data, file, ensure_ascii=False, indent=2, default=file_entry_default)
+                os.replace(tmp_path, DATA_FILE_PATH)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            if os.path.exists(JOURNAL_FILE_PATH):
+                os.remove(JOURNAL_FILE_PATH)
+            _sync_state["journal_offset"] = 0
+            _sync_state["journal_stamp"] = None
+            _remember_sync(data, generation)
             logger.info(f"成功将数据保存到 {DATA_FILE_PATH}")
     except Exception as e:
-        logger.error(f"将数据保存到 {DATA_FILE_PATH} 时出错: {e}")
\ No newline at end of file
+        logger.error(f"将数据保存到 {DATA_FILE_PATH} 时出错: {e}")
+        if raise_errors:
+            raise
+
+def _append_journal(entry, rekeyed=False):
+    """
+    向增量日志追加一条记录，成功返回 True
+    数据文件或增量日志在上次同步后被其他进程修改过，或修改时给其他记录补充了排序键（rekeyed），
+    则不追加并返回 False，由调用方改为完整保存，由 save_data 负责合并
+    """
+    try:
+        with file_lock(LOCK_FILE_PATH):
+            in_sync = not rekeyed and os.path.exists(DATA_FILE_PATH) and \
+                file_stamp(DATA_FILE_PATH) == _sync_state["stamp"] and \
+                file_stamp(JOURNAL_FILE_PATH) == _sync_state["journal_stamp"]
+            if in_sync:
+                line = (json.dumps(entry, ensure_ascii=False, default=file_entry_default) + '\n').encode('utf-8')
+                with open(JOURNAL_FILE_PATH, 'ab') as file:
+                    file.write(line)
+                _sync_state["journal_offset"] += len(line)
+                _sync_state["journal_stamp"] = file_stamp(JOURNAL_FILE_PATH)
+                return True
+    except Exception as e:
+        logger.error(f"写入增量日志 {JOURNAL_FILE_PATH} 时出错: {e}")
+    return False
+
+def save_changes(data, entries, rekeyed=False):
+    """
+    持久化已应用到 data 的若干条移动、插入或删除记录（格式见 catalog_sync.apply_journal_entry），
+    只把受影响的记录追加到增量日志，不重写整个数据文件；无法追加或给其他记录补充了排序键（rekeyed）时完整保存
+    """
+    if not rekeyed and all(_append_journal(entry) for entry in entries):
+        logger.info(f"已将 {len(entries)} 条修改写入增量日志")
+        return
+    save_data(data)
+
+def reload_if_changed(data):
+    """
+    检查数据文件和增量日志是否被其他进程修改，未修改时只需两次 stat；
+    有修改时只把变化的记录合并进 data，返回合并的记录数
+    """
+    stamp = file_stamp(DATA_FILE_PATH)
+    data_changed = stamp is not None and stamp != _sync_state["stamp"]
+    if not data_changed and file_stamp(JOURNAL_FILE_PATH) == _sync_state["journal_stamp"]:
+        return 0
+    try:
+        merged = 0
+        with file_lock(LOCK_FILE_PATH):
+            # 持锁后重新取文件戳，保证与读到的内容一致
+            stamp = file_stamp(DATA_FILE_PATH)
+            if stamp is not None and stamp != _sync_state["stamp"]:
+                disk_data = _read_data_file()
+                merged = merge_external_changes(data, disk_data, _sync_state["baseline"], _sync_state["generation"])
+                generation = max(_sync_state["generation"], disk_data.get("generation", 0))
+                data["generation"] = generation
+                # 以磁盘内容为新的基准，本进程尚未保存的修改仍会在下次保存时写入
+                _sync_state["generation"] = generation
+                _sync_state["stamp"] = stamp
+                _sync_state["baseline"] = fingerprints(disk_data)
+                _sync_state["journal_offset"] = 0
+            merged += _replay_journal(data)
+        assign_all_order_keys(data)
+        if merged:
+            logger.info(f"检测到 {DATA_FILE_PATH} 被其他进程修改，合并了 {merged} 条记录")
+        return merged
+    except Exception as e:
+        logger.error(f"合并 {DATA_FILE_PATH} 的外部修改时出错: {e}")
+        return 0
\ No newline at end of file
@@ -0,0 +1,195 @@
+import sys
+
+# data.json 中文件条目的键，顺序即序列化顺序；rev 为可选的版本号，tags 为可选的标签列表，order 为可选的排序键
+FILE_ENTRY_KEYS = ("id", "name", "size", "path")
+OPTIONAL_FILE_ENTRY_KEYS = ("rev", "tags", "order")
+
+class _DirNode:
+    """
+    路径前缀树的节点，每个不同的目录在进程内只存一份
+    """
+    __slots__ = ("parent", "children", "path")
+
+    def __init__(self, parent, path):
+        self.parent = parent
+        self.children = {}
+        self.path = path
+
+class PathTrie:
+    """
+    目录路径前缀树，相同目录（及其上级目录）的条目共享同一个节点
+    """
+
+    def __init__(self):
+        self.root = _DirNode(None, "")
+        # 完整目录字符串到节点的快速查找表，重复目录不必逐段遍历
+        self._nodes = {"": self.root}
+
+    def intern(self, directory):
+        node = self._nodes.get(directory)
+        if node is not None:
+            return node
+        cut = max(directory.rfind('/'), directory.rfind('\\'))
+        if cut <= 0:
+            # 顶层目录（如 "/usr"、"C:"）整体作为一段，避免与同名相对路径冲突
+            parent = self.root
+            segment = sys.intern(directory)
+        else:
+            parent = self.intern(directory[:cut])
+            segment = sys.intern(directory[cut + 1:])
+        node = parent.children.get(segment)
+        if node is None:
+            node = _DirNode(parent, sys.intern(directory))
+            parent.children[segment] = node
+        self._nodes[node.path] = node
+        return node
+
+    def __len__(self):
+        return len(self._nodes)
+
+# 进程内共享的目录前缀树
+path_trie = PathTrie()
+
+def _parse_size(size):
+    """
+    兼容 "123B" 形式的大小字符串，返回字节数
+    """
+    if isinstance(size, int):
+        return size
+    size = str(size)
+    return int(size[:-1] if size.endswith('B') else size)
+
+class FileEntry:
+    """
+    紧凑的文件条目
+    使用 __slots__ 存储，大小存为整数，目录通过前缀树共享，
+    文件名与路径中的文件名相同时不重复存储；
+    同时保留字典式访问，读写 file["name"]、file["size"]、file["path"] 的代码无需修改
+    """
+    __slots__ = ("id", "rev", "tags", "order", "_name", "_size", "_dir", "_base")
+
+    def __init__(self, id, name, size, path, rev=None, tags=None, order=None):
+        self.id = id
+        self.rev = rev
+        self.order = order
+        # 标签存为驻留字符串的元组，没有标签时为 None
+        self.tags = tuple(sys.intern(tag) for tag in tags) if tags else None
+        self._size = _parse_size(size)
+        self._set_path(path)
+        self._set_name(name)
+
+    def _set_path(self, path):
+        cut = max(path.rfind('/'), path.rfind('\\'))
+        self._dir = path_trie.intern(path[:cut]) if cut >= 0 else None
+        self._base = path[cut + 1:]
+        # 分隔符混用等无法原样还原的路径整体存储
+        if self._dir is not None and self.path != path:
+            self._dir = None
+            self._base = path
+
+    def _set_name(self, name):
+        self._name = None if name == self._base else name
+
+    @property
+    def name(self):
+        return self._base if self._name is None else self._name
+
+    @property
+    def path(self):
+        if self._dir is None:
+            return self._base
+        # 沿用目录中的分隔符，保证序列化结果与原数据一致
+        separator = '\\' if '\\' in self._dir.path and '/' not in self._dir.path else '/'
+        return self._dir.path + separator + self._base
+
+    @property
+    def size_bytes(self):
+        return self._size
+
+    def __getitem__(self, key):
+        if key == "id":
+            return self.id
+        if key == "name":
+            return self.name
+        if key == "size":
+            return f"{self._size}B"
+        if key == "path":
+            return self.path
+        if key == "rev" and self.rev is not None:
+            return self.rev
+        if key == "tags" and self.tags is not None:
+            return list(self.tags)
+        if key == "order" and self.order is not None:
+            return self.order
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "id":
+            self.id = value
+        elif key == "name":
+            self._set_name(value)
+        elif key == "size":
+            self._size = _parse_size(value)
+        elif key == "path":
+            name = self.name
+            self._set_path(value)
+            self._set_name(name)
+        elif key == "rev":
+            self.rev = value
+        elif key == "tags":
+            self.tags = tuple(sys.intern(tag) for tag in value) if value else None
+        elif key == "order":
+            self.order = value
+        else:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def keys(self):
+        return FILE_ENTRY_KEYS + tuple(key for key in OPTIONAL_FILE_ENTRY_KEYS if getattr(self, key) is not None)
+
+    def to_dict(self):
+        result = {"id": self.id, "name": self.name, "size": f"{self._size}B", "path": self.path}
+        if self.rev is not None:
+            result["rev"] = self.rev
+        if self.tags is not None:
+            result["tags"] = list(self.tags)
+        if self.order is not None:
+            result["order"] = self.order
+        return result
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+def make_file_entry(id, name, size, path):
+    """
+    创建文件条目，size 可以是字节数或 "123B" 形式的字符串
+    """
+    return FileEntry(id, name, size, path)
+
+def file_entry_hook(obj):
+    """
+    json.load 的 object_hook，把形如文件条目的字典转换为 FileEntry
+    """
+    if all(key in obj for key in FILE_ENTRY_KEYS) and \
+            all(key in FILE_ENTRY_KEYS or key in OPTIONAL_FILE_ENTRY_KEYS for key in obj):
+        try:
+            return FileEntry(obj["id"], obj["name"], obj["size"], obj["path"], obj.get("rev"), obj.get("tags"), obj.get("order"))
+        except (TypeError, ValueError):
+            return obj
+    return obj
+
+def file_entry_default(obj):
+    """
+    json.dump 的 default，把 FileEntry 序列化为与原 data.json 相同的字典
+    """
+    if isinstance(obj, FileEntry):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
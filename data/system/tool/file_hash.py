@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PyQt5.QtCore import QObject, pyqtSignal
+from data.system.log.log import logger
+
+HASH_CACHE_FILE_PATH = 'data/save/hash_cache.json'
+# 分块读取大小，避免大文件一次性读入内存
+HASH_CHUNK_SIZE = 1024 * 1024
+# 待计算的文件数达到该值时才启用进程池，少量文件直接在当前进程计算
+PARALLEL_HASH_THRESHOLD = 8
+
+# 内存中的哈希缓存: {路径: [大小, 修改时间(纳秒), 哈希值]}
+_hash_cache = None
+
+def hash_file(file_path, chunk_size=HASH_CHUNK_SIZE):
+    """
+    分块流式计算文件的 SHA-256 哈希值
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_hash_cache():
+    """
+    从缓存文件中加载哈希缓存，只加载一次
+    """
+    global _hash_cache
+    if _hash_cache is not None:
+        return _hash_cache
+    _hash_cache = {}
+    try:
+        if os.path.exists(HASH_CACHE_FILE_PATH):
+            with open(HASH_CACHE_FILE_PATH, 'r', encoding='utf-8') as file:
+                _hash_cache = json.load(file)
+            logger.info(f"成功从 {HASH_CACHE_FILE_PATH} 加载 {len(_hash_cache)} 条哈希缓存")
+    except Exception as e:
+        logger.error(f"从 {HASH_CACHE_FILE_PATH} 加载哈希缓存时出错: {e}")
+        _hash_cache = {}
+    return _hash_cache
+
+def save_hash_cache():
+    """
+    将哈希缓存保存到缓存文件中
+    """
+    if _hash_cache is None:
+        return
+    try:
+        if not os.path.exists(os.path.dirname(HASH_CACHE_FILE_PATH)):
+            os.makedirs(os.path.dirname(HASH_CACHE_FILE_PATH))
+        with open(HASH_CACHE_FILE_PATH, 'w', encoding='utf-8') as file:
+            json.dump(_hash_cache, file, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"将哈希缓存保存到 {HASH_CACHE_FILE_PATH} 时出错: {e}")
+
+def hash_files(file_paths):
+    """
+    计算一批文件的哈希值，返回 {路径: 哈希值}
+    以 (路径, 大小, 修改时间) 为键命中缓存的文件只需一次 stat，
+    未命中的文件数量较多时交给进程池并行计算
+    """
+    cache = load_hash_cache()
+    result = {}
+    pending = []
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            logger.warning(f"无法读取文件 {file_path} 的状态，跳过哈希计算")
+            continue
+        cached = cache.get(file_path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            result[file_path] = cached[2]
+        else:
+            pending.append((file_path, stat.st_size, stat.st_mtime_ns))
+
+    if pending:
+        paths = [item[0] for item in pending]
+        try:
+            if len(paths) >= PARALLEL_HASH_THRESHOLD:
+                with ProcessPoolExecutor() as executor:
+                    digests = list(executor.map(hash_file, paths, chunksize=4))
+            else:
+                digests = [hash_file(path) for path in paths]
+        except Exception as e:
+            logger.error(f"计算文件哈希时出错: {e}")
+            return result
+        for (file_path, size, mtime_ns), digest in zip(pending, digests):
+            cache[file_path] = [size, mtime_ns, digest]
+            result[file_path] = digest
+        save_hash_cache()
+        logger.info(f"计算了 {len(pending)} 个文件的哈希值，缓存命中 {len(result) - len(pending)} 个")
+    return result
+
+def find_content_duplicates(existing_files, file_paths):
+    """
+    按文件内容检查重复，返回 {新文件路径: 已存在的同内容文件名}
+    新文件之间内容相同时，后出现的文件也视为重复
+    """
+    existing_paths = [file["path"] for file in existing_files]
+    digests = hash_files(existing_paths + list(file_paths))
+    seen = {}
+    for file in existing_files:
+        digest = digests.get(file["path"])
+        if digest:
+            seen.setdefault(digest, file["name"])
+    duplicates = {}
+    for file_path in file_paths:
+        digest = digests.get(file_path)
+        if digest is None:
+            continue
+        if digest in seen:
+            duplicates[file_path] = seen[digest]
+        else:
+            seen[digest] = os.path.basename(file_path)
+    return duplicates
+
+def prune_hash_cache(keep_paths):
+    """
+    丢弃路径不在 keep_paths 中的哈希缓存（条目已从目录中删除，或拖入后因重复未添加），有变化时保存
+    """
+    cache = load_hash_cache()
+    stale = [file_path for file_path in cache if file_path not in keep_paths]
+    if stale:
+        for file_path in stale:
+            del cache[file_path]
+        save_hash_cache()
+        logger.info(f"清理了 {len(stale)} 条过期的哈希缓存")
+
+class DuplicateChecker(QObject):
+    """
+    在后台线程中按内容检查重复，完成后通过 checked 信号把 (context, {新文件路径: 已存在的同内容文件名})
+    交回 GUI 线程；哈希缓存只由这个工作线程读写，所有请求排队依次处理，不阻塞事件循环
+    """
+    checked = pyqtSignal(object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def _put(self, request):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._queue.put(request)
+
+    def check(self, existing_files, file_paths, context):
+        """
+        提交一次检查，existing_files 在调用时复制，工作线程不访问目录数据
+        """
+        existing = [{"name": file["name"], "path": file["path"]} for file in existing_files]
+        self._put(("check", existing, list(file_paths), context))
+
+    def prune(self, data):
+        """
+        在工作线程中清理目录中已不存在的条目的哈希缓存
+        """
+        paths = {file["path"] for main_group in data["mainGroups"]
+                 for sub_group in main_group["subGroups"] for file in sub_group["files"]}
+        self._put(("prune", paths))
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request[0] == "prune":
+                prune_hash_cache(request[1])
+                continue
+            _, existing, file_paths, context = request
+            try:
+                duplicates = find_content_duplicates(existing, file_paths)
+            except Exception as e:
+                # 与无法读取的文件相同，检查失败时不视为重复
+                logger.error(f"按内容检查重复时出错: {e}")
+                duplicates = {}
+            self.checked.emit(context, duplicates)
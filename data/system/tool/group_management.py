@@ -5,7 +5,7 @@ from data.system.tool.data_persistence import save_data
 
 def add_main_group(data, main_group_list):
     """
-    添加主分组到数据结构和 UI 列表中
+    添加主分组到数据结构和 UI 列表中，返回新建的主分组，未添加时返回 None
     """
     group_name, ok = QInputDialog.getText(None, "添加主分组", "请输入主分组名称:")
     if ok and group_name:
@@ -13,7 +13,7 @@ def add_main_group(data, main_group_list):
         for group in data["mainGroups"]:
             if group["name"] == group_name:
                 QMessageBox.warning(None, "错误", "主分组名称已存在，请选择其他名称。")
-                return
+                return None
         new_id = 1
         if data["mainGroups"]:
             new_id = max(group["id"] for group in data["mainGroups"]) + 1
@@ -26,10 +26,12 @@ def add_main_group(data, main_group_list):
         main_group_list.addItem(group_name)
         save_data(data)
         logger.info(f"成功添加主分组: {group_name}")
+        return new_group
+    return None
 
 def add_sub_group(data, main_group_list, sub_group_list, selected_main_index):
     """
-    添加子分组到数据结构和 UI 列表中
+    添加子分组到数据结构和 UI 列表中，返回新建的子分组，未添加时返回 None
     """
     group_name, ok = QInputDialog.getText(None, "添加子分组", "请输入子分组名称:")
     if ok and group_name:
@@ -38,7 +40,7 @@ def add_sub_group(data, main_group_list, sub_group_list, selected_main_index):
         for sub_group in main_group["subGroups"]:
             if sub_group["name"] == group_name:
                 QMessageBox.warning(None, "错误", "子分组名称已存在，请选择其他名称。")
-                return
+                return None
         new_id = 1
         if main_group["subGroups"]:
             new_id = max(sub_group["id"] for sub_group in main_group["subGroups"]) + 1
@@ -50,4 +52,6 @@ def add_sub_group(data, main_group_list, sub_group_list, selected_main_index):
         main_group["subGroups"].append(new_sub_group)
         sub_group_list.addItem(group_name)
         save_data(data)
-        logger.info(f"成功添加子分组: {group_name}")
\ No newline at end of file
+        logger.info(f"成功添加子分组: {group_name}")
+        return new_sub_group
+    return None
\ No newline at end of file
@@ -0,0 +1,159 @@
+import os
+import stat
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, pyqtSignal
+from data.system.log.log import logger
+from data.system.tool.data_persistence import save_data
+
+def collect_entries(data):
+    """
+    收集所有主分组、子分组下的文件条目快照
+    返回 [(主分组名, 子分组名, 文件条目, 路径, 记录的大小)]
+    """
+    entries = []
+    for main_group in data["mainGroups"]:
+        for sub_group in main_group["subGroups"]:
+            for file in sub_group["files"]:
+                try:
+                    size = int(str(file["size"]).rstrip('B'))
+                except ValueError:
+                    size = -1
+                entries.append((main_group["name"], sub_group["name"], file, file["path"], size))
+    return entries
+
+def _current_identity():
+    """
+    返回当前进程的 (有效用户 ID, 所属组 ID 集合)，Windows 上返回 None
+    """
+    if os.name == 'nt':
+        return None
+    return os.geteuid(), set(os.getgroups()) | {os.getegid()}
+
+def _readable(file_stat, identity):
+    """
+    根据 scandir 得到的权限位判断当前用户能否读取文件，不再逐个调用 os.access（不考虑 ACL）
+    Windows 上的权限位不表示读权限，总是视为可读
+    """
+    if identity is None:
+        return True
+    uid, groups = identity
+    if uid == 0:
+        return True
+    if file_stat.st_uid == uid:
+        return bool(file_stat.st_mode & stat.S_IRUSR)
+    if file_stat.st_gid in groups:
+        return bool(file_stat.st_mode & stat.S_IRGRP)
+    return bool(file_stat.st_mode & stat.S_IROTH)
+
+def _check_directory(directory, items, identity=None):
+    """
+    检查同一目录下的一批条目，整个目录只 scandir 一次，大小和读权限都取自同一次 stat
+    """
+    results = []
+    try:
+        with os.scandir(directory or '.') as it:
+            found = {entry.name: entry for entry in it}
+    except PermissionError:
+        return [("permission_denied", item, None) for item in items]
+    except OSError:
+        return [("missing", item, None) for item in items]
+    for item in items:
+        base_name = os.path.basename(item[3])
+        entry = found.get(base_name)
+        try:
+            if entry is not None:
+                file_stat = entry.stat()
+            else:
+                # 不区分大小写的文件系统上目录中的名称可能与记录不同，单独 stat 一次确认
+                file_stat = os.stat(item[3])
+        except PermissionError:
+            results.append(("permission_denied", item, None))
+            continue
+        except OSError:
+            results.append(("missing", item, None))
+            continue
+        actual_size = file_stat.st_size
+        if not _readable(file_stat, identity):
+            results.append(("permission_denied", item, actual_size))
+        elif item[4] >= 0 and actual_size != item[4]:
+            results.append(("size_changed", item, actual_size))
+    return results
+
+def check_entries(entries, max_workers=None):
+    """
+    按目录分批并行检查条目，返回健康检查报告
+    报告格式: {"total": 条目数, "missing": [...], "size_changed": [...], "permission_denied": [...]}
+    每项为 {"main_group", "sub_group", "name", "path", "size", "actual_size", "file"}
+    """
+    by_directory = defaultdict(list)
+    for item in entries:
+        by_directory[os.path.dirname(item[3])].append(item)
+    report = {"total": len(entries), "missing": [], "size_changed": [], "permission_denied": []}
+    identity = _current_identity()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for results in executor.map(lambda d: _check_directory(d, by_directory[d], identity), list(by_directory)):
+            for kind, item, actual_size in results:
+                report[kind].append({
+                    "main_group": item[0],
+                    "sub_group": item[1],
+                    "name": item[2]["name"],
+                    "path": item[3],
+                    "size": item[4],
+                    "actual_size": actual_size,
+                    "file": item[2]
+                })
+    logger.info(f"健康检查完成：共 {report['total']} 个条目，失效 {len(report['missing'])} 个，"
+                f"大小变化 {len(report['size_changed'])} 个，无权限 {len(report['permission_denied'])} 个")
+    return report
+
+def report_problems(report):
+    """
+    返回报告中所有问题的集合 {(类型, 路径)}，用于判断两次检查的结果是否变化
+    """
+    return frozenset((kind, item["path"]) for kind in ("missing", "size_changed", "permission_denied")
+                     for item in report[kind])
+
+def fix_catalog(data, report):
+    """
+    一键修复：删除失效条目、更新大小变化的条目，然后保存一次数据
+    无权限的条目保持不变
+    返回 (删除数, 更新数)
+    """
+    missing = {id(item["file"]) for item in report["missing"]}
+    removed = 0
+    for main_group in data["mainGroups"]:
+        for sub_group in main_group["subGroups"]:
+            kept = [file for file in sub_group["files"] if id(file) not in missing]
+            removed += len(sub_group["files"]) - len(kept)
+            sub_group["files"][:] = kept
+    for item in report["size_changed"]:
+        item["file"]["size"] = f"{item['actual_size']}B"
+    if removed or report["size_changed"]:
+        save_data(data)
+    logger.info(f"健康检查修复完成：删除 {removed} 个失效条目，更新 {len(report['size_changed'])} 个条目大小")
+    return removed, len(report["size_changed"])
+
+class HealthChecker(QObject):
+    """
+    在后台线程中运行健康检查，完成后通过 finished 信号把报告交回 GUI 线程
+    """
+    finished = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, data):
+        if self.is_running():
+            logger.info("健康检查正在进行中，忽略本次请求")
+            return False
+        # 在 GUI 线程中取快照，后台线程只做文件系统检查
+        entries = collect_entries(data)
+        self._thread = threading.Thread(target=lambda: self.finished.emit(check_entries(entries)), daemon=True)
+        self._thread.start()
+        return True
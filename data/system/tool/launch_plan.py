@@ -0,0 +1,491 @@
+import json
+import os
+import queue
+import shlex
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from data.system.log.log import logger
+from data.system.tool.app_importer import get_application_dirs, read_desktop_entry
+
+LAUNCH_PLAN_FILE_PATH = 'data/save/launch_plans.json'
+# 查询 MIME 类型和默认程序时等待 xdg-mime 的最长时间（秒）
+XDG_MIME_TIMEOUT = 5
+# 缓存的启动方案数上限，超出时丢弃最久未使用的方案
+LAUNCH_PLAN_MAX_ENTRIES = 2000
+# Windows 关联程序方案的有效期（秒），注册表中的文件关联无法用修改时间检测，到期后重新查询
+HANDLER_PLAN_TTL = 24 * 3600
+# 可以直接执行的二进制文件的文件头：ELF 和 Mach-O
+EXECUTABLE_MAGIC = (b'\x7fELF', b'\xfe\xed\xfa\xce', b'\xfe\xed\xfa\xcf',
+                    b'\xce\xfa\xed\xfe', b'\xcf\xfa\xed\xfe', b'\xca\xfe\xba\xbe')
+# .desktop 的 Exec 中表示文件参数的域代码
+DESKTOP_FILE_CODES = ('%f', '%F')
+DESKTOP_URL_CODES = ('%u', '%U')
+
+# 内存中的启动方案: {路径: 方案}，方案格式见 resolve_launch_plan
+_launch_plans = None
+_plans_lock = threading.Lock()
+# 保存缓存文件时持有，刷新线程和 GUI 线程的保存依次进行
+_save_lock = threading.Lock()
+# 后台刷新队列，由单个工作线程处理
+_refresh_queue = queue.Queue()
+_refresh_thread = None
+
+def open_with_system(file_path):
+    """
+    用系统关联的原生程序打开文件，由操作系统解析快捷方式和关联程序
+    """
+    if hasattr(os, 'startfile'):
+        os.startfile(file_path)
+    else:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path)
+        opener = 'open' if sys.platform == 'darwin' else 'xdg-open'
+        subprocess.Popen([opener, file_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def _mtime(path):
+    """
+    返回路径本身（不跟随符号链接）的修改时间，不存在时返回 None
+    """
+    try:
+        return os.lstat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _stamps(paths):
+    return [[path, _mtime(path)] for path in dict.fromkeys(p for p in paths if p)]
+
+def plan_is_valid(plan):
+    """
+    方案依赖的所有文件（条目、符号链接目标、快捷方式目标、解释器、关联程序、MIME 关联配置）的修改时间
+    都未变化且方案未过期时有效
+    """
+    if plan.get("expires") is not None and time.time() >= plan["expires"]:
+        return False
+    return all(_mtime(path) == mtime for path, mtime in plan.get("stamps", []))
+
+def _read_lnk_string(data, offset, unicode):
+    count = struct.unpack_from('<H', data, offset)[0]
+    offset += 2
+    if unicode:
+        return data[offset:offset + count * 2].decode('utf-16-le', errors='replace'), offset + count * 2
+    return data[offset:offset + count].decode('mbcs' if os.name == 'nt' else 'latin-1', errors='replace'), offset + count
+
+def _read_c_string(data, offset, unicode):
+    if unicode:
+        end = offset
+        while end + 1 < len(data) and data[end:end + 2] != b'\0\0':
+            end += 2
+        return data[offset:end].decode('utf-16-le', errors='replace')
+    end = data.find(b'\0', offset)
+    return data[offset:end if end >= 0 else len(data)].decode('mbcs' if os.name == 'nt' else 'latin-1', errors='replace')
+
+def parse_lnk(file_path):
+    """
+    解析 Windows 快捷方式（Shell Link 二进制格式），返回 {"target": 目标路径, "arguments": 参数, "cwd": 工作目录}
+    没有文件系统目标（如商店应用、特殊文件夹）时 target 为 None
+    """
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    if len(data) < 0x4C or struct.unpack_from('<I', data, 0)[0] != 0x4C:
+        raise ValueError(f"{file_path} 不是有效的快捷方式文件")
+    flags = struct.unpack_from('<I', data, 0x14)[0]
+    unicode = bool(flags & 0x80)
+    offset = 0x4C
+    if flags & 0x01:
+        # LinkTargetIDList，目标路径从 LinkInfo 中读取，跳过
+        offset += 2 + struct.unpack_from('<H', data, offset)[0]
+    target = None
+    if flags & 0x02:
+        info_size, header_size, info_flags, _, base_offset, _, suffix_offset = struct.unpack_from('<7I', data, offset)
+        if info_flags & 0x01:
+            # 头部较长时带有 Unicode 版本的本地路径
+            if header_size >= 0x24:
+                base_unicode, suffix_unicode = struct.unpack_from('<II', data, offset + 28)
+                target = _read_c_string(data, offset + base_unicode, True) + _read_c_string(data, offset + suffix_unicode, True)
+            else:
+                target = _read_c_string(data, offset + base_offset, False) + _read_c_string(data, offset + suffix_offset, False)
+        offset += info_size
+    strings = {}
+    for flag, name in ((0x04, "name"), (0x08, "relative_path"), (0x10, "cwd"), (0x20, "arguments"), (0x40, "icon")):
+        if flags & flag:
+            strings[name], offset = _read_lnk_string(data, offset, unicode)
+    if not target and flags & 0x200:
+        # EnvironmentVariableDataBlock：目标路径中带有环境变量（如 %ProgramFiles%）
+        while offset + 8 <= len(data):
+            block_size, signature = struct.unpack_from('<II', data, offset)
+            if block_size < 8:
+                break
+            if signature == 0xA0000001:
+                target = os.path.expandvars(_read_c_string(data, offset + 8 + 260, True) or _read_c_string(data, offset + 8, False))
+                break
+            offset += block_size
+    if not target and strings.get("relative_path"):
+        target = os.path.normpath(os.path.join(os.path.dirname(file_path), strings["relative_path"]))
+    return {"target": target or None, "arguments": strings.get("arguments", ""),
+            "cwd": os.path.expandvars(strings["cwd"]) if strings.get("cwd") else None}
+
+def _windows_handler_command(file_path):
+    """
+    查询扩展名关联的打开命令（与资源管理器双击使用的相同），返回代入文件路径后的命令行，查询失败时返回 None
+    """
+    import ctypes
+    from ctypes import wintypes
+    extension = os.path.splitext(file_path)[1]
+    if not extension:
+        return None
+    assoc_query = ctypes.windll.shlwapi.AssocQueryStringW
+    size = wintypes.DWORD(0)
+    # ASSOCSTR_COMMAND = 1，第一次调用只取缓冲区大小
+    assoc_query(0, 1, extension, None, None, ctypes.byref(size))
+    if size.value == 0:
+        return None
+    buffer = ctypes.create_unicode_buffer(size.value)
+    if assoc_query(0, 1, extension, None, buffer, ctypes.byref(size)) != 0:
+        return None
+    command = os.path.expandvars(buffer.value)
+    for code in ('"%1"', '"%L"', '"%l"', '%1', '%L', '%l'):
+        command = command.replace(code, subprocess.list2cmdline([file_path]))
+    return command.replace('%*', '').strip()
+
+def _command_program(command):
+    """
+    返回 Windows 命令行中的程序路径
+    """
+    if command.startswith('"'):
+        return command[1:].split('"', 1)[0]
+    return command.split(' ', 1)[0]
+
+def _find_desktop_file(desktop_id):
+    """
+    在应用程序目录中查找 .desktop 文件，ID 中的“-”可能对应子目录
+    """
+    candidates = [desktop_id]
+    if '-' in desktop_id:
+        candidates.append(desktop_id.replace('-', '/', 1))
+    for app_dir in get_application_dirs():
+        for candidate in candidates:
+            path = os.path.join(app_dir, candidate)
+            if os.path.isfile(path):
+                return path
+    return None
+
+def _desktop_argv(entry, file_path=None):
+    """
+    把 .desktop 的 Exec 展开为参数列表，file_path 代入 %f/%u；Exec 中没有文件参数时把文件追加在末尾
+    需要终端或没有 Exec 时返回 None
+    """
+    if entry.get('Terminal') == 'true' or not entry.get('Exec'):
+        return None
+    argv = []
+    used_file = False
+    for token in shlex.split(entry['Exec']):
+        if token in DESKTOP_FILE_CODES or token in DESKTOP_URL_CODES:
+            if file_path is not None:
+                argv.append(file_path if token in DESKTOP_FILE_CODES else Path(file_path).as_uri())
+            used_file = True
+            continue
+        if token in ('%i', '%c', '%k'):
+            continue
+        argv.append(token.replace('%%', '%'))
+    if not argv:
+        return None
+    if file_path is not None and not used_file:
+        argv.append(file_path)
+    # 启动时不再搜索 PATH
+    program = shutil.which(argv[0])
+    if program is None:
+        return None
+    argv[0] = program
+    return argv
+
+def _mimeapps_paths():
+    """
+    返回 xdg-mime 查询默认程序时读取的关联配置文件（不论是否存在），
+    新建、修改或删除其中任何一个都会使关联程序方案失效
+    """
+    config_home = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    config_dirs = (os.environ.get('XDG_CONFIG_DIRS') or '/etc/xdg').split(':')
+    data_home = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    data_dirs = (os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share').split(':')
+    desktops = [name.lower() for name in os.environ.get('XDG_CURRENT_DESKTOP', '').split(':') if name]
+    names = [f'{desktop}-mimeapps.list' for desktop in desktops] + ['mimeapps.list']
+    paths = [os.path.join(base, name) for base in [config_home] + config_dirs if base for name in names]
+    for base in [data_home] + data_dirs:
+        if base:
+            app_dir = os.path.join(base, 'applications')
+            paths += [os.path.join(app_dir, name) for name in names + ['defaults.list', 'mimeinfo.cache']]
+    return paths
+
+def _xdg_query(*args):
+    result = subprocess.run(['xdg-mime', 'query'] + list(args), stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, text=True, timeout=XDG_MIME_TIMEOUT)
+    return result.stdout.strip() if result.returncode == 0 else ''
+
+def _posix_handler_plan(file_path):
+    """
+    查询文件的 MIME 类型和默认程序，展开为直接执行默认程序的方案，查询失败时返回 None
+    """
+    if sys.platform == 'darwin':
+        return None
+    try:
+        mime_type = _xdg_query('filetype', file_path)
+        desktop_id = _xdg_query('default', mime_type) if mime_type else ''
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"查询 {file_path} 的默认程序失败: {e}")
+        return None
+    desktop_file = _find_desktop_file(desktop_id.split(';')[0]) if desktop_id else None
+    if desktop_file is None:
+        return None
+    entry = read_desktop_entry(desktop_file)
+    argv = _desktop_argv(entry, file_path)
+    if argv is None:
+        return None
+    return {"kind": "handler", "argv": argv, "cwd": os.path.dirname(file_path),
+            "depends": [desktop_file, argv[0]] + _mimeapps_paths()}
+
+def _executable_argv(target):
+    """
+    返回直接执行可执行文件的参数列表：二进制文件为 [文件]，以 #! 开头的脚本为 [解释器, 可选参数, 文件]，
+    “/usr/bin/env 程序名”解析为程序的绝对路径；其他文件（如带执行权限的文档）返回 None，按关联程序打开
+    """
+    with open(target, 'rb') as file:
+        first_line = file.readline(512)
+    if first_line.startswith(EXECUTABLE_MAGIC):
+        return [target]
+    if not first_line.startswith(b'#!'):
+        return None
+    interpreter, _, argument = first_line[2:].decode('utf-8', errors='replace').strip().partition(' ')
+    argument = argument.strip()
+    if os.path.basename(interpreter) == 'env' and argument and not argument.startswith('-') and ' ' not in argument:
+        resolved = shutil.which(argument)
+        if resolved is not None:
+            return [resolved, target]
+    if not os.path.isfile(interpreter):
+        # 解释器不存在时仍直接执行，失败后交给系统打开
+        return [target]
+    return [interpreter] + ([argument] if argument else []) + [target]
+
+def resolve_launch_plan(file_path):
+    """
+    把条目解析为具体的启动方案：
+    {"kind": "exec" | "script" | "shortcut" | "desktop" | "handler" | "shell",
+     "argv": 参数列表 或 "command": Windows 命令行, "cwd": 工作目录, "stamps": [[依赖的文件, 修改时间]]}
+    符号链接解析为真实路径，脚本解析出解释器，快捷方式和 .desktop 解析出目标程序，
+    其他文件解析出关联的默认程序；无法解析时为 "shell"，启动时交给操作系统处理
+    """
+    if not os.path.lexists(file_path):
+        raise FileNotFoundError(file_path)
+    target = os.path.realpath(file_path)
+    extension = os.path.splitext(target)[1].lower()
+    plan = None
+    depends = []
+    try:
+        if os.name == 'nt':
+            if extension == '.lnk':
+                link = parse_lnk(target)
+                if link["target"] and os.path.splitext(link["target"])[1].lower() in ('.exe', '.com'):
+                    command = subprocess.list2cmdline([link["target"]])
+                    if link["arguments"]:
+                        command += ' ' + link["arguments"]
+                    plan = {"kind": "shortcut", "command": command,
+                            "cwd": link["cwd"] or os.path.dirname(link["target"])}
+                    depends = [link["target"]]
+            elif extension in ('.exe', '.com'):
+                plan = {"kind": "exec", "argv": [target], "cwd": os.path.dirname(target)}
+            else:
+                command = _windows_handler_command(target)
+                if command:
+                    plan = {"kind": "handler", "command": command, "cwd": os.path.dirname(target),
+                            "expires": time.time() + HANDLER_PLAN_TTL}
+                    depends = [_command_program(command)]
+        else:
+            if extension == '.desktop':
+                entry = read_desktop_entry(target)
+                argv = _desktop_argv(entry)
+                if argv is not None:
+                    plan = {"kind": "desktop", "argv": argv, "cwd": entry.get('Path') or os.path.expanduser('~')}
+                    depends = [argv[0]]
+            else:
+                argv = None
+                if os.path.isfile(target) and os.access(target, os.X_OK):
+                    argv = _executable_argv(target)
+                if argv is not None and len(argv) > 1:
+                    plan = {"kind": "script", "argv": argv, "cwd": os.path.dirname(target)}
+                    depends = [argv[0]]
+                elif argv is not None:
+                    plan = {"kind": "exec", "argv": argv, "cwd": os.path.dirname(target)}
+                else:
+                    handler = _posix_handler_plan(target)
+                    if handler is not None:
+                        depends = handler.pop("depends")
+                        plan = handler
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning(f"解析启动方案 {file_path} 失败，将交给系统打开: {e}")
+        plan = None
+    if plan is None:
+        plan = {"kind": "shell"}
+    plan["stamps"] = _stamps([file_path, target] + depends)
+    return plan
+
+def load_launch_plans():
+    """
+    从文件中加载缓存的启动方案，只加载一次
+    """
+    global _launch_plans
+    with _plans_lock:
+        if _launch_plans is not None:
+            return _launch_plans
+        plans = {}
+        try:
+            if os.path.exists(LAUNCH_PLAN_FILE_PATH):
+                with open(LAUNCH_PLAN_FILE_PATH, 'r', encoding='utf-8') as file:
+                    plans = json.load(file)
+            if not isinstance(plans, dict):
+                plans = {}
+        except Exception as e:
+            logger.error(f"从 {LAUNCH_PLAN_FILE_PATH} 加载启动方案时出错: {e}")
+            plans = {}
+        _launch_plans = plans
+        return _launch_plans
+
+def _prune_plans(plans):
+    """
+    丢弃条目已不存在的方案，超出 LAUNCH_PLAN_MAX_ENTRIES 时再丢弃最久未使用的方案（调用方持有 _plans_lock）
+    """
+    for file_path in [path for path in plans if not os.path.lexists(path)]:
+        del plans[file_path]
+    while len(plans) > LAUNCH_PLAN_MAX_ENTRIES:
+        del plans[next(iter(plans))]
+
+def save_launch_plans():
+    """
+    保存缓存的启动方案，先写临时文件再替换，多个线程的保存依次进行
+    """
+    plans = load_launch_plans()
+    with _save_lock:
+        try:
+            plan_dir = os.path.dirname(LAUNCH_PLAN_FILE_PATH)
+            if not os.path.exists(plan_dir):
+                os.makedirs(plan_dir)
+            with _plans_lock:
+                _prune_plans(plans)
+                content = json.dumps(plans, ensure_ascii=False)
+            fd, tmp_path = tempfile.mkstemp(dir=plan_dir, prefix='.launch_plans.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                    file.write(content)
+                os.replace(tmp_path, LAUNCH_PLAN_FILE_PATH)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        except Exception as e:
+            logger.error(f"将启动方案保存到 {LAUNCH_PLAN_FILE_PATH} 时出错: {e}")
+
+def _store_plan(file_path, plan):
+    plans = load_launch_plans()
+    with _plans_lock:
+        # 重新插入到末尾，字典顺序即最近使用顺序
+        plans.pop(file_path, None)
+        plans[file_path] = plan
+
+def get_cached_launch_plan(file_path):
+    """
+    返回条目缓存的启动方案，方案仍有效时只需几次 stat；没有缓存或已失效时返回 None
+    """
+    plans = load_launch_plans()
+    with _plans_lock:
+        plan = plans.get(file_path)
+        if plan is None:
+            return None
+        plans[file_path] = plans.pop(file_path)
+    return plan if plan_is_valid(plan) else None
+
+def get_launch_target(file_path):
+    """
+    返回启动条目时实际读取的程序：缓存的启动方案中的程序（argv[0] 或命令行中的程序），
+    没有有效的方案或方案为 "shell" 时返回条目路径本身
+    """
+    plan = get_cached_launch_plan(file_path)
+    if plan is not None:
+        if plan.get("argv"):
+            return plan["argv"][0]
+        if plan.get("command"):
+            return _command_program(plan["command"])
+    return file_path
+
+def run_launch_plan(file_path, plan):
+    """
+    按启动方案直接启动目标程序；"shell" 方案交给操作系统打开
+    """
+    if plan["kind"] == "shell":
+        open_with_system(file_path)
+        return
+    command = plan["command"] if "command" in plan else plan["argv"]
+    if os.name == 'nt':
+        subprocess.Popen(command, cwd=plan.get("cwd") or None, close_fds=True)
+    else:
+        # 新会话中启动，关闭启动器不影响已启动的程序
+        subprocess.Popen(command, cwd=plan.get("cwd") or None, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, start_new_session=True)
+
+def launch_with_plan(file_path):
+    """
+    使用缓存的启动方案启动条目；没有有效的缓存时直接交给操作系统打开，并在后台解析方案供下次使用，
+    不在调用线程中查询 MIME 类型和默认程序。按方案启动失败（如需要管理员权限）时改为交给操作系统打开，
+    并把该条目记为 "shell"，之后不再尝试直接启动
+    """
+    plan = get_cached_launch_plan(file_path)
+    if plan is None:
+        open_with_system(file_path)
+        refresh_launch_plans([file_path])
+        return
+    try:
+        run_launch_plan(file_path, plan)
+    except OSError as e:
+        if plan["kind"] == "shell":
+            raise
+        logger.warning(f"按启动方案启动 {file_path} 失败，改为交给系统打开: {e}")
+        _store_plan(file_path, {"kind": "shell", "stamps": plan["stamps"]})
+        save_launch_plans()
+        open_with_system(file_path)
+
+def _refresh_worker():
+    while True:
+        file_paths = _refresh_queue.get()
+        plans = load_launch_plans()
+        refreshed = removed = 0
+        for file_path in file_paths:
+            with _plans_lock:
+                plan = plans.get(file_path)
+            if plan is not None and plan_is_valid(plan):
+                continue
+            try:
+                _store_plan(file_path, resolve_launch_plan(file_path))
+                refreshed += 1
+            except FileNotFoundError:
+                with _plans_lock:
+                    removed += plans.pop(file_path, None) is not None
+        if refreshed or removed:
+            save_launch_plans()
+            logger.info(f"后台刷新了 {refreshed} 个启动方案")
+
+def refresh_launch_plans(file_paths):
+    """
+    在后台线程中预先解析一批条目的启动方案，已缓存且有效的方案跳过
+    所有请求由同一个工作线程依次处理，悬停等频繁触发的请求不会创建新线程
+    """
+    global _refresh_thread
+    file_paths = [path for path in file_paths if path]
+    if not file_paths:
+        return
+    if _refresh_thread is None or not _refresh_thread.is_alive():
+        _refresh_thread = threading.Thread(target=_refresh_worker, daemon=True)
+        _refresh_thread.start()
+    _refresh_queue.put(file_paths)
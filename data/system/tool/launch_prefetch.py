@@ -0,0 +1,149 @@
+import json
+import os
+import queue
+import threading
+import time
+from data.system.log.log import logger
+
+LAUNCH_HISTORY_FILE_PATH = 'data/save/launch_history.json'
+# 没有 posix_fadvise 的平台上逐块读取文件来预热页缓存
+PREFETCH_CHUNK_SIZE = 1024 * 1024
+
+# 内存中的启动历史: {路径: {"count": 启动次数, "last": 最后启动时间}}
+_launch_history = None
+# 已经预热过的文件: {路径: 预热时的修改时间}
+_warmed_files = {}
+_warmed_lock = threading.Lock()
+# 预读请求队列，由单个低优先级工作线程依次处理
+_prefetch_queue = queue.Queue()
+_prefetch_thread = None
+# 本次运行中所有预读请求共享的 I/O 预算: 已消耗的字节数
+_prefetch_state = {"used": 0}
+_prefetch_lock = threading.Lock()
+
+def load_launch_history():
+    """
+    从文件中加载启动历史，只加载一次
+    """
+    global _launch_history
+    if _launch_history is not None:
+        return _launch_history
+    _launch_history = {}
+    try:
+        if os.path.exists(LAUNCH_HISTORY_FILE_PATH):
+            with open(LAUNCH_HISTORY_FILE_PATH, 'r', encoding='utf-8') as file:
+                _launch_history = json.load(file)
+    except Exception as e:
+        logger.error(f"从 {LAUNCH_HISTORY_FILE_PATH} 加载启动历史时出错: {e}")
+        _launch_history = {}
+    return _launch_history
+
+def record_launch(file_path):
+    """
+    记录一次启动，用于计算最常用的启动目标
+    """
+    history = load_launch_history()
+    entry = history.setdefault(file_path, {"count": 0, "last": 0})
+    entry["count"] += 1
+    entry["last"] = int(time.time())
+    try:
+        if not os.path.exists(os.path.dirname(LAUNCH_HISTORY_FILE_PATH)):
+            os.makedirs(os.path.dirname(LAUNCH_HISTORY_FILE_PATH))
+        with open(LAUNCH_HISTORY_FILE_PATH, 'w', encoding='utf-8') as file:
+            json.dump(history, file, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"将启动历史保存到 {LAUNCH_HISTORY_FILE_PATH} 时出错: {e}")
+
+def get_launch_count(file_path):
+    """
+    返回启动目标的历史启动次数
+    """
+    return load_launch_history().get(file_path, {}).get("count", 0)
+
+def get_top_targets(count):
+    """
+    按启动次数（次数相同时按最后启动时间）返回最常用的启动目标路径
+    """
+    history = load_launch_history()
+    ranked = sorted(history.items(), key=lambda item: (item[1]["count"], item[1]["last"]), reverse=True)
+    return [path for path, _ in ranked[:count]]
+
+def prefetch_file(file_path, budget):
+    """
+    预读单个文件到页缓存，返回消耗的 I/O 预算（字节）
+    Linux 上使用 posix_fadvise(WILLNEED) 交给内核异步预读，其他平台逐块读取
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return 0
+    with _warmed_lock:
+        if _warmed_files.get(file_path) == stat.st_mtime_ns:
+            return 0
+    size = min(stat.st_size, budget)
+    if size <= 0:
+        return 0
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, size, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        else:
+            with open(file_path, 'rb') as file:
+                remaining = size
+                while remaining > 0:
+                    chunk = file.read(min(PREFETCH_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+    except OSError as e:
+        logger.warning(f"预读文件 {file_path} 时出错: {e}")
+        return 0
+    with _warmed_lock:
+        _warmed_files[file_path] = stat.st_mtime_ns
+    return size
+
+def _lower_thread_priority():
+    """
+    降低当前线程的调度优先级，仅在支持按线程设置优先级的平台上生效
+    """
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+def _prefetch_worker():
+    _lower_thread_priority()
+    while True:
+        file_paths, io_budget = _prefetch_queue.get()
+        used = 0
+        for file_path in file_paths:
+            with _prefetch_lock:
+                remaining = io_budget - _prefetch_state["used"]
+            if remaining <= 0:
+                logger.info(f"预读达到 I/O 预算上限 {io_budget}B，停止预读")
+                break
+            size = prefetch_file(file_path, remaining)
+            used += size
+            with _prefetch_lock:
+                _prefetch_state["used"] += size
+        if used:
+            logger.info(f"预读完成，共 {len(file_paths)} 个目标，消耗 {used}B")
+
+def start_prefetch(file_paths, io_budget):
+    """
+    在低优先级后台线程中预读一批启动目标；所有请求由同一个工作线程依次处理，
+    并共享本次运行的 I/O 预算 io_budget（字节），悬停等频繁触发的请求不会创建新线程，也不会各自占用完整预算
+    """
+    global _prefetch_thread
+    if not file_paths:
+        return
+    with _prefetch_lock:
+        if _prefetch_state["used"] >= io_budget:
+            return
+    if _prefetch_thread is None or not _prefetch_thread.is_alive():
+        _prefetch_thread = threading.Thread(target=_prefetch_worker, daemon=True)
+        _prefetch_thread.start()
+    _prefetch_queue.put((list(file_paths), io_budget))
@@ -0,0 +1,109 @@
+import heapq
+import itertools
+import threading
+import time
+from PyQt5.QtCore import QObject, pyqtSignal
+from data.system.log.log import logger
+from data.system.tool.launch_plan import launch_with_plan
+
+def launch_path(file_path):
+    """
+    启动文件：使用预先解析并缓存的启动方案（真实可执行文件、解释器或关联程序、工作目录），
+    重复启动时不再解析快捷方式、查询 MIME 类型和默认程序；无法解析时交给系统关联的原生程序打开
+    """
+    launch_with_plan(file_path)
+
+class LaunchScheduler(QObject):
+    """
+    批量启动调度器
+    待启动条目放在优先级队列中（数值小的先启动，同优先级按提交顺序），
+    最多 concurrency 个工作线程同时启动，每个线程启动后等待 stagger_ms 再取下一个，
+    避免一次性启动整个工作区时磁盘和 CPU 被占满。
+    进度和失败通过信号报告，信号在 GUI 线程中处理，不阻塞事件循环
+    """
+    progress = pyqtSignal(int, int, str)  # 已完成数, 总数, 当前文件名
+    failed = pyqtSignal(str, str)  # 文件名, 错误信息
+    finished = pyqtSignal(int, int)  # 成功数, 失败数
+
+    def __init__(self, concurrency=3, stagger_ms=500, launcher=launch_path, parent=None):
+        super().__init__(parent)
+        self.concurrency = max(1, concurrency)
+        self.stagger_ms = max(0, stagger_ms)
+        self.launcher = launcher
+        self._queue = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._total = 0
+        self._done = 0
+        self._failures = 0
+        self._cancelled = False
+
+    def submit(self, name, file_path, priority=0):
+        """
+        提交一个待启动条目，priority 数值小的先启动
+        """
+        with self._lock:
+            heapq.heappush(self._queue, (priority, next(self._counter), name, file_path))
+            self._total += 1
+
+    def start(self):
+        """
+        启动工作线程开始处理队列
+        """
+        with self._lock:
+            self._cancelled = False
+            self._workers = [w for w in self._workers if w.is_alive()]
+            missing = min(self.concurrency, len(self._queue)) - len(self._workers)
+            for _ in range(max(0, missing)):
+                worker = threading.Thread(target=self._run, daemon=True)
+                self._workers.append(worker)
+                worker.start()
+        logger.info(f"批量启动开始：共 {self._total} 个，并发数 {self.concurrency}，间隔 {self.stagger_ms}ms")
+
+    def cancel(self):
+        """
+        取消尚未开始的启动
+        """
+        with self._lock:
+            self._cancelled = True
+            self._total -= len(self._queue)
+            self._queue.clear()
+
+    def is_running(self):
+        with self._lock:
+            return bool(self._workers)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._cancelled or not self._queue:
+                    # 判断队列为空和退出工作线程列表在同一次加锁中完成，
+                    # 之后调用的 start() 会创建新线程，不会把条目留给正在退出的线程
+                    self._workers.remove(threading.current_thread())
+                    last_worker = not self._workers
+                    if last_worker:
+                        done, failures = self._done, self._failures
+                        self._total = self._done = self._failures = 0
+                    break
+                _, _, name, file_path = heapq.heappop(self._queue)
+            error = None
+            try:
+                self.launcher(file_path)
+                logger.info(f"批量启动文件: {name}")
+            except Exception as e:
+                error = str(e)
+                logger.error(f"批量启动文件 {name} 失败: {e}")
+            with self._lock:
+                self._done += 1
+                if error is not None:
+                    self._failures += 1
+                done, total = self._done, self._total
+            if error is not None:
+                self.failed.emit(name, error)
+            self.progress.emit(done, total, name)
+            if self.stagger_ms:
+                time.sleep(self.stagger_ms / 1000)
+        if last_worker:
+            logger.info(f"批量启动结束：成功 {done - failures} 个，失败 {failures} 个")
+            self.finished.emit(done - failures, failures)
@@ -0,0 +1,200 @@
+import json
+import os
+import re
+from collections import Counter
+from data.system.log.log import get_log_dir
+
+# 每天一个日志文件，文件名为 YYYYMMDD.log
+LOG_FILE_PATTERN = re.compile(r'^(\d{8})\.log$')
+# 每个日志文件的统计摘要，重复查询时不再扫描未变化的旧日志
+SUMMARY_INDEX_FILE_NAME = 'analytics_index.json'
+
+# 启动事件与失败事件的日志消息格式
+LAUNCH_PATTERNS = (
+    re.compile(r'^用原生程序打开文件: (.+)$'),
+    re.compile(r'^批量启动文件: (.+)$'),
+)
+FAILURE_PATTERNS = (
+    re.compile(r'^文件 (.+) 未找到$'),
+    re.compile(r'^打开文件 (.+) 时发生未知错误'),
+    re.compile(r'^批量启动文件 (.+) 失败'),
+)
+# 先用子串快速过滤，绝大多数鼠标移动等日志不需要正则匹配
+LAUNCH_MARKERS = ('打开文件: ', '批量启动文件: ')
+ERROR_MARKER = ' - ERROR - '
+
+def iter_log_lines(log_path, offset=0):
+    """
+    从字节偏移 offset 开始逐行读取日志文件，生成 (行内容, 该行结束处的字节偏移)
+    只生成以换行结尾的完整行，正在写入的半行留到下次读取；内存占用与文件大小无关
+    """
+    with open(log_path, 'rb') as file:
+        file.seek(offset)
+        position = offset
+        for raw_line in file:
+            if not raw_line.endswith(b'\n'):
+                break
+            position += len(raw_line)
+            yield raw_line.decode('utf-8', errors='replace').rstrip('\r\n'), position
+
+def parse_log_event(line):
+    """
+    解析一行日志，是启动或失败事件时返回 (事件类型, 时间, 文件名)，否则返回 None
+    """
+    is_error = ERROR_MARKER in line
+    if not is_error and not any(marker in line for marker in LAUNCH_MARKERS):
+        return None
+    parts = line.split(' - ', 3)
+    if len(parts) < 4:
+        return None
+    timestamp, message = parts[0], parts[3]
+    for pattern in (FAILURE_PATTERNS if is_error else LAUNCH_PATTERNS):
+        match = pattern.match(message)
+        if match:
+            return ("failure" if is_error else "launch", timestamp, match.group(1))
+    return None
+
+def iter_log_events(log_path, offset=0):
+    """
+    生成日志文件中的启动和失败事件 (事件类型, 时间, 文件名)
+    连续重复的日志行（同一条日志被多个处理器重复写入）只计一次
+    """
+    previous = None
+    for line, _ in iter_log_lines(log_path, offset):
+        if line == previous:
+            continue
+        previous = line
+        event = parse_log_event(line)
+        if event is not None:
+            yield event
+
+def summarize_log(log_path, summary=None):
+    """
+    统计单个日志文件，返回摘要
+    {"size", "mtime", "offset", "launches": {文件名: 次数}, "failures": {文件名: 次数}}
+    传入上次的摘要且文件只是追加了内容时，只解析新增部分
+    """
+    stat = os.stat(log_path)
+    if summary and summary["size"] == stat.st_size and summary["mtime"] == stat.st_mtime_ns:
+        return summary
+    if summary and stat.st_size >= summary["offset"]:
+        offset = summary["offset"]
+        launches = Counter(summary["launches"])
+        failures = Counter(summary["failures"])
+    else:
+        offset = 0
+        launches = Counter()
+        failures = Counter()
+    previous = None
+    for line, end in iter_log_lines(log_path, offset):
+        offset = end
+        if line == previous:
+            continue
+        previous = line
+        event = parse_log_event(line)
+        if event is None:
+            continue
+        if event[0] == "launch":
+            launches[event[2]] += 1
+        else:
+            failures[event[2]] += 1
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "offset": offset,
+        "launches": dict(launches),
+        "failures": dict(failures)
+    }
+
+def load_summary_index(log_dir=None):
+    """
+    更新并返回所有日志文件的摘要索引 {日期: 摘要}
+    只有新增或变化的日志文件会被读取
+    """
+    log_dir = log_dir or get_log_dir()
+    index_path = os.path.join(log_dir, SUMMARY_INDEX_FILE_NAME)
+    try:
+        with open(index_path, 'r', encoding='utf-8') as file:
+            index = json.load(file)
+    except (FileNotFoundError, ValueError):
+        index = {}
+    changed = False
+    present = set()
+    for file_name in sorted(os.listdir(log_dir)):
+        match = LOG_FILE_PATTERN.match(file_name)
+        if not match:
+            continue
+        day = match.group(1)
+        present.add(day)
+        summary = summarize_log(os.path.join(log_dir, file_name), index.get(day))
+        if summary is not index.get(day):
+            index[day] = summary
+            changed = True
+    for day in set(index) - present:
+        del index[day]
+        changed = True
+    if changed:
+        with open(index_path, 'w', encoding='utf-8') as file:
+            json.dump(index, file, ensure_ascii=False)
+    return index
+
+def _select_days(index, days):
+    selected = sorted(index)
+    return selected[-days:] if days else selected
+
+def top_launches(count=10, days=None, log_dir=None):
+    """
+    返回启动次数最多的文件 [(文件名, 次数)]，days 为最近的天数（None 表示全部）
+    """
+    index = load_summary_index(log_dir)
+    total = Counter()
+    for day in _select_days(index, days):
+        total.update(index[day]["launches"])
+    return total.most_common(count)
+
+def failure_rates(days=None, log_dir=None):
+    """
+    返回各文件的失败率 [(文件名, 失败次数, 启动尝试次数, 失败率)]，按失败次数降序
+    """
+    index = load_summary_index(log_dir)
+    launches = Counter()
+    failures = Counter()
+    for day in _select_days(index, days):
+        launches.update(index[day]["launches"])
+        failures.update(index[day]["failures"])
+    result = []
+    for name, failed in failures.most_common():
+        attempts = launches[name] + failed
+        result.append((name, failed, attempts, failed / attempts))
+    return result
+
+def daily_usage(days=None, log_dir=None):
+    """
+    返回每天的启动次数与失败次数 [(日期, 启动次数, 失败次数)]
+    """
+    index = load_summary_index(log_dir)
+    return [
+        (day, sum(index[day]["launches"].values()), sum(index[day]["failures"].values()))
+        for day in _select_days(index, days)
+    ]
+
+def format_report(kind="top", count=10, days=None, log_dir=None):
+    """
+    生成文本形式的统计报告，kind 为 "top"、"failures" 或 "daily"
+    """
+    lines = []
+    if kind == "top":
+        lines.append("启动次数排行:")
+        for name, launches in top_launches(count, days, log_dir):
+            lines.append(f"  {launches:>6}  {name}")
+    elif kind == "failures":
+        lines.append("启动失败率:")
+        for name, failed, attempts, rate in failure_rates(days, log_dir)[:count]:
+            lines.append(f"  {rate:>6.1%}  {failed}/{attempts}  {name}")
+    elif kind == "daily":
+        lines.append("每日使用情况 (日期 启动 失败):")
+        for day, launches, failures in daily_usage(days, log_dir):
+            lines.append(f"  {day}  {launches:>6}  {failures:>6}")
+    else:
+        raise ValueError(f"未知的统计类型: {kind}")
+    return "\n".join(lines)
@@ -0,0 +1,100 @@
+import mmap
+import os
+
+# 日志行中级别字段的格式，与 log.py 的 Formatter 一致
+LEVEL_MARKER = ' - {} - '
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+class MappedLog:
+    """
+    以内存映射方式只读打开日志文件，按字节偏移读取单行，不把文件读入内存
+    文件变大时重新映射即可看到新增内容，已读取的部分不会重新读取
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.map = None
+        self.size = 0
+        self.refresh()
+
+    def refresh(self):
+        """
+        文件变大时重新映射，文件变小（被截断或替换）时返回 True 表示需要从头扫描
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        truncated = size < self.size
+        if size != self.size or self.map is None:
+            # 旧的映射可能仍被后台扫描线程使用，不主动关闭，由引用计数释放
+            self.map = None
+            if size > 0:
+                with open(self.path, 'rb') as file:
+                    self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                size = len(self.map)
+            self.size = size
+        return truncated
+
+    def line_at(self, offset, mapped=None):
+        """
+        返回从字节偏移 offset 开始的一行文本（不含换行符）
+        """
+        mapped = mapped if mapped is not None else self.map
+        if mapped is None or offset >= len(mapped):
+            return ''
+        end = mapped.find(b'\n', offset)
+        if end < 0:
+            end = len(mapped)
+        return mapped[offset:end].decode('utf-8', errors='replace').rstrip('\r')
+
+def _line_bounds(mapped, position, start, end):
+    line_start = mapped.rfind(b'\n', start, position) + 1
+    if line_start == 0:
+        line_start = start
+    line_end = mapped.find(b'\n', position, end)
+    return line_start, line_end
+
+def scan_lines(mapped, start, end, level=None, text=None, cancel=None, batch_size=20000):
+    """
+    扫描 mapped[start:end] 中以换行结尾的完整行，分批生成行首偏移的列表
+    level 为日志级别（如 "ERROR"），text 为消息中的子串，都为空时生成所有行；
+    有过滤条件时直接查找子串再定位所在行，不逐行解码，匹配很少时几乎不随文件大小变慢
+    cancel 为 threading.Event，置位后尽快停止
+    """
+    needles = [needle.encode('utf-8') for needle in (text, LEVEL_MARKER.format(level) if level else None) if needle]
+    offsets = []
+    position = start
+    while position < end:
+        if cancel is not None and cancel.is_set():
+            return
+        if not needles:
+            line_end = mapped.find(b'\n', position, end)
+            if line_end < 0:
+                break
+            offsets.append(position)
+            position = line_end + 1
+        else:
+            found = mapped.find(needles[0], position, end)
+            if found < 0:
+                break
+            line_start, line_end = _line_bounds(mapped, found, position, end)
+            if line_end < 0:
+                break
+            line = mapped[line_start:line_end]
+            if all(needle in line for needle in needles[1:]):
+                offsets.append(line_start)
+            position = line_end + 1
+        if len(offsets) >= batch_size:
+            yield offsets
+            offsets = []
+    if offsets:
+        yield offsets
+
+def complete_end(mapped, end):
+    """
+    返回 end 之前最后一个完整行的结束位置，正在写入的半行留到下次扫描
+    """
+    if mapped is None or end <= 0:
+        return 0
+    return mapped.rfind(b'\n', 0, end) + 1
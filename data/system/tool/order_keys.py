@@ -0,0 +1,99 @@
+import string
+
+# 排序键使用的字符，按 ASCII 顺序排列，字符串比较即为排序顺序
+ORDER_DIGITS = string.digits + string.ascii_uppercase + string.ascii_lowercase
+# 排序键超过该长度时在下次完整保存时重新均匀分配
+MAX_ORDER_KEY_LENGTH = 12
+
+def _midpoint(a, b):
+    """
+    返回严格位于 a 与 b 之间的小数部分，a 可以为空串，b 为 None 表示没有上界
+    a、b 都不以最小字符结尾，保证总能找到中间值
+    """
+    if b is not None:
+        # 跳过公共前缀（a 不足的部分按最小字符补齐）
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else ORDER_DIGITS[0]) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    low = ORDER_DIGITS.index(a[0]) if a else 0
+    high = ORDER_DIGITS.index(b[0]) if b is not None else len(ORDER_DIGITS)
+    if high - low > 1:
+        return ORDER_DIGITS[(low + high) // 2]
+    # 首字符相邻：b 较长时直接取 b 的首字符，否则在 a 的首字符之后继续找
+    if b is not None and len(b) > 1:
+        return b[0]
+    return ORDER_DIGITS[low] + _midpoint(a[1:], None)
+
+def key_between(before=None, after=None):
+    """
+    生成排序位于 before 与 after 之间的排序键，None 表示列表开头或末尾
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"排序键 {before!r} 不小于 {after!r}")
+    return _midpoint(before or '', after)
+
+def keys_between(before, after, count):
+    """
+    生成 count 个位于 before 与 after 之间、均匀分布的排序键，键长随数量按对数增长
+    """
+    if count <= 0:
+        return []
+    middle = key_between(before, after)
+    left = count // 2
+    return keys_between(before, middle, left) + [middle] + keys_between(middle, after, count - left - 1)
+
+def _order_of(record):
+    return record.get("order") if hasattr(record, "get") else None
+
+def assign_order_keys(records, rebalance=False):
+    """
+    给同级列表中没有排序键的记录按当前列表顺序分配排序键，返回修改的记录数
+    分配结果只取决于列表内容，多个进程对同一份数据计算出相同的键；
+    rebalance 为 True 且存在过长的键或顺序错乱时整体重新分配
+    """
+    keys = [_order_of(record) for record in records]
+    if rebalance and any(key is not None and len(key) > MAX_ORDER_KEY_LENGTH for key in keys):
+        keys = [None] * len(keys)
+    # 已有的键必须保持递增，否则无法在它们之间插入
+    previous = None
+    for index, key in enumerate(keys):
+        if key is not None and previous is not None and key <= previous:
+            keys[index] = None
+        elif key is not None:
+            previous = key
+    changed = 0
+    index = 0
+    while index < len(records):
+        if keys[index] is not None:
+            index += 1
+            continue
+        end = index
+        while end < len(records) and keys[end] is None:
+            end += 1
+        before = keys[index - 1] if index > 0 else None
+        after = keys[end] if end < len(records) else None
+        for offset, key in enumerate(keys_between(before, after, end - index)):
+            records[index + offset]["order"] = key
+            keys[index + offset] = key
+            changed += 1
+        index = end
+    return changed
+
+def assign_all_order_keys(data, rebalance=False):
+    """
+    给目录中所有列表补全排序键，返回修改的记录数
+    """
+    changed = assign_order_keys(data["mainGroups"], rebalance)
+    for main_group in data["mainGroups"]:
+        changed += assign_order_keys(main_group["subGroups"], rebalance)
+        for sub_group in main_group["subGroups"]:
+            changed += assign_order_keys(sub_group["files"], rebalance)
+    return changed
+
+def sort_by_order(records):
+    """
+    按排序键原地排序同级列表，没有排序键的记录保持原顺序排在最后
+    """
+    records.sort(key=lambda record: (_order_of(record) is None, _order_of(record) or ''))
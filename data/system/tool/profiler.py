@@ -0,0 +1,87 @@
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from datetime import datetime
+from data.system.log.log import logger, get_log_dir
+
+# 设置该环境变量（如 KUUSOO_PROFILE=1）时启动即开始性能分析
+PROFILE_ENV_VAR = 'KUUSOO_PROFILE'
+# 内存快照中记录的分配位置数量
+TOP_ALLOCATIONS = 50
+# tracemalloc 为每次分配保存的调用栈深度
+TRACEMALLOC_FRAMES = 10
+
+# 当前的性能分析状态
+_profile_state = {"profiler": None, "started_tracemalloc": False, "started_at": None}
+
+def profiling_requested():
+    """
+    检查环境变量是否要求启动时开启性能分析
+    """
+    return os.environ.get(PROFILE_ENV_VAR, '').strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+def is_profiling():
+    return _profile_state["profiler"] is not None
+
+def start_profiling():
+    """
+    开始 cProfile 和 tracemalloc 采样，已在分析中时不做任何事
+    cProfile 只分析调用本函数的线程，应在主线程（Qt 事件循环所在线程）中调用
+    """
+    if is_profiling():
+        return
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        _profile_state["started_tracemalloc"] = True
+    profiler = cProfile.Profile()
+    profiler.enable()
+    _profile_state["profiler"] = profiler
+    _profile_state["started_at"] = datetime.now()
+    logger.info("开始性能分析（cProfile / tracemalloc）")
+
+def _write_memory_snapshot(snapshot, path, started_at):
+    statistics = snapshot.statistics('lineno')
+    current, peak = tracemalloc.get_traced_memory()
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(f"分析开始: {started_at:%Y-%m-%d %H:%M:%S}\n")
+        file.write(f"当前跟踪内存: {current / 1024:.1f} KiB，峰值: {peak / 1024:.1f} KiB\n")
+        file.write(f"分配最多的 {TOP_ALLOCATIONS} 个位置:\n")
+        for stat in statistics[:TOP_ALLOCATIONS]:
+            file.write(f"{stat}\n")
+
+def stop_profiling():
+    """
+    停止性能分析，把 cProfile 结果写入 .prof 文件、内存分配排行写入文本快照，
+    文件名带时间戳，保存在日志目录中；返回写入的文件路径列表，未在分析中时返回空列表
+    """
+    profiler = _profile_state["profiler"]
+    if profiler is None:
+        return []
+    profiler.disable()
+    _profile_state["profiler"] = None
+    log_dir = get_log_dir()
+    os.makedirs(log_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    prof_path = os.path.join(log_dir, f'profile_{stamp}.prof')
+    memory_path = os.path.join(log_dir, f'memory_{stamp}.txt')
+    paths = []
+    try:
+        profiler.dump_stats(prof_path)
+        paths.append(prof_path)
+        # 日志中记录耗时最多的函数，不用工具打开 .prof 也能先看个大概
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(15)
+        logger.info(f"性能分析结果已写入 {prof_path}\n{summary.getvalue()}")
+        if tracemalloc.is_tracing():
+            _write_memory_snapshot(tracemalloc.take_snapshot(), memory_path, _profile_state["started_at"])
+            paths.append(memory_path)
+            logger.info(f"内存分配快照已写入 {memory_path}")
+    except OSError as e:
+        logger.error(f"写入性能分析结果时出错: {e}")
+    finally:
+        if _profile_state["started_tracemalloc"]:
+            tracemalloc.stop()
+            _profile_state["started_tracemalloc"] = False
+    return paths
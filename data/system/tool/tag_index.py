@@ -0,0 +1,177 @@
+import re
+from collections import defaultdict
+
+# 查询语言的词法单元：tag:名称、AND、OR、NOT、括号
+TOKEN_PATTERN = re.compile(r'\s*(?:(\()|(\))|tag:([^\s()]+)|(AND|OR|NOT)\b|(\S+))', re.IGNORECASE)
+
+class TagQueryError(ValueError):
+    """
+    标签查询语法错误
+    """
+
+def tokenize(query):
+    tokens = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = TOKEN_PATTERN.match(query, position)
+        if match is None:
+            break
+        position = match.end()
+        lparen, rparen, tag, operator, unknown = match.groups()
+        if lparen:
+            tokens.append(('(', None))
+        elif rparen:
+            tokens.append((')', None))
+        elif tag:
+            tokens.append(('TAG', tag.lower()))
+        elif operator:
+            tokens.append((operator.upper(), None))
+        elif unknown:
+            raise TagQueryError(f"无法识别的查询内容: {unknown}")
+    return tokens
+
+def parse_query(query):
+    """
+    把查询字符串解析为语法树
+    语法: 表达式 := 与项 (OR 与项)*；与项 := 非项 ((AND)? 非项)*；非项 := NOT 非项 | tag:名称 | ( 表达式 )
+    相邻的项之间默认为 AND，例如 "tag:dev AND tag:db NOT tag:legacy"
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        raise TagQueryError("查询不能为空")
+    position = 0
+
+    def peek():
+        return tokens[position][0] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        token = tokens[position]
+        position += 1
+        return token
+
+    def parse_or():
+        node = parse_and()
+        while peek() == 'OR':
+            take()
+            node = ('OR', node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() in ('AND', 'NOT', 'TAG', '('):
+            if peek() == 'AND':
+                take()
+            node = ('AND', node, parse_not())
+        return node
+
+    def parse_not():
+        kind = peek()
+        if kind == 'NOT':
+            take()
+            return ('NOT', parse_not())
+        if kind == 'TAG':
+            return ('TAG', take()[1])
+        if kind == '(':
+            take()
+            node = parse_or()
+            if peek() != ')':
+                raise TagQueryError("缺少右括号")
+            take()
+            return node
+        raise TagQueryError("查询不完整" if kind is None else f"意外的 {kind}")
+
+    tree = parse_or()
+    if position != len(tokens):
+        raise TagQueryError(f"意外的 {tokens[position][0]}")
+    return tree
+
+class TagIndex:
+    """
+    标签倒排索引：标签 -> {id(文件条目): 文件条目}
+    按对象 ID 索引，无法转换为 FileEntry 的普通字典条目也能加入索引
+    添加、删除条目和修改标签时增量维护，查询只做集合运算
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.entries = {}
+        self._query_cache = {}
+
+    def build(self, data):
+        """
+        从目录数据重建索引，批量导入、合并外部修改等批量操作之后调用
+        """
+        self.postings.clear()
+        self.entries.clear()
+        for main_group in data["mainGroups"]:
+            for sub_group in main_group["subGroups"]:
+                for file in sub_group["files"]:
+                    self.add(file)
+
+    def add(self, file):
+        """
+        把一个文件条目加入索引，添加文件时调用，不必重建整个索引
+        """
+        self.entries[id(file)] = file
+        for tag in file.get("tags") or ():
+            self.postings[tag.lower()][id(file)] = file
+
+    def remove(self, file):
+        """
+        把一个文件条目移出索引，删除文件时调用
+        """
+        self.entries.pop(id(file), None)
+        for tag in file.get("tags") or ():
+            posting = self.postings.get(tag.lower())
+            if posting is not None:
+                posting.pop(id(file), None)
+                if not posting:
+                    del self.postings[tag.lower()]
+
+    def add_sub_group(self, sub_group):
+        """
+        把子分组中尚未索引的文件加入索引
+        """
+        for file in sub_group["files"]:
+            if id(file) not in self.entries:
+                self.add(file)
+
+    def remove_sub_group(self, sub_group):
+        for file in sub_group["files"]:
+            self.remove(file)
+
+    def set_tags(self, file, tags):
+        """
+        修改文件条目的标签并更新索引
+        """
+        self.remove(file)
+        file["tags"] = [tag.strip() for tag in tags if tag.strip()]
+        self.add(file)
+
+    def all_tags(self):
+        return sorted(self.postings)
+
+    def _evaluate(self, node):
+        """
+        返回匹配的文件条目 ID 集合
+        """
+        kind = node[0]
+        if kind == 'TAG':
+            return self.postings.get(node[1], {}).keys()
+        if kind == 'NOT':
+            return self.entries.keys() - self._evaluate(node[1])
+        left = self._evaluate(node[1])
+        right = self._evaluate(node[2])
+        return left & right if kind == 'AND' else left | right
+
+    def query(self, query):
+        """
+        执行标签查询，返回匹配的文件条目列表；语法错误时抛出 TagQueryError
+        """
+        tree = self._query_cache.get(query)
+        if tree is None:
+            tree = parse_query(query)
+            self._query_cache[query] = tree
+        return [self.entries[file_id] for file_id in self._evaluate(tree)]
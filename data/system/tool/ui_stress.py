@@ -0,0 +1,255 @@
+import json
+import os
+import random
+import tempfile
+import time
+from data.system.log.log import logger
+
+# 事件循环心跳间隔（毫秒），两次心跳的间隔超出该值的部分即为事件循环停顿
+HEARTBEAT_INTERVAL_MS = 1
+# 超过一帧（60Hz）的停顿计为卡顿
+STALL_THRESHOLD_MS = 16
+REPORT_PERCENTILES = (50, 90, 99)
+
+def percentile(samples, percent):
+    """
+    最近秩法计算百分位数，samples 为空时返回 0
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+def build_synthetic_catalog(main_groups=5, sub_groups=10, files=200):
+    """
+    生成合成目录数据，文件路径指向不存在的位置，不会被启动或读取
+    """
+    data = {"mainGroups": []}
+    for m in range(1, main_groups + 1):
+        main_group = {"id": m, "name": f"主分组{m}", "subGroups": []}
+        for s in range(1, sub_groups + 1):
+            main_group["subGroups"].append({
+                "id": s,
+                "name": f"子分组{m}-{s}",
+                "files": [
+                    {"id": f, "name": f"程序{m}-{s}-{f}.exe", "size": f"{f * 1024}B",
+                     "path": f"/synthetic/{m}/{s}/程序{m}-{s}-{f}.exe"}
+                    for f in range(1, files + 1)
+                ]
+            })
+        data["mainGroups"].append(main_group)
+    return data
+
+class StressRun:
+    """
+    在真实的 MainWindow 上注入合成事件，记录每个事件的处理耗时和事件循环的心跳间隔
+    每个合成事件在单独的定时器回调中发送，事件之间让出事件循环，帧定时器等延迟处理也计入停顿
+    """
+
+    def __init__(self, app, window, work_dir, rounds, seed=0):
+        from PyQt5.QtCore import QTimer, Qt
+        self.app = app
+        self.window = window
+        self.work_dir = work_dir
+        self.rounds = rounds
+        self.random = random.Random(seed)
+        self.latencies = {}
+        self.gaps = []
+        self.last_beat = None
+        self.heartbeat = QTimer()
+        self.heartbeat.setTimerType(Qt.PreciseTimer)
+        self.heartbeat.timeout.connect(self.beat)
+        self.driver = QTimer()
+        self.driver.timeout.connect(self.step)
+        self.steps = self.scenarios()
+
+    def beat(self):
+        now = time.perf_counter()
+        if self.last_beat is not None:
+            self.gaps.append((now - self.last_beat) * 1000)
+        self.last_beat = now
+
+    def step(self):
+        """
+        执行一个合成事件并记录耗时，所有场景结束后退出事件循环
+        """
+        try:
+            scenario, action = next(self.steps)
+        except StopIteration:
+            self.driver.stop()
+            self.heartbeat.stop()
+            self.app.quit()
+            return
+        start = time.perf_counter()
+        action()
+        self.latencies.setdefault(scenario, []).append((time.perf_counter() - start) * 1000)
+
+    def send_mouse(self, widget, event_type, pos, button, buttons):
+        from PyQt5.QtCore import Qt
+        from PyQt5.QtGui import QMouseEvent
+        event = QMouseEvent(event_type, pos, widget.mapToGlobal(pos), button, buttons, Qt.NoModifier)
+        self.app.sendEvent(widget, event)
+
+    def hover_storm(self, list_widget):
+        """
+        在列表上随机位置连续移动鼠标，悬停会切换当前项（子分组列表上还会重建文件列表）
+        """
+        from PyQt5.QtCore import QEvent, QPoint, Qt
+        viewport = list_widget.viewport()
+        for _ in range(self.rounds * 10):
+            def move():
+                if list_widget.count() == 0:
+                    return
+                rect = list_widget.visualItemRect(list_widget.item(self.random.randrange(list_widget.count())))
+                pos = QPoint(rect.center().x(), max(0, min(rect.center().y(), viewport.height() - 1)))
+                self.send_mouse(viewport, QEvent.MouseMove, pos, Qt.NoButton, Qt.NoButton)
+            yield move
+
+    def group_switches(self):
+        """
+        快速切换主分组和子分组
+        """
+        for _ in range(self.rounds):
+            def switch():
+                main_count = self.window.main_group_list.count()
+                if main_count:
+                    self.window.main_group_list.setCurrentRow(self.random.randrange(main_count))
+                sub_count = self.window.sub_group_list.count()
+                if sub_count:
+                    self.window.sub_group_list.setCurrentRow(self.random.randrange(sub_count))
+            yield switch
+
+    def drag_resize(self):
+        """
+        从窗口中部拖动窗口、从右下角调整大小，每段按下、移动若干次后释放
+        """
+        from PyQt5.QtCore import QEvent, QPoint, Qt
+        window = self.window
+        for round_index in range(self.rounds // 5 + 1):
+            resize = round_index % 2 == 1
+            start = QPoint(window.width() - 2, window.height() - 2) if resize else QPoint(window.width() // 2, 5)
+            yield lambda start=start: self.send_mouse(window, QEvent.MouseButtonPress, start, Qt.LeftButton, Qt.LeftButton)
+            for offset in range(1, 31):
+                pos = start + QPoint(offset * 3 if resize else offset, offset * 2 if resize else offset)
+                yield lambda pos=pos: self.send_mouse(window, QEvent.MouseMove, pos, Qt.NoButton, Qt.LeftButton)
+            end = start + QPoint(90 if resize else 30, 60 if resize else 30)
+            yield lambda end=end: self.send_mouse(window, QEvent.MouseButtonRelease, end, Qt.LeftButton, Qt.NoButton)
+
+    def large_drops(self, batch_size):
+        """
+        向当前子分组拖入一批新文件；每轮使用不同的文件名，避免重复文件弹出提示框
+        """
+        from PyQt5.QtCore import QMimeData, QPoint, Qt, QUrl
+        from PyQt5.QtGui import QDropEvent
+        drop_dir = os.path.join(self.work_dir, 'drops')
+        os.makedirs(drop_dir, exist_ok=True)
+        for round_index in range(max(1, self.rounds // 20)):
+            paths = []
+            for index in range(batch_size):
+                path = os.path.join(drop_dir, f'drop_{round_index}_{index}.txt')
+                with open(path, 'wb') as file:
+                    file.write(b'x' * (index % 64))
+                paths.append(path)
+
+            def drop(paths=paths):
+                if self.window.main_group_list.currentRow() < 0:
+                    self.window.main_group_list.setCurrentRow(0)
+                if self.window.sub_group_list.currentRow() < 0:
+                    self.window.sub_group_list.setCurrentRow(0)
+                mime = QMimeData()
+                mime.setUrls([QUrl.fromLocalFile(path) for path in paths])
+                event = QDropEvent(QPoint(5, 5), Qt.CopyAction, mime, Qt.LeftButton, Qt.NoModifier)
+                # Qt 会丢弃不在拖放过程中的放下事件，这里直接调用真实拖放时执行的处理函数
+                self.window.file_list.dropEvent(event)
+            yield drop
+
+    def select_first_group(self):
+        """
+        启动后没有选中的分组，先选中第一个主分组和子分组，文件列表才有内容
+        """
+        self.window.main_group_list.setCurrentRow(0)
+        self.window.sub_group_list.setCurrentRow(0)
+
+    def scenarios(self, drop_batch=500):
+        yield "初始选择", self.select_first_group
+        for action in self.hover_storm(self.window.file_list):
+            yield "悬停（文件列表）", action
+        for action in self.hover_storm(self.window.sub_group_list):
+            yield "悬停（子分组列表）", action
+        for action in self.group_switches():
+            yield "分组切换", action
+        for action in self.drag_resize():
+            yield "拖动/调整大小", action
+        for action in self.large_drops(drop_batch):
+            yield "大批量拖入", action
+
+    def run(self):
+        self.heartbeat.start(HEARTBEAT_INTERVAL_MS)
+        self.driver.start(0)
+        self.app.exec_()
+
+def run_stress(rounds=200, main_groups=5, sub_groups=10, files=200, seed=0):
+    """
+    在离屏平台上用合成目录构造 MainWindow 并注入各类事件，返回
+    {"latencies": {场景: [毫秒]}, "gaps": [毫秒]}
+    数据文件、配置和启动历史都写入临时目录，不影响真实数据
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    from data.system.config.config import Config
+    from data.system.ui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication(['kuusoo-stress'])
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='kuusoo-stress-') as work_dir:
+        os.makedirs(os.path.join(work_dir, 'data', 'save'))
+        with open(os.path.join(work_dir, 'data', 'save', 'data.json'), 'w', encoding='utf-8') as file:
+            json.dump(build_synthetic_catalog(main_groups, sub_groups, files), file, ensure_ascii=False)
+        # 数据文件等使用相对路径，切换到临时目录后读写的都是合成数据
+        os.chdir(work_dir)
+        try:
+            config = Config(os.path.join(work_dir, 'config.json'))
+            config.update({'prefetch_enabled': False, 'catalog_poll_interval_ms': 0, 'health_check_interval_min': 0})
+            window = MainWindow(config=config)
+            window.show()
+            # 目录数据在后台加载，加载完成后再开始注入事件
+            while not window.catalog_loaded:
+                app.processEvents()
+                time.sleep(0.001)
+            logger.info(f"开始界面压力测试：{main_groups} 个主分组，每个 {sub_groups} 个子分组，每个 {files} 个文件")
+            stress = StressRun(app, window, work_dir, rounds, seed)
+            stress.run()
+            window.hide()
+            window.deleteLater()
+            return {"latencies": stress.latencies, "gaps": stress.gaps}
+        finally:
+            os.chdir(original_dir)
+
+def _format_row(label, samples):
+    columns = "  ".join(f"p{p}={percentile(samples, p):8.2f}" for p in REPORT_PERCENTILES)
+    return f"  {label:<16} n={len(samples):<6} {columns}  max={max(samples, default=0):8.2f}"
+
+def format_stress_report(result):
+    """
+    生成百分位报告（毫秒）：每类事件的处理耗时，以及事件循环的心跳间隔和卡顿次数
+    """
+    lines = ["事件处理耗时 (ms):"]
+    for scenario, samples in result["latencies"].items():
+        lines.append(_format_row(scenario, samples))
+    gaps = result["gaps"]
+    stalls = [gap for gap in gaps if gap > STALL_THRESHOLD_MS]
+    lines.append("事件循环心跳间隔 (ms):")
+    lines.append(_format_row("心跳", gaps))
+    lines.append(f"  超过 {STALL_THRESHOLD_MS}ms 的停顿: {len(stalls)} 次，累计 {sum(stalls):.1f}ms")
+    return "\n".join(lines)
+
+def check_budget(result, budget_ms):
+    """
+    检查每类事件的 p99 耗时是否超出预算，返回超出预算的 [(场景, p99)]，可用于拦截性能回退
+    """
+    return [
+        (scenario, percentile(samples, 99))
+        for scenario, samples in result["latencies"].items()
+        if percentile(samples, 99) > budget_ms
+    ]
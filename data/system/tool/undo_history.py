@@ -0,0 +1,149 @@
+from collections import deque
+from data.system.log.log import logger
+from data.system.tool.catalog_sync import insert_record, delete_record, move_record, record_position
+from data.system.tool.data_persistence import save_changes
+
+# 撤销历史中被删除记录的总数上限（主分组连同其子分组和文件都计入），超出时丢弃最早的操作
+UNDO_MAX_RECORDS = 100000
+
+def change_weight(change):
+    """
+    返回修改持有的记录数：删除后保存在历史中的记录连同子记录计入，只记录键的修改计为 1
+    """
+    if change["op"] == "batch":
+        return sum(change_weight(item) for item in change["changes"])
+    record = change.get("record")
+    if record is None:
+        return 1
+    if "subGroups" in record:
+        return 1 + sum(1 + len(sub_group["files"]) for sub_group in record["subGroups"])
+    if "files" in record:
+        return 1 + len(record["files"])
+    return 1
+
+def apply_change(data, change):
+    """
+    应用一条修改（原地修改 data），返回 (逆操作, 增量日志记录列表, 是否给其他记录补充了排序键)，
+    记录或父记录已不存在时返回 None。修改的格式：
+    {"op": "insert", "key": 记录键, "record": 记录, "index": 位置}，ID 冲突时重新编号；
+    {"op": "delete", "key": 记录键, "name": 名称（可选，名称不同时不删除）}；
+    {"op": "move", "key": 记录键, "parent": 父记录, "index": 位置, "id": 希望使用的 ID（可选）}，
+    参数同 catalog_sync.move_record；
+    {"op": "batch", "changes": [修改]}，按顺序应用，逆操作按相反顺序撤销
+    被删除的记录直接保存在逆操作中，不复制
+    """
+    op = change["op"]
+    if op == "insert":
+        key = insert_record(data, change["key"], change["record"], change.get("index"), renumber=True)
+        if key is None:
+            return None
+        inverse = {"op": "delete", "key": key, "name": change["record"]["name"]}
+        return inverse, [{"op": "insert", "key": list(key), "record": change["record"]}], False
+    if op == "delete":
+        key = tuple(change["key"])
+        index, record = delete_record(data, key, change.get("name"))
+        if record is None:
+            return None
+        return {"op": "insert", "key": key, "record": record, "index": index}, [{"op": "delete", "key": list(key)}], False
+    if op == "move":
+        key = tuple(change["key"])
+        index = record_position(data, key)
+        if index is None:
+            return None
+        move, rekeyed = move_record(data, key, change["parent"], change["index"], change.get("id"))
+        if move is None:
+            return None
+        inverse = {"op": "move", "key": tuple(move["to"]), "parent": key[1:-1], "index": index, "id": key[-1]}
+        return inverse, [move], rekeyed
+    if op == "batch":
+        inverses, entries, rekeyed = [], [], False
+        for item in change["changes"]:
+            result = apply_change(data, item)
+            if result is None:
+                continue
+            inverses.insert(0, result[0])
+            entries.extend(result[1])
+            rekeyed = rekeyed or result[2]
+        if not inverses:
+            return None
+        return {"op": "batch", "changes": inverses}, entries, rekeyed
+    raise ValueError(f"未知的修改类型: {op}")
+
+class UndoHistory:
+    """
+    目录修改的撤销/重做历史，只保存逆操作（删除 ↔ 在原位置重新插入，添加 ↔ 删除，移动 ↔ 移回），
+    不保存整个目录的副本；撤销和重做只把受影响的记录写入增量日志
+    历史按操作数 limit 和持有的记录数 max_records 限制内存，超出时丢弃最早的操作
+    """
+
+    def __init__(self, limit=50, max_records=UNDO_MAX_RECORDS):
+        self.limit = limit
+        self.max_records = max_records
+        # 栈中的元素为 (说明, 逆操作, 记录数)
+        self.undo_stack = deque()
+        self.redo_stack = deque()
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def undo_label(self):
+        return self.undo_stack[-1][0] if self.undo_stack else None
+
+    def redo_label(self):
+        return self.redo_stack[-1][0] if self.redo_stack else None
+
+    def _push(self, stack, label, inverse):
+        stack.append((label, inverse, change_weight(inverse)))
+        while stack and (len(stack) > self.limit or sum(item[2] for item in stack) > self.max_records):
+            dropped = stack.popleft()
+            logger.info(f"撤销历史已满，丢弃最早的操作: {dropped[0]}")
+
+    def record(self, label, inverse):
+        """
+        记录一次已完成并已保存的修改，inverse 为撤销它的修改；新的修改会清空重做历史
+        """
+        self._push(self.undo_stack, label, inverse)
+        self.redo_stack.clear()
+
+    def perform(self, data, label, change):
+        """
+        应用修改、只保存受影响的记录并记入撤销历史，返回逆操作，记录已不存在时返回 None
+        """
+        result = apply_change(data, change)
+        if result is None:
+            logger.warning(f"{label} 失败：记录已不存在")
+            return None
+        inverse, entries, rekeyed = result
+        save_changes(data, entries, rekeyed)
+        self.record(label, inverse)
+        return inverse
+
+    def _replay(self, data, source, target, action):
+        if not source:
+            return None
+        label, change, _ = source.pop()
+        result = apply_change(data, change)
+        if result is None:
+            # 记录已被其他进程删除或移动，这一步无法再撤销或重做
+            logger.warning(f"无法{action}“{label}”：记录已不存在")
+            return None
+        inverse, entries, rekeyed = result
+        save_changes(data, entries, rekeyed)
+        self._push(target, label, inverse)
+        logger.info(f"已{action}: {label}")
+        return label
+
+    def undo(self, data):
+        """
+        撤销最近一次修改，返回其说明，没有可撤销的修改或撤销失败时返回 None
+        """
+        return self._replay(data, self.undo_stack, self.redo_stack, "撤销")
+
+    def redo(self, data):
+        """
+        重做最近一次撤销的修改，返回其说明，没有可重做的修改或重做失败时返回 None
+        """
+        return self._replay(data, self.redo_stack, self.undo_stack, "重做")
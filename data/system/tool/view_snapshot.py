@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+from data.system.log.log import logger
+from data.system.tool.data_persistence import load_data
+
+VIEW_SNAPSHOT_PATH = 'data/save/view_snapshot.json'
+# 每个列表最多保存的可见行数
+MAX_SNAPSHOT_ROWS = 200
+
+def load_view_snapshot():
+    """
+    读取上次退出时的界面快照，不存在或格式错误时返回 None
+    快照很小，启动时同步读取，不必等待完整的目录数据
+    """
+    try:
+        with open(VIEW_SNAPSHOT_PATH, 'r', encoding='utf-8') as file:
+            snapshot = json.load(file)
+        if isinstance(snapshot, dict):
+            return snapshot
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"读取界面快照 {VIEW_SNAPSHOT_PATH} 失败: {e}")
+    return None
+
+def save_view_snapshot(snapshot):
+    """
+    写入界面快照，先写临时文件再替换
+    """
+    try:
+        snapshot_dir = os.path.dirname(VIEW_SNAPSHOT_PATH)
+        os.makedirs(snapshot_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=snapshot_dir, prefix='.view_snapshot.', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(snapshot, file, ensure_ascii=False)
+        os.replace(tmp_path, VIEW_SNAPSHOT_PATH)
+        logger.info(f"界面快照已保存到 {VIEW_SNAPSHOT_PATH}")
+    except OSError as e:
+        logger.error(f"保存界面快照 {VIEW_SNAPSHOT_PATH} 失败: {e}")
+
+class CatalogLoader(QObject):
+    """
+    在后台线程中加载目录数据，完成后通过 loaded 信号把数据交回 GUI 线程
+    """
+    loaded = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=lambda: self.loaded.emit(load_data()), daemon=True)
+        self._thread.start()
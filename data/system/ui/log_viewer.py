@@ -0,0 +1,232 @@
+import os
+import threading
+from array import array
+from PyQt5.QtCore import Qt, QObject, QAbstractListModel, QModelIndex, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QComboBox, QLineEdit, QCheckBox,
+                             QListView, QLabel)
+from data.system.log.log import logger, get_log_dir
+from data.system.tool.log_analytics import LOG_FILE_PATTERN
+from data.system.tool.mapped_log import MappedLog, LOG_LEVELS, LEVEL_MARKER, scan_lines, complete_end
+
+# 检查日志文件增长的间隔（毫秒）
+FOLLOW_INTERVAL_MS = 1000
+LEVEL_COLORS = {'WARNING': QColor('#b36b00'), 'ERROR': QColor('#c00000'), 'CRITICAL': QColor('#c00000')}
+
+class LogScanner(QObject):
+    """
+    在后台线程中扫描日志的行首偏移（可带过滤条件），分批通过 batch 信号交回 GUI 线程
+    每次扫描带有代号，过滤条件改变后旧扫描的结果会被丢弃
+    """
+    batch = pyqtSignal(int, object)
+    finished = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = None
+        self._cancel = threading.Event()
+        self.generation = 0
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, mapped, start, end, level=None, text=None, new_generation=False):
+        """
+        扫描 [start, end) 范围，new_generation 为 True 时取消正在进行的扫描并开始新的一代
+        """
+        if new_generation:
+            self._cancel.set()
+            self.generation += 1
+            self._cancel = threading.Event()
+        generation = self.generation
+        cancel = self._cancel
+
+        def run():
+            for offsets in scan_lines(mapped, start, end, level, text, cancel):
+                self.batch.emit(generation, array('Q', offsets))
+            if not cancel.is_set():
+                self.finished.emit(generation, end)
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+class LogLineModel(QAbstractListModel):
+    """
+    虚拟列表模型：只保存行首偏移，视图请求某一行时才从映射中读取并解码
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.log = None
+        self.offsets = array('Q')
+
+    def reset(self, log):
+        self.beginResetModel()
+        self.log = log
+        self.offsets = array('Q')
+        self.endResetModel()
+
+    def append_offsets(self, offsets):
+        if not offsets:
+            return
+        first = len(self.offsets)
+        self.beginInsertRows(QModelIndex(), first, first + len(offsets) - 1)
+        self.offsets.extend(offsets)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.offsets)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self.log is None:
+            return None
+        if role == Qt.DisplayRole:
+            return self.log.line_at(self.offsets[index.row()])
+        if role == Qt.ForegroundRole:
+            line = self.log.line_at(self.offsets[index.row()])
+            for level, color in LEVEL_COLORS.items():
+                if LEVEL_MARKER.format(level) in line:
+                    return color
+        return None
+
+class LogViewerWindow(QDialog):
+    """
+    日志查看窗口：按天选择日志文件，按级别和消息子串过滤，可跟随文件的新增内容
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("日志")
+        self.resize(900, 600)
+        self.log = None
+        # 已扫描到的字节位置，跟随文件时只扫描此后新增的内容
+        self.scanned_end = 0
+
+        self.file_combo = QComboBox()
+        self.level_combo = QComboBox()
+        self.level_combo.addItem("全部级别", None)
+        for level in LOG_LEVELS:
+            self.level_combo.addItem(level, level)
+        self.text_input = QLineEdit()
+        self.text_input.setPlaceholderText("按消息内容过滤")
+        self.follow_checkbox = QCheckBox("跟随")
+        self.follow_checkbox.setChecked(True)
+        self.status_label = QLabel()
+
+        self.model = LogLineModel(self)
+        self.view = QListView()
+        # 所有行等高，视图不必逐行计算尺寸，只绘制可见的行
+        self.view.setUniformItemSizes(True)
+        self.view.setModel(self.model)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(self.file_combo, 2)
+        filter_layout.addWidget(self.level_combo, 1)
+        filter_layout.addWidget(self.text_input, 3)
+        filter_layout.addWidget(self.follow_checkbox)
+        layout = QVBoxLayout()
+        layout.addLayout(filter_layout)
+        layout.addWidget(self.view)
+        layout.addWidget(self.status_label)
+        self.setLayout(layout)
+
+        self.scanner = LogScanner(self)
+        self.scanner.batch.connect(self.on_scan_batch)
+        self.scanner.finished.connect(self.on_scan_finished)
+        # 输入过滤文字时稍作延迟再重新扫描
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(300)
+        self.filter_timer.timeout.connect(self.rescan)
+        self.follow_timer = QTimer(self)
+        self.follow_timer.timeout.connect(self.follow_file)
+        self.follow_timer.start(FOLLOW_INTERVAL_MS)
+
+        self.load_file_list()
+        self.file_combo.currentIndexChanged.connect(self.open_selected_file)
+        self.level_combo.currentIndexChanged.connect(self.rescan)
+        self.text_input.textChanged.connect(lambda _text: self.filter_timer.start())
+        self.follow_checkbox.toggled.connect(lambda checked: checked and self.view.scrollToBottom())
+        self.open_selected_file()
+
+    def load_file_list(self):
+        """
+        列出日志目录中的日志文件，最新的在前
+        """
+        log_dir = get_log_dir()
+        names = sorted((name for name in os.listdir(log_dir) if LOG_FILE_PATTERN.match(name)), reverse=True) \
+            if os.path.isdir(log_dir) else []
+        for name in names:
+            self.file_combo.addItem(name, os.path.join(log_dir, name))
+
+    def open_selected_file(self, _index=None):
+        path = self.file_combo.currentData()
+        if not path:
+            return
+        try:
+            self.log = MappedLog(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"打开日志文件 {path} 失败: {e}")
+            self.log = None
+        self.rescan()
+
+    def current_filter(self):
+        return self.level_combo.currentData(), self.text_input.text() or None
+
+    def rescan(self, _index=None):
+        """
+        过滤条件或文件改变后从头扫描
+        """
+        self.model.reset(self.log)
+        self.scanned_end = 0
+        if self.log is None or self.log.map is None:
+            self.scanner.cancel()
+            self.update_status()
+            return
+        end = complete_end(self.log.map, self.log.size)
+        level, text = self.current_filter()
+        self.scanner.start(self.log.map, 0, end, level, text, new_generation=True)
+        self.update_status(scanning=True)
+
+    def on_scan_batch(self, generation, offsets):
+        if generation != self.scanner.generation:
+            return
+        self.model.append_offsets(offsets)
+        self.update_status(scanning=True)
+
+    def on_scan_finished(self, generation, end):
+        if generation != self.scanner.generation:
+            return
+        self.scanned_end = end
+        # 每次扫描结束时滚动一次，逐批滚动会让视图反复重新布局
+        if self.follow_checkbox.isChecked():
+            self.view.scrollToBottom()
+        self.update_status()
+
+    def follow_file(self):
+        """
+        定时检查日志文件是否增长，只扫描新增的完整行
+        """
+        if self.log is None or self.scanner.is_running():
+            return
+        if self.log.refresh():
+            # 文件被截断或替换，从头开始
+            self.rescan()
+            return
+        end = complete_end(self.log.map, self.log.size)
+        if end > self.scanned_end:
+            level, text = self.current_filter()
+            self.scanner.start(self.log.map, self.scanned_end, end, level, text)
+
+    def update_status(self, scanning=False):
+        size_mb = self.log.size / (1024 * 1024) if self.log is not None else 0
+        state = "，扫描中…" if scanning else ""
+        self.status_label.setText(f"{self.model.rowCount()} 行，文件大小 {size_mb:.1f} MB{state}")
+
+    def closeEvent(self, event):
+        self.follow_timer.stop()
+        self.scanner.cancel()
+        super().closeEvent(event)
@@ -1,12 +1,24 @@
 import sys
 import os
-from PyQt5.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QHBoxLayout, QPushButton, QListWidget, QFileDialog
-from PyQt5.QtCore import Qt, QMimeData, pyqtSignal
-from PyQt5.QtGui import QDragEnterEvent, QDropEvent, QMouseEvent
+from PyQt5.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QHBoxLayout, QPushButton, QListWidget, QFileDialog, QAbstractItemView
+from PyQt5.QtCore import Qt, QMimeData, QTimer, pyqtSignal
+from PyQt5.QtGui import QDragEnterEvent, QDropEvent, QMouseEvent, QKeySequence
 from data.system.log.log import logger
-from data.system.tool.data_persistence import load_data, save_data
+from data.system.tool.data_persistence import save_data, reload_if_changed
+from data.system.tool.catalog_sync import find_record
+from data.system.tool.undo_history import UndoHistory
 from data.system.tool.group_management import add_main_group, add_sub_group
-from data.system.tool.file_management import add_files, handle_file_drop
+from data.system.tool.file_management import add_files
+from data.system.tool.file_hash import DuplicateChecker
+from data.system.tool.file_entry import make_file_entry
+from data.system.tool.launch_prefetch import record_launch, get_launch_count, get_top_targets, start_prefetch
+from data.system.tool.app_importer import import_system_applications
+from data.system.tool.launch_scheduler import LaunchScheduler, launch_path
+from data.system.tool.launch_plan import get_launch_target, refresh_launch_plans
+from data.system.tool.health_check import HealthChecker, fix_catalog, report_problems
+from data.system.tool.tag_index import TagIndex, TagQueryError
+from data.system.tool.profiler import is_profiling, start_profiling, stop_profiling
+from data.system.tool.view_snapshot import load_view_snapshot, save_view_snapshot, CatalogLoader, MAX_SNAPSHOT_ROWS
 from data.system.tool.config_management import load_config, save_config
 
 class HoverListWidget(QListWidget):
@@ -19,6 +31,36 @@ class HoverListWidget(QListWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMouseTracking(True)
+        # 开始拖动时的行号，放下时据此确定被移动的项
+        self.drag_row = -1
+
+    def enable_reorder(self):
+        """
+        允许拖动列表项，放下时由主窗口修改数据后刷新列表，列表本身不移动项
+        """
+        self.setDragEnabled(True)
+        self.setAcceptDrops(True)
+        self.setDropIndicatorShown(True)
+        self.setDragDropMode(QAbstractItemView.DragDrop)
+        self.setDefaultDropAction(Qt.MoveAction)
+
+    def startDrag(self, supported_actions):
+        self.drag_row = self.currentRow()
+        super().startDrag(supported_actions)
+
+    def drop_row(self, pos):
+        """
+        返回放下位置对应的插入行号：落在项的前半部分插入到该项之前，后半部分插入到之后
+        """
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return self.count()
+        rect = self.visualRect(index)
+        if self.flow() == QListWidget.LeftToRight:
+            after = pos.x() > rect.center().x()
+        else:
+            after = pos.y() > rect.center().y()
+        return index.row() + 1 if after else index.row()
 
     def mouseMoveEvent(self, event: QMouseEvent):
         """
@@ -33,15 +75,23 @@ class HoverListWidget(QListWidget):
 class MainWindow(QMainWindow):
     def __init__(self, config):
         super().__init__()
-        self.config = config  # 接收传入的配置字典
+        self.config = config if config is not None else load_config()  # 接收传入的统一配置对象
         """
         初始化主窗口
         """
         super().__init__()  # 确保在初始化逻辑开始时调用父类的 __init__ 方法
         try:
             logger.info("开始初始化主窗口")
-            self.data = load_data()
-            self.config = load_config()
+            # 目录数据在后台线程中加载，加载完成前先显示上次退出时的界面快照
+            self.data = {"mainGroups": []}
+            self.catalog_loaded = False
+            self.view_snapshot = load_view_snapshot()
+            # 标签倒排索引，保存的标签查询显示为虚拟子分组
+            self.tag_index = TagIndex()
+            # 目录修改的撤销/重做历史，只保存逆操作
+            self.undo_history = UndoHistory(self.config.get('undo_history_size', 50))
+            # 文件列表当前显示的文件条目，按行号对应
+            self.displayed_files = []
             # 设置最小大小
             self.setMinimumSize(300, 300)
             # 初始化调整大小相关属性
@@ -50,8 +100,31 @@ class MainWindow(QMainWindow):
             self.mouse_press_pos = None
             self.original_size = None
             self.original_pos = None
+            # 拖动和调整大小按屏幕刷新率合并处理，每帧最多更新一次窗口几何
+            self.pending_mouse_pos = None
+            self.cursor_direction = None
+            self.frame_interval = self.get_frame_interval()
+            self.frame_timer = QTimer(self)
+            self.frame_timer.setSingleShot(True)
+            self.frame_timer.timeout.connect(self.apply_pending_mouse_move)
             self.init_ui()
-            self.load_groups_to_ui()
+            # 目录数据加载完成前列表不响应鼠标，没有快照时同样如此，避免操作空的占位数据
+            for list_widget in (self.main_group_list, self.sub_group_list, self.file_list):
+                list_widget.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+            self.resize(self.config['window_width'], self.config['window_height'])
+            if self.view_snapshot:
+                self.paint_view_snapshot(self.view_snapshot)
+            self.update_hit_test_geometry()
+            # 订阅配置变化，设置窗口修改配置后自动应用
+            self.config.subscribe('window_width', self.apply_window_size)
+            self.config.subscribe('window_height', self.apply_window_size)
+            self.config.subscribe('sub_group_ratio', self.apply_sub_group_ratio)
+            # 按内容去重时在后台计算哈希，完成后再添加文件
+            self.duplicate_checker = DuplicateChecker(self)
+            self.duplicate_checker.checked.connect(self.on_duplicates_checked)
+            self.catalog_loader = CatalogLoader(self)
+            self.catalog_loader.loaded.connect(self.on_catalog_loaded)
+            self.catalog_loader.start()
             logger.info("主窗口初始化完成")
         except Exception as e:
             logger.error(f"主窗口初始化失败: {e}")
@@ -61,6 +134,42 @@ class MainWindow(QMainWindow):
         self.main_group_list.currentRowChanged.connect(self.on_main_group_changed)
         self.sub_group_list.currentRowChanged.connect(self.on_sub_group_changed)
 
+        # 拖动排序：列表内拖动调整顺序，文件拖到子分组、子分组拖到主分组上移动到该分组
+        for list_widget in (self.main_group_list, self.sub_group_list, self.file_list):
+            list_widget.enable_reorder()
+        self.main_group_list.dragEnterEvent = self.group_list_dragEnterEvent
+        self.main_group_list.dragMoveEvent = self.main_group_list_dragMoveEvent
+        self.main_group_list.dropEvent = self.main_group_list_dropEvent
+        self.sub_group_list.dragEnterEvent = self.group_list_dragEnterEvent
+        self.sub_group_list.dragMoveEvent = self.sub_group_list_dragMoveEvent
+        self.sub_group_list.dropEvent = self.sub_group_list_dropEvent
+
+        # 撤销/重做目录修改（Ctrl+Z / Ctrl+Y）
+        from PyQt5.QtWidgets import QShortcut
+        QShortcut(QKeySequence.Undo, self, self.undo_catalog_change)
+        QShortcut(QKeySequence.Redo, self, self.redo_catalog_change)
+
+        # 定时检查数据文件是否被其他启动器窗口修改，未修改时只有一次 stat
+        self.catalog_poll_timer = QTimer(self)
+        self.catalog_poll_timer.timeout.connect(self.poll_catalog_changes)
+        if self.config.get('catalog_poll_interval_ms', 0) > 0:
+            self.catalog_poll_timer.start(self.config['catalog_poll_interval_ms'])
+
+        # 健康检查在后台线程运行，可按配置定时执行
+        self.health_checker = HealthChecker(self)
+        self.health_checker.finished.connect(self.on_health_check_finished)
+        self.health_check_manual = False
+        # 上一次检查发现的问题，定时检查只在问题变化时提示
+        self.health_check_problems = frozenset()
+        self.health_check_timer = QTimer(self)
+        self.health_check_timer.timeout.connect(lambda: self.run_health_check(manual=False))
+        if self.config.get('health_check_interval_min', 0) > 0:
+            self.health_check_timer.start(self.config['health_check_interval_min'] * 60 * 1000)
+
+        # 启动完成后在后台预读最常用的启动目标
+        if self.config.get('prefetch_enabled', False):
+            QTimer.singleShot(self.config.get('prefetch_delay_ms', 3000), self.prefetch_top_targets)
+
     def init_ui(self):
         """
         初始化用户界面
@@ -207,6 +316,7 @@ class MainWindow(QMainWindow):
         self.file_list.customContextMenuRequested.connect(self.show_file_context_menu)
         self.file_list.setAcceptDrops(True)
         self.file_list.doubleClicked.connect(self.open_file)
+        self.file_list.hovered.connect(self.on_file_hovered)
         self.file_list.dragEnterEvent = self.file_list_dragEnterEvent
         self.file_list.dragMoveEvent = self.file_list_dragMoveEvent
         self.file_list.dropEvent = self.file_list_dropEvent
@@ -232,7 +342,7 @@ class MainWindow(QMainWindow):
 
     def show_settings_window(self):
         # 初始化设置窗口
-        from PyQt5.QtWidgets import QDialog, QFormLayout, QLineEdit, QVBoxLayout, QPushButton
+        from PyQt5.QtWidgets import QDialog, QFormLayout, QLineEdit, QVBoxLayout, QPushButton, QCheckBox
         from PyQt5.QtCore import Qt
 
         class SettingsWindow(QDialog):
@@ -247,7 +357,7 @@ class MainWindow(QMainWindow):
                 self.main_height_input = QLineEdit(str(self.parent().height()))
 
                 # 比例输入
-                self.sub_group_ratio_input = QLineEdit("20")
+                self.sub_group_ratio_input = QLineEdit(str(self.parent().config['sub_group_ratio']))
 
                 # 表单布局
                 form_layout = QFormLayout()
@@ -260,6 +370,12 @@ class MainWindow(QMainWindow):
                 form_layout.addRow("主窗口高度 (最小300):", self.main_height_input)
                 # form_layout.addRow("子分组列表宽度比例:", self.sub_group_ratio_input)
 
+                # 性能分析开关，立即生效，关闭时把结果写入日志目录
+                self.profile_checkbox = QCheckBox("性能分析（cProfile / tracemalloc）")
+                self.profile_checkbox.setChecked(is_profiling())
+                self.profile_checkbox.toggled.connect(self.toggle_profiling)
+                form_layout.addRow(self.profile_checkbox)
+
                 # 保存按钮
                 save_btn = QPushButton("保存并应用")
                 save_btn.clicked.connect(self.save_settings)
@@ -268,8 +384,13 @@ class MainWindow(QMainWindow):
                 author_btn = QPushButton("作者")
                 author_btn.clicked.connect(self.show_author_info)
 
+                # 日志查看按钮
+                log_btn = QPushButton("查看日志")
+                log_btn.clicked.connect(self.show_log_viewer)
+
                 self.layout.addLayout(form_layout)
                 self.layout.addWidget(save_btn)
+                self.layout.addWidget(log_btn)
                 self.layout.addWidget(author_btn)
                 self.setLayout(self.layout)
                 
@@ -291,6 +412,27 @@ class MainWindow(QMainWindow):
                 # 仅显示链接，不自动打开
                  # 用户可自行点击对话框中的链接
 
+            def show_log_viewer(self):
+                """
+                打开日志查看窗口，作为设置窗口的子窗口不会被模态设置窗口阻挡
+                """
+                from data.system.ui.log_viewer import LogViewerWindow
+                viewer = LogViewerWindow(self)
+                viewer.setAttribute(Qt.WA_DeleteOnClose)
+                viewer.show()
+
+            def toggle_profiling(self, checked):
+                """
+                开始或停止性能分析，停止时提示结果文件的位置
+                """
+                if checked:
+                    start_profiling()
+                    return
+                paths = stop_profiling()
+                if paths:
+                    from PyQt5.QtWidgets import QMessageBox
+                    QMessageBox.information(self, '性能分析', '分析结果已保存:\n' + '\n'.join(paths))
+
             def save_settings(self):
                 # 实时更新主窗口尺寸
                 try:
@@ -302,7 +444,6 @@ class MainWindow(QMainWindow):
                         from PyQt5.QtWidgets import QMessageBox
                         QMessageBox.warning(self, '输入错误', '主窗口尺寸必须为数字', QMessageBox.Ok)
                         return
-                    self.parent().resize(new_width, new_height)
 
                     # 验证子分组比例输入为数字
                     try:
@@ -311,43 +452,22 @@ class MainWindow(QMainWindow):
                         from PyQt5.QtWidgets import QMessageBox
                         QMessageBox.warning(self, '输入错误', '子分组比例必须为数字', QMessageBox.Ok)
                         return
-                    file_ratio = 100 - sub_ratio
-                    # 保存子分组比例到配置
-                    # 保存子分组比例到配置并持久化
-                    self.parent().config['sub_group_ratio'] = sub_ratio
-                    # 写入配置文件（字典方式）
-                    self.parent().config['sub_group_ratio'] = sub_ratio
-                    logger.info(f"保存比例设置：子分组比例{sub_ratio}%，文件列表比例{file_ratio}%")
-                    if sub_ratio + file_ratio != 100:
+                    # 验证比例范围
+                    if not (0 <= sub_ratio <= 100):
                         from PyQt5.QtWidgets import QMessageBox
-                        QMessageBox.warning(self, '输入错误', '子分组列表与文件列表的宽度比例和必须为100%', QMessageBox.Ok)
+                        QMessageBox.warning(self, '输入错误', '子分组比例必须在0-100之间', QMessageBox.Ok)
                         return
+                    file_ratio = 100 - sub_ratio
+                    logger.info(f"保存比例设置：子分组比例{sub_ratio}%，文件列表比例{file_ratio}%")
 
-                    # 检查 splitter 属性是否存在
-                    if hasattr(self.parent(), 'splitter'):
-                        # 更新分隔条比例
-                        self.parent().splitter.setStretchFactor(0, sub_ratio)
-                        self.parent().splitter.setStretchFactor(1, file_ratio)
-
-                        # 强制更新布局以获取最新宽度
-                        self.parent().splitter.update()
-                        # 获取分隔条实际可用宽度（扣除边距）
-                        total_width = self.parent().splitter.width() - 10  # 减去10像素边距
-                        # 验证比例范围
-                        if not (0 <= sub_ratio <= 100):
-                            from PyQt5.QtWidgets import QMessageBox
-                            QMessageBox.warning(self, '输入错误', '子分组比例必须在0-100之间', QMessageBox.Ok)
-                            return
-                        # 计算并设置尺寸
-                        sub_width = int(total_width * sub_ratio / 100)
-                        file_width = total_width - sub_width  # 确保总宽度准确
-                        self.parent().splitter.setSizes([sub_width, file_width])
-                    else:
-                        logger.error('MainWindow 实例中不存在 splitter 属性')
-                        from PyQt5.QtWidgets import QMessageBox
-                        QMessageBox.warning(self, '设置失败', '无法找到分隔条控件，请检查程序配置。', QMessageBox.Ok)
-                        return
-                    logger.info(f"比例设置保存完成：子分组宽度{sub_width}px，文件列表宽度{file_width}px")
+                    # 写入统一配置，由主窗口的订阅回调应用窗口尺寸和分隔条比例，配置文件延迟自动保存
+                    self.parent().config.update({
+                        'window_width': new_width,
+                        'window_height': new_height,
+                        'sub_group_ratio': sub_ratio
+                    })
+                    # 配置未变化时不会触发回调，这里确保窗口尺寸与输入一致
+                    self.parent().apply_window_size()
 
                     logger.info(f"设置更新：主窗口尺寸{new_width}x{new_height}，比例{sub_ratio}:{file_ratio}")
                     self.accept()
@@ -363,6 +483,137 @@ class MainWindow(QMainWindow):
         logger.info(f"打开设置窗口，当前主窗口尺寸：{current_width}x{current_height}，子分组默认比例：{default_sub_ratio}%")
         self.settings_window.show()
 
+    def apply_window_size(self, _value=None):
+        """
+        按配置应用主窗口尺寸
+        """
+        self.resize(self.config['window_width'], self.config['window_height'])
+        logger.info(f"应用窗口尺寸配置：{self.config['window_width']}x{self.config['window_height']}")
+
+    def apply_sub_group_ratio(self, sub_ratio):
+        """
+        按配置应用子分组列表与文件列表的宽度比例
+        """
+        file_ratio = 100 - sub_ratio
+        # 更新分隔条比例
+        self.splitter.setStretchFactor(0, sub_ratio)
+        self.splitter.setStretchFactor(1, file_ratio)
+        # 获取分隔条实际可用宽度（扣除边距）
+        total_width = self.splitter.width() - 10  # 减去10像素边距
+        # 计算并设置尺寸
+        sub_width = int(total_width * sub_ratio / 100)
+        file_width = total_width - sub_width  # 确保总宽度准确
+        self.splitter.setSizes([sub_width, file_width])
+        logger.info(f"比例设置应用完成：子分组宽度{sub_width}px，文件列表宽度{file_width}px")
+
+    def closeEvent(self, event):
+        """
+        窗口关闭时立即写入尚未保存的配置，并保存界面快照供下次启动时立即显示
+        """
+        save_config(self.config)
+        if self.catalog_loaded:
+            save_view_snapshot(self.capture_view_snapshot())
+        super().closeEvent(event)
+
+    def capture_view_snapshot(self):
+        """
+        记录窗口几何、选中的主分组和子分组，以及三个列表当前可见的行
+        """
+        geometry = self.geometry()
+        return {
+            "geometry": [geometry.x(), geometry.y(), geometry.width(), geometry.height()],
+            "main": self.visible_rows(self.main_group_list),
+            "sub": self.visible_rows(self.sub_group_list),
+            "file": self.visible_rows(self.file_list)
+        }
+
+    def visible_rows(self, list_widget):
+        """
+        返回 {"current": 当前行, "first": 第一个可见行, "rows": 可见行的文本}
+        """
+        viewport_rect = list_widget.viewport().rect()
+        first = list_widget.indexAt(viewport_rect.topLeft()).row()
+        first = max(first, 0)
+        rows = []
+        for row in range(first, min(list_widget.count(), first + MAX_SNAPSHOT_ROWS)):
+            item = list_widget.item(row)
+            if not list_widget.visualItemRect(item).intersects(viewport_rect):
+                break
+            rows.append(item.text())
+        return {"current": list_widget.currentRow(), "first": first, "rows": rows}
+
+    def paint_view_snapshot(self, snapshot):
+        """
+        按快照恢复窗口几何并填充可见行
+        """
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtCore import QRect
+        try:
+            x, y, width, height = snapshot["geometry"]
+            self.resize(width, height)
+            # 保存时所在的屏幕已不存在时只恢复大小
+            if QApplication.screenAt(QRect(x, y, width, height).center()) is not None:
+                self.move(x, y)
+            for key, list_widget in (("main", self.main_group_list), ("sub", self.sub_group_list), ("file", self.file_list)):
+                view = snapshot.get(key) or {}
+                list_widget.addItems([str(row) for row in view.get("rows", [])])
+                current = view.get("current", -1) - view.get("first", 0)
+                if 0 <= current < list_widget.count():
+                    list_widget.setCurrentRow(current)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"界面快照格式错误，忽略: {e}")
+            for list_widget in (self.main_group_list, self.sub_group_list, self.file_list):
+                list_widget.clear()
+
+    def on_catalog_loaded(self, data):
+        """
+        目录数据加载完成，用完整数据替换快照中的内容，并恢复快照中的选择和滚动位置
+        """
+        self.data = data
+        self.tag_index.build(self.data)
+        self.duplicate_checker.prune(self.data)
+        self.catalog_loaded = True
+        for list_widget in (self.main_group_list, self.sub_group_list, self.file_list):
+            list_widget.setAttribute(Qt.WA_TransparentForMouseEvents, False)
+        self.load_groups_to_ui()
+        # 在后台预先解析最常用的启动目标的启动方案
+        refresh_launch_plans(get_top_targets(self.config.get('prefetch_top_n', 10)))
+        snapshot = self.view_snapshot or {}
+        self.view_snapshot = None
+        for key, list_widget in (("main", self.main_group_list), ("sub", self.sub_group_list), ("file", self.file_list)):
+            view = snapshot.get(key) or {}
+            current = view.get("current", -1)
+            # 快照之后目录被其他进程修改、当前行已不存在时保持默认选择
+            if isinstance(current, int) and 0 <= current < list_widget.count():
+                list_widget.setCurrentRow(current)
+            first = view.get("first", 0)
+            if isinstance(first, int) and 0 <= first < list_widget.count():
+                list_widget.scrollToItem(list_widget.item(first), QAbstractItemView.PositionAtTop)
+        logger.info("目录数据加载完成，界面已与完整数据同步")
+
+    def poll_catalog_changes(self):
+        """
+        合并其他进程对数据文件的修改，有变化时刷新界面并保留当前选择
+        """
+        if self.draggable or self.resizing or not self.catalog_loaded:
+            return
+        if reload_if_changed(self.data):
+            self.tag_index.build(self.data)
+            self.duplicate_checker.prune(self.data)
+            self.refresh_groups_keep_selection()
+
+    def refresh_groups_keep_selection(self):
+        """
+        重新加载分组列表，并尽量恢复之前选中的主分组和子分组
+        """
+        selected_main_index = self.main_group_list.currentRow()
+        selected_sub_index = self.sub_group_list.currentRow()
+        self.load_groups_to_ui()
+        if 0 <= selected_main_index < self.main_group_list.count():
+            self.main_group_list.setCurrentRow(selected_main_index)
+            if 0 <= selected_sub_index < self.sub_group_list.count():
+                self.sub_group_list.setCurrentRow(selected_sub_index)
+
     def load_groups_to_ui(self):
         """
         将从文件加载的数据显示到 UI 上
@@ -379,13 +630,19 @@ class MainWindow(QMainWindow):
         """
         主分组选择变化时，更新子分组列表和清空文件列表，并记录日志
         """
+        if not self.catalog_loaded:
+            return
         self.sub_group_list.clear()
         self.file_list.clear()
+        self.displayed_files = []
         logger.info(f"主分组切换到索引 {index}，开始更新子分组列表和清空文件列表")
         if index >= 0 and index < len(self.data["mainGroups"]):
             main_group = self.data["mainGroups"][index]
             for sub_group in main_group["subGroups"]:
                 self.sub_group_list.addItem(sub_group["name"])
+            # 保存的标签查询作为虚拟子分组显示在真实子分组之后
+            for saved_query in self.config['saved_tag_queries']:
+                self.sub_group_list.addItem(f"[查询] {saved_query['name']}")
             logger.info(f"主分组索引 {index} 对应的子分组列表更新完成")
             
             # 当存在子分组时，触发子分组变化事件以更新文件列表
@@ -399,13 +656,28 @@ class MainWindow(QMainWindow):
         子分组选择变化时，更新文件列表，并记录日志。
         若成功获取到子分组的文件列表，将文件列表数据打印到日志中。
         """
+        if not self.catalog_loaded:
+            return
         self.file_list.clear()
+        self.displayed_files = []
         selected_main_index = self.main_group_list.currentRow()
         logger.info(f"子分组切换到索引 {index}，主分组索引为 {selected_main_index}，开始更新文件列表")
         if selected_main_index >= 0 and index >= 0:
             main_group = self.data["mainGroups"][selected_main_index]
-            if main_group["subGroups"] and index < len(main_group["subGroups"]):
+            saved_query = self.get_saved_query(selected_main_index, index)
+            if saved_query is not None:
+                try:
+                    matches = self.tag_index.query(saved_query["query"])
+                except TagQueryError as e:
+                    logger.error(f"标签查询 {saved_query['query']} 无效: {e}")
+                    matches = []
+                self.displayed_files = sorted(matches, key=lambda file: file["name"].lower())
+                for file in self.displayed_files:
+                    self.file_list.addItem(file["name"])
+                logger.info(f"标签查询 {saved_query['name']} 匹配 {len(self.displayed_files)} 个文件")
+            elif main_group["subGroups"] and index < len(main_group["subGroups"]):
                 sub_group = main_group["subGroups"][index]
+                self.displayed_files = sub_group["files"]
                 file_list_data = []
                 for file in sub_group["files"]:
                     self.file_list.addItem(file["name"])
@@ -414,6 +686,85 @@ class MainWindow(QMainWindow):
         else:
             logger.info("未选中有效的主分组或子分组，文件列表保持为空")
 
+    def get_saved_query(self, main_index, sub_index):
+        """
+        子分组列表中的行是虚拟子分组时返回对应的保存查询，否则返回 None
+        """
+        if main_index < 0 or main_index >= len(self.data["mainGroups"]):
+            return None
+        query_index = sub_index - len(self.data["mainGroups"][main_index]["subGroups"])
+        if 0 <= query_index < len(self.config['saved_tag_queries']):
+            return self.config['saved_tag_queries'][query_index]
+        return None
+
+    def add_saved_query(self):
+        """
+        添加保存的标签查询，查询语法如 tag:dev AND tag:db NOT tag:legacy
+        """
+        from PyQt5.QtWidgets import QInputDialog, QMessageBox
+        name, ok = QInputDialog.getText(self, "添加标签查询", "请输入查询名称:")
+        if not ok or not name:
+            return
+        query, ok = QInputDialog.getText(self, "添加标签查询", "请输入查询（如 tag:dev AND tag:db NOT tag:legacy）:")
+        if not ok or not query:
+            return
+        try:
+            self.tag_index.query(query)
+        except TagQueryError as e:
+            QMessageBox.warning(self, "错误", f"查询语法错误: {e}")
+            return
+        self.config['saved_tag_queries'] = self.config['saved_tag_queries'] + [{"name": name, "query": query}]
+        self.sub_group_list.addItem(f"[查询] {name}")
+        logger.info(f"成功添加标签查询: {name} = {query}")
+
+    def edit_file_tags(self, file):
+        """
+        编辑文件条目的标签，多个标签用逗号分隔
+        """
+        from PyQt5.QtWidgets import QInputDialog
+        current = ", ".join(file.get("tags") or [])
+        text, ok = QInputDialog.getText(self, "编辑标签", "请输入标签，多个标签用逗号分隔:", text=current)
+        if not ok:
+            return
+        self.tag_index.set_tags(file, text.replace('，', ',').split(','))
+        save_data(self.data)
+        logger.info(f"文件 {file['name']} 的标签已更新为: {file.get('tags')}")
+
+    def remove_file_entry(self, file):
+        """
+        从所属的子分组中删除文件条目，删除可撤销
+        """
+        key = self.file_record_key(file)
+        if key is None:
+            return False
+        self.tag_index.remove(file)
+        return self.undo_history.perform(self.data, f"删除文件 {file['name']}", {"op": "delete", "key": key}) is not None
+
+    def undo_catalog_change(self):
+        """
+        撤销最近一次目录修改，只把受影响的记录写入增量日志
+        """
+        if not self.catalog_loaded:
+            return
+        if self.undo_history.undo(self.data) is not None:
+            self.refresh_after_history_change()
+
+    def redo_catalog_change(self):
+        """
+        重做最近一次撤销的目录修改
+        """
+        if not self.catalog_loaded:
+            return
+        if self.undo_history.redo(self.data) is not None:
+            self.refresh_after_history_change()
+
+    def refresh_after_history_change(self):
+        """
+        撤销或重做后重建标签索引并刷新列表，尽量保留当前选择
+        """
+        self.tag_index.build(self.data)
+        self.refresh_groups_keep_selection()
+
     def show_main_group_context_menu(self, pos):
         """
         显示主分组列表的右键菜单，提供添加主分组和删除主分组的功能
@@ -423,16 +774,42 @@ class MainWindow(QMainWindow):
         menu = QMenu(self)
         add_main_group_action = menu.addAction("添加主分组")
         delete_main_group_action = menu.addAction("删除主分组")
+        import_apps_action = menu.addAction("导入系统应用")
+        health_check_action = menu.addAction("检查失效条目")
+        menu.addSeparator()
+        undo_label, redo_label = self.undo_history.undo_label(), self.undo_history.redo_label()
+        undo_action = menu.addAction(f"撤销 {undo_label}" if undo_label else "撤销")
+        undo_action.setEnabled(undo_label is not None)
+        redo_action = menu.addAction(f"重做 {redo_label}" if redo_label else "重做")
+        redo_action.setEnabled(redo_label is not None)
         action = menu.exec_(self.main_group_list.mapToGlobal(pos))
     
         selected_index = self.main_group_list.currentRow()
         if action == add_main_group_action:
-            add_main_group(self.data, self.main_group_list)
+            new_group = add_main_group(self.data, self.main_group_list)
+            if new_group is not None:
+                self.undo_history.record(f"添加主分组 {new_group['name']}",
+                                         {"op": "delete", "key": ("m", new_group["id"]), "name": new_group["name"]})
+        elif action == undo_action:
+            self.undo_catalog_change()
+        elif action == redo_action:
+            self.redo_catalog_change()
+        elif action == health_check_action:
+            self.run_health_check(manual=True)
+        elif action == import_apps_action:
+            added, updated, removed = import_system_applications(self.data)
+            self.tag_index.build(self.data)
+            self.load_groups_to_ui()
+            QMessageBox.information(self, '导入完成', f'新增 {added} 个，更新 {updated} 个，删除 {removed} 个应用')
         elif action == delete_main_group_action and selected_index >= 0:
             reply = QMessageBox.question(self, '确认删除', '确定要删除这个主分组吗？', QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
             if reply == QMessageBox.Yes:
-                del self.data["mainGroups"][selected_index]
-                save_data(self.data)
+                main_group = self.data["mainGroups"][selected_index]
+                for sub_group in main_group["subGroups"]:
+                    self.tag_index.remove_sub_group(sub_group)
+                # 删除的主分组保存在撤销历史中，只向增量日志写入一条删除记录
+                self.undo_history.perform(self.data, f"删除主分组 {main_group['name']}",
+                                          {"op": "delete", "key": ("m", main_group["id"])})
                 self.main_group_list.takeItem(selected_index)
                 self.sub_group_list.clear()
                 self.file_list.clear()
@@ -451,26 +828,51 @@ class MainWindow(QMainWindow):
         menu = QMenu(self)
         add_sub_group_action = menu.addAction("添加子分组")
         delete_sub_group_action = menu.addAction("删除子分组")
+        launch_all_action = menu.addAction("全部启动")
+        add_query_action = menu.addAction("添加标签查询")
         action = menu.exec_(self.sub_group_list.mapToGlobal(pos))
     
         selected_main_index = self.main_group_list.currentRow()
         selected_sub_index = self.sub_group_list.currentRow()
         if selected_main_index >= 0:
+            saved_query = self.get_saved_query(selected_main_index, selected_sub_index)
             if action == add_sub_group_action:
-                add_sub_group(self.data, self.main_group_list, self.sub_group_list, selected_main_index)
+                # 新子分组插入到虚拟子分组之前，重新加载子分组列表
+                new_sub_group = add_sub_group(self.data, self.main_group_list, self.sub_group_list, selected_main_index)
+                if new_sub_group is not None:
+                    main_group_id = self.data["mainGroups"][selected_main_index]["id"]
+                    self.undo_history.record(f"添加子分组 {new_sub_group['name']}",
+                                             {"op": "delete", "key": ("s", main_group_id, new_sub_group["id"]),
+                                              "name": new_sub_group["name"]})
+                self.on_main_group_changed(selected_main_index)
+            elif action == add_query_action:
+                self.add_saved_query()
+            elif action == launch_all_action and selected_sub_index >= 0:
+                if saved_query is None:
+                    self.launch_all_in_sub_group(selected_main_index, selected_sub_index)
+                else:
+                    self.launch_files(saved_query["name"], self.displayed_files)
+            elif action == delete_sub_group_action and saved_query is not None:
+                reply = QMessageBox.question(self, '确认删除', '确定要删除这个标签查询吗？', QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+                if reply == QMessageBox.Yes:
+                    self.config['saved_tag_queries'] = [q for q in self.config['saved_tag_queries'] if q is not saved_query]
+                    self.on_main_group_changed(selected_main_index)
+                    logger.info(f"已删除标签查询: {saved_query['name']}")
             elif action == delete_sub_group_action and selected_sub_index >= 0:
                 reply = QMessageBox.question(self, '确认删除', '确定要删除这个子分组吗？', QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
                 if reply == QMessageBox.Yes:
                     main_group = self.data["mainGroups"][selected_main_index]
-                    del main_group["subGroups"][selected_sub_index]
-                    save_data(self.data)
+                    sub_group = main_group["subGroups"][selected_sub_index]
+                    self.tag_index.remove_sub_group(sub_group)
+                    self.undo_history.perform(self.data, f"删除子分组 {sub_group['name']}",
+                                              {"op": "delete", "key": ("s", main_group["id"], sub_group["id"])})
                     self.sub_group_list.takeItem(selected_sub_index)
                     self.file_list.clear()
                     logger.info(f"已删除子分组，主分组索引: {selected_main_index}，子分组索引: {selected_sub_index}")
 
-                # 检查是否还有剩余的子分组
-                if len(main_group["subGroups"]) > 0:
-                    self.on_sub_group_changed(0)
+                    # 检查是否还有剩余的子分组
+                    if len(main_group["subGroups"]) > 0:
+                        self.on_sub_group_changed(0)
 
     def show_file_context_menu(self, pos):
         """
@@ -481,6 +883,7 @@ class MainWindow(QMainWindow):
         menu = QMenu(self)
         add_file_action = menu.addAction("添加文件")
         delete_file_action = menu.addAction("删除文件")
+        edit_tags_action = menu.addAction("编辑标签")
         action = menu.exec_(self.file_list.mapToGlobal(pos))
     
         selected_main_index = self.main_group_list.currentRow()
@@ -495,52 +898,209 @@ class MainWindow(QMainWindow):
             return
     
         selected_file_index = self.file_list.currentRow()
+        is_virtual = self.get_saved_query(selected_main_index, selected_sub_index) is not None
         if action == add_file_action:
-            add_files(self.data, self.main_group_list, self.sub_group_list, self.file_list, selected_main_index, selected_sub_index)
+            if is_virtual:
+                QMessageBox.warning(self, "错误", "标签查询中不能直接添加文件，请在子分组中添加")
+                return
+            main_group = self.data["mainGroups"][selected_main_index]
+            sub_group = main_group["subGroups"][selected_sub_index]
+            if self.config.get('content_dedup', False):
+                file_paths, _ = QFileDialog.getOpenFileNames(self, "选择文件")
+                if file_paths:
+                    self.check_content_duplicates(main_group, sub_group, file_paths)
+                return
+            added = add_files(self.data, self.main_group_list, self.sub_group_list, self.file_list, selected_main_index, selected_sub_index)
+            for file in added:
+                self.tag_index.add(file)
+            if added:
+                self.record_added_files(main_group, sub_group, added)
+        elif action == edit_tags_action and 0 <= selected_file_index < len(self.displayed_files):
+            self.edit_file_tags(self.displayed_files[selected_file_index])
+            if is_virtual:
+                self.on_sub_group_changed(selected_sub_index)
         elif action == delete_file_action and selected_file_index >= 0:
             reply = QMessageBox.question(self, '确认删除', '确定要删除这个文件吗？', QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
             if reply == QMessageBox.Yes:
-                main_group = self.data["mainGroups"][selected_main_index]
-                sub_group = main_group["subGroups"][selected_sub_index]
                 file_name = self.file_list.item(selected_file_index).text()
-                for i, file in enumerate(sub_group["files"]):
-                    if file["name"] == file_name:
-                        del sub_group["files"][i]
-                        break
-                save_data(self.data)
+                # 按行号删除，启用内容去重后允许存在同名文件
+                if selected_file_index < len(self.displayed_files):
+                    self.remove_file_entry(self.displayed_files[selected_file_index])
+                    if is_virtual:
+                        del self.displayed_files[selected_file_index]
                 self.file_list.takeItem(selected_file_index)
                 logger.info(f"已删除文件: {file_name}，主分组索引: {selected_main_index}，子分组索引: {selected_sub_index}")
 
-    def file_list_dropEvent(self, event: QDropEvent):
+    def prefetch_top_targets(self):
         """
-        处理文件列表的放下事件，将拖入的文件添加到列表中
+        按启动历史预读最常用的启动目标，使首次启动命中页缓存
+        预读启动方案解析出的程序，多个条目由同一程序打开时只预读一次
         """
-        handle_file_drop(self.data, self.main_group_list, self.sub_group_list, self.file_list, event)
+        top_n = self.config.get('prefetch_top_n', 10)
+        io_budget = self.config.get('prefetch_io_budget_mb', 256) * 1024 * 1024
+        targets = list(dict.fromkeys(get_launch_target(path) for path in get_top_targets(top_n)))
+        logger.info(f"开始预读最常用的 {len(targets)} 个启动目标")
+        start_prefetch(targets, io_budget)
+
+    def on_file_hovered(self, row):
+        """
+        鼠标悬停在文件上时在后台解析它的启动方案，启用预读时同时预读它的启动目标
+        """
+        if 0 <= row < len(self.displayed_files):
+            file_path = self.displayed_files[row]["path"]
+            if file_path != getattr(self, 'last_hover_plan', None):
+                self.last_hover_plan = file_path
+                refresh_launch_plans([file_path])
+        if not self.config.get('prefetch_enabled', False):
+            return
+        if 0 <= row < len(self.displayed_files):
+            file_path = self.displayed_files[row]["path"]
+            # 悬停信号随鼠标移动频繁触发，同一文件只预读一次
+            if file_path == getattr(self, 'last_hover_prefetch', None):
+                return
+            self.last_hover_prefetch = file_path
+            start_prefetch([get_launch_target(file_path)], self.config.get('prefetch_io_budget_mb', 256) * 1024 * 1024)
 
     def open_file(self, index):
         """
         用原生程序打开选中的文件
         """
+        file_name = None
         try:
-            selected_main_index = self.main_group_list.currentRow()
-            selected_sub_index = self.sub_group_list.currentRow()
-            if selected_main_index >= 0 and selected_sub_index >= 0:
-                main_group = self.data["mainGroups"][selected_main_index]
-                if main_group["subGroups"] and selected_sub_index < len(main_group["subGroups"]):
-                    sub_group = main_group["subGroups"][selected_sub_index]
-                    item = self.file_list.item(index.row())
-                    file_name = item.text()
-                    for file in sub_group["files"]:
-                        if file["name"] == file_name:
-                            file_path = file["path"]  # 使用保存的完整路径
-                            os.startfile(file_path)
-                            logger.info(f"用原生程序打开文件: {file_name}")
-                            break
+            # 按行号查找，启用内容去重后允许存在同名文件；标签查询的结果同样按行号对应
+            if 0 <= index.row() < len(self.displayed_files):
+                file = self.displayed_files[index.row()]
+                file_name = file["name"]
+                file_path = file["path"]  # 使用保存的完整路径
+                launch_path(file_path)
+                record_launch(file_path)
+                logger.info(f"用原生程序打开文件: {file_name}")
         except FileNotFoundError:
             logger.error(f"文件 {file_name} 未找到")
         except Exception as e:
             logger.error(f"打开文件 {file_name} 时发生未知错误: {e}")
 
+    def get_frame_interval(self):
+        """
+        根据主屏幕刷新率计算每帧间隔（毫秒），获取失败时按 60Hz 计算
+        """
+        from PyQt5.QtWidgets import QApplication
+        screen = QApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0
+        if refresh_rate <= 0:
+            refresh_rate = 60
+        return max(1, int(1000 / refresh_rate))
+
+    def run_health_check(self, manual=True):
+        """
+        在后台检查所有条目是否仍然有效，manual 为 True 时即使没有问题也提示结果
+        """
+        self.health_check_manual = manual
+        if self.health_checker.start(self.data):
+            logger.info(f"开始{'手动' if manual else '定时'}健康检查")
+
+    def show_status_message(self, message, timeout_ms=10000):
+        """
+        在窗口底部的状态栏中短暂显示提示，不打断当前操作；提示消失后隐藏状态栏
+        """
+        status_bar = self.statusBar()
+        if not getattr(self, 'status_bar_ready', False):
+            status_bar.messageChanged.connect(lambda text: status_bar.setVisible(bool(text)))
+            self.status_bar_ready = True
+        status_bar.showMessage(message, timeout_ms)
+        status_bar.show()
+
+    def on_health_check_finished(self, report):
+        """
+        手动检查时显示健康检查报告，并提供一键修复；
+        定时检查只在发现的问题变化时在状态栏和日志中提示，不弹出对话框
+        """
+        from PyQt5.QtWidgets import QMessageBox
+        problems = report_problems(report)
+        changed = problems != self.health_check_problems
+        self.health_check_problems = problems
+        if not self.health_check_manual:
+            if not changed:
+                return
+            if problems:
+                message = (f"健康检查发现 {len(problems)} 个问题：失效 {len(report['missing'])} 个，"
+                           f"大小变化 {len(report['size_changed'])} 个，无权限 {len(report['permission_denied'])} 个，"
+                           f"可在右键菜单“检查失效条目”中查看并修复")
+                logger.warning(message)
+            else:
+                message = "健康检查：之前发现的问题已全部消失"
+                logger.info(message)
+            self.show_status_message(message)
+            return
+        if not problems:
+            QMessageBox.information(self, '健康检查', f"共检查 {report['total']} 个条目，全部有效")
+            return
+        details = []
+        for kind, label in (("missing", "失效"), ("size_changed", "大小变化"), ("permission_denied", "无权限")):
+            for item in report[kind]:
+                details.append(f"[{label}] {item['main_group']}/{item['sub_group']}/{item['name']}: {item['path']}")
+        msg_box = QMessageBox(self)
+        msg_box.setWindowTitle('健康检查')
+        msg_box.setText(f"共检查 {report['total']} 个条目：失效 {len(report['missing'])} 个，"
+                        f"大小变化 {len(report['size_changed'])} 个，无权限 {len(report['permission_denied'])} 个")
+        msg_box.setDetailedText("\n".join(details))
+        fix_button = msg_box.addButton("一键修复", QMessageBox.AcceptRole)
+        msg_box.addButton(QMessageBox.Close)
+        msg_box.exec_()
+        if msg_box.clickedButton() == fix_button:
+            fix_catalog(self.data, report)
+            for item in report["missing"]:
+                self.tag_index.remove(item["file"])
+            # 修复后只剩无权限的条目
+            self.health_check_problems = frozenset(("permission_denied", item["path"]) for item in report["permission_denied"])
+            self.load_groups_to_ui()
+
+    def launch_all_in_sub_group(self, main_index, sub_index):
+        """
+        批量启动子分组中的所有文件，由调度器限制并发数和启动间隔
+        """
+        sub_group = self.data["mainGroups"][main_index]["subGroups"][sub_index]
+        self.launch_files(sub_group["name"], sub_group["files"])
+
+    def launch_files(self, group_name, files):
+        """
+        批量启动文件，子分组和标签查询的“全部启动”共用
+        启动次数多的文件先启动，次数相同时按给定顺序
+        """
+        if not files:
+            return
+        if getattr(self, 'launch_scheduler', None) is None:
+            self.launch_scheduler = LaunchScheduler(self.config['launch_concurrency'], self.config['launch_stagger_ms'], parent=self)
+            self.launch_scheduler.progress.connect(self.on_launch_progress)
+            self.launch_scheduler.failed.connect(self.on_launch_failed)
+            self.launch_scheduler.finished.connect(self.on_launch_finished)
+            self.launch_failures = []
+        self.launch_scheduler.concurrency = max(1, self.config['launch_concurrency'])
+        self.launch_scheduler.stagger_ms = max(0, self.config['launch_stagger_ms'])
+        for file in files:
+            self.launch_scheduler.submit(file["name"], file["path"], priority=-get_launch_count(file["path"]))
+        logger.info(f"开始批量启动 {group_name} 中的 {len(files)} 个文件")
+        self.launch_scheduler.start()
+
+    def on_launch_progress(self, done, total, name):
+        """
+        批量启动进度更新，显示在窗口标题上
+        """
+        self.setWindowTitle(f"空想 - 启动中 {done}/{total}")
+
+    def on_launch_failed(self, name, error):
+        self.launch_failures.append(f"{name}: {error}")
+
+    def on_launch_finished(self, succeeded, failures):
+        """
+        批量启动结束，恢复窗口标题并报告失败的文件
+        """
+        from PyQt5.QtWidgets import QMessageBox
+        self.setWindowTitle("空想")
+        if self.launch_failures:
+            QMessageBox.warning(self, '批量启动', f"成功 {succeeded} 个，失败 {failures} 个:\n" + "\n".join(self.launch_failures))
+            self.launch_failures = []
+
     def toggle_maximize(self):
         """
         切换窗口最大化状态
@@ -554,29 +1114,36 @@ class MainWindow(QMainWindow):
     def mouseMoveEvent(self, event):
         """
         鼠标移动事件，处理窗口拖动、调整大小、更新鼠标指针样式
+        拖动和调整大小时只记录最新的鼠标位置，由帧定时器按屏幕刷新率合并应用
         参数:
             event: 鼠标事件对象
         """
-        pos = event.pos()
-        logger.debug(f"鼠标移动 - 屏幕坐标: ({event.globalPos().x()}, {event.globalPos().y()}), "
-                    f"窗口坐标: ({pos.x()}, {pos.y()}), "
-                    f"窗口状态: [拖动: {self.draggable}, 调整: {self.resizing}]")
-        
+        if self.draggable or self.resizing:
+            self.pending_mouse_pos = event.globalPos()
+            if not self.frame_timer.isActive():
+                self.frame_timer.start(self.frame_interval)
+            return
+
         # 更新鼠标光标样式
-        self.update_cursor(pos)
-        
+        self.update_cursor(event.pos())
+        super().mouseMoveEvent(event)
+
+    def apply_pending_mouse_move(self):
+        """
+        应用一帧内合并后的拖动或调整大小，每帧最多移动或重设一次窗口几何
+        """
+        if self.pending_mouse_pos is None:
+            return
+        delta = self.pending_mouse_pos - self.mouse_press_pos
+        self.pending_mouse_pos = None
+
         # 处理窗口拖动
         if self.draggable:
-            new_pos = self.pos() + event.globalPos() - self.mouse_press_pos
-            self.move(new_pos)
-            self.mouse_press_pos = event.globalPos()
-            logger.info(f"窗口拖动中 - 新位置: ({new_pos.x()}, {new_pos.y()}), "
-                        f"原始位置: ({self.original_pos.x()}, {self.original_pos.y()})")
+            self.move(self.original_pos + delta)
             return
-            
+
         # 处理窗口调整大小
         if self.resizing:
-            delta = event.globalPos() - self.mouse_press_pos
             new_width = self.original_size.width()
             new_height = self.original_size.height()
             new_x = self.original_pos.x()
@@ -595,13 +1162,6 @@ class MainWindow(QMainWindow):
                 new_height += delta.y()
     
             self.setGeometry(new_x, new_y, new_width, new_height)
-            logger.info(f"窗口调整中 - 方向: {self.resize_direction}, "
-                        f"原始大小: {self.original_size.width()}x{self.original_size.height()}, "
-                        f"新大小: {new_width}x{new_height}, "
-                        f"偏移量: ({delta.x()}, {delta.y()})")
-            return
-        
-        super().mouseMoveEvent(event)
 
     def mousePressEvent(self, event):
         """
@@ -612,9 +1172,10 @@ class MainWindow(QMainWindow):
             self.mouse_press_pos = event.globalPos()
             self.original_size = self.size()
             self.original_pos = self.pos()
-            if self.is_resize_area(event.pos()):
+            direction = self.get_resize_direction(event.pos())
+            if direction is not None:
                 self.resizing = True
-                self.resize_direction = self.get_resize_direction(event.pos())
+                self.resize_direction = direction
                 logger.info(f"开始调整窗口大小，方向: {self.resize_direction}")
             else:
                 self.draggable = True
@@ -627,96 +1188,76 @@ class MainWindow(QMainWindow):
         鼠标释放事件，处理窗口拖动和调整大小
         """
         if event.button() == Qt.LeftButton:
+            # 应用最后一帧尚未处理的位置，保证窗口停在鼠标释放的位置
+            self.frame_timer.stop()
+            self.apply_pending_mouse_move()
             if self.resizing:
                 self.resizing = False
                 self.resize_direction = None
-                logger.info("窗口大小调整结束")
+                logger.info(f"窗口大小调整结束，新大小: {self.width()}x{self.height()}")
             else:
                 self.draggable = False
                 self.offset = None
-                logger.info("窗口拖动结束")
+                logger.info(f"窗口拖动结束，新位置: ({self.x()}, {self.y()})")
         
         # 鼠标释放时强制恢复默认光标样式
+        self.cursor_direction = None
         self.setCursor(Qt.ArrowCursor)
-        logger.info("鼠标释放，强制恢复默认光标样式")
         super().mouseReleaseEvent(event)
+
+    def resizeEvent(self, event):
+        """
+        窗口大小变化时重新计算边缘检测区域
+        """
+        self.update_hit_test_geometry()
+        super().resizeEvent(event)
+
+    def update_hit_test_geometry(self):
+        """
+        计算边缘检测区域，只在窗口几何变化时计算一次，供鼠标事件直接使用
+        """
+        # 动态计算边缘检测区域，基于窗口大小比例
+        self.hit_border = max(10, min(20, int(self.width() * 0.02), int(self.height() * 0.02)))
+        self.hit_width = self.width()
+        self.hit_height = self.height()
     
     def update_cursor(self, pos):
         """
-        更新鼠标光标样式
+        更新鼠标光标样式，方向未变化时不重复设置光标
         参数:
             pos: 鼠标当前位置
         """
-        # 实时更新光标样式，不受拖动/调整状态限制
-        if self.is_resize_area(pos):
-            direction = self.get_resize_direction(pos)
-            cursor_map = {
-                'left': Qt.SizeHorCursor,
-                'right': Qt.SizeHorCursor,
-                'top': Qt.SizeVerCursor,
-                'bottom': Qt.SizeVerCursor,
-                'left_top': Qt.SizeFDiagCursor,
-                'right_bottom': Qt.SizeFDiagCursor,
-                'right_top': Qt.SizeBDiagCursor,
-                'left_bottom': Qt.SizeBDiagCursor
-            }
-            self.setCursor(cursor_map.get(direction, Qt.ArrowCursor))
-            logger.debug(f"光标更新为: {direction}")
+        direction = self.get_resize_direction(pos)
+        if direction == self.cursor_direction:
             return
-            
-        # 默认光标
-        self.setCursor(Qt.ArrowCursor)
+        self.cursor_direction = direction
+        cursor_map = {
+            'left': Qt.SizeHorCursor,
+            'right': Qt.SizeHorCursor,
+            'top': Qt.SizeVerCursor,
+            'bottom': Qt.SizeVerCursor,
+            'left_top': Qt.SizeFDiagCursor,
+            'right_bottom': Qt.SizeFDiagCursor,
+            'right_top': Qt.SizeBDiagCursor,
+            'left_bottom': Qt.SizeBDiagCursor
+        }
+        self.setCursor(cursor_map.get(direction, Qt.ArrowCursor))
 
     def is_resize_area(self, pos):
         """
         检查鼠标是否在可调整大小的区域内
         """
-        # 动态计算边缘检测区域，基于窗口大小比例
-        border = max(10, min(20, int(self.width() * 0.02), int(self.height() * 0.02)))
-        corner_size = border * 1.5  # 对角线区域比边缘稍大
-        
-        rect = self.rect()
-        
-        # 精确边缘检测
-        left_edge = pos.x() <= border
-        right_edge = pos.x() >= rect.width() - border
-        top_edge = pos.y() <= border
-        bottom_edge = pos.y() >= rect.height() - border
-        
-        # 精确对角线检测
-        in_corner = (
-            (left_edge and top_edge) or
-            (left_edge and bottom_edge) or
-            (right_edge and top_edge) or
-            (right_edge and bottom_edge)
-        )
-        
-        # 记录详细检测信息
-        logger.debug(f"边缘检测 - 位置: {pos}, 窗口大小: {rect.width()}x{rect.height()}, "
-                    f"border: {border}, 边缘: L:{left_edge} R:{right_edge} T:{top_edge} B:{bottom_edge}")
-        
-        return left_edge or right_edge or top_edge or bottom_edge
+        return self.get_resize_direction(pos) is not None
 
     def get_resize_direction(self, pos):
         """
-        获取鼠标所在的调整大小方向
+        获取鼠标所在的调整大小方向，不在边缘时返回 None
         """
-        # 动态计算边缘检测区域（与is_resize_area保持一致）
-        border = max(10, min(20, int(self.width() * 0.02), int(self.height() * 0.02)))
-        corner_size = border * 1.5  # 对角线区域比边缘稍大
-        rect = self.rect()
-        
-        # 优化边缘检测逻辑
+        border = self.hit_border
         is_left = pos.x() <= border
-        is_right = pos.x() >= rect.width() - border
+        is_right = pos.x() >= self.hit_width - border
         is_top = pos.y() <= border
-        is_bottom = pos.y() >= rect.height() - border
-        
-        # 添加对角线区域增强检测
-        in_left_corner = pos.x() <= corner_size
-        in_right_corner = pos.x() >= rect.width() - corner_size
-        in_top_corner = pos.y() <= corner_size
-        in_bottom_corner = pos.y() >= rect.height() - corner_size
+        is_bottom = pos.y() >= self.hit_height - border
 
         if is_left and is_top:
             return 'left_top'
@@ -734,6 +1275,261 @@ class MainWindow(QMainWindow):
             return 'top'
         elif is_bottom:
             return 'bottom'
+        return None
+
+    def group_list_dragEnterEvent(self, event: QDragEnterEvent):
+        """
+        分组列表只接受本窗口列表项的拖动，外部拖入的文件仍只能放到文件列表
+        """
+        if event.source() in (self.main_group_list, self.sub_group_list, self.file_list):
+            event.accept()
+        else:
+            event.ignore()
+
+    def main_group_list_dragMoveEvent(self, event):
+        """
+        主分组列表接受主分组的排序和子分组的移动（必须落在某个主分组上）
+        """
+        source = event.source()
+        if source is self.main_group_list:
+            event.accept()
+        elif source is self.sub_group_list and self.main_group_list.indexAt(event.pos()).isValid():
+            event.accept()
+        else:
+            event.ignore()
+
+    def sub_group_list_dragMoveEvent(self, event):
+        """
+        子分组列表接受子分组的排序和文件的移动（必须落在某个真实子分组上）
+        """
+        source = event.source()
+        if source is self.sub_group_list:
+            event.accept()
+        elif source is self.file_list:
+            index = self.sub_group_list.indexAt(event.pos())
+            main_index = self.main_group_list.currentRow()
+            if index.isValid() and self.get_saved_query(main_index, index.row()) is None:
+                event.accept()
+            else:
+                event.ignore()
+        else:
+            event.ignore()
+
+    def finish_internal_drop(self, event):
+        """
+        以复制动作结束列表内部的拖放，避免列表在拖动结束后再删除源项（列表已按数据重新加载）
+        """
+        event.setDropAction(Qt.CopyAction)
+        event.accept()
+
+    def apply_move(self, key, parent, index):
+        """
+        移动记录并以增量方式保存，移动可撤销；返回移动后的记录 ID，记录不存在时返回 None
+        """
+        _, record = find_record(self.data, key)
+        if record is None:
+            return None
+        inverse = self.undo_history.perform(self.data, f"移动 {record['name']}",
+                                            {"op": "move", "key": key, "parent": parent, "index": index})
+        if inverse is None:
+            return None
+        logger.info(f"已移动记录 {key} 到 {list(inverse['key'])}")
+        return inverse["key"][-1]
+
+    def check_content_duplicates(self, main_group, sub_group, file_paths):
+        """
+        在后台线程中按内容检查文件是否与子分组中已有的文件重复（大批量时使用进程池，已缓存的文件只需 stat），
+        检查完成后由 on_duplicates_checked 添加，不阻塞界面
+        """
+        context = (main_group["id"], sub_group["id"], list(file_paths))
+        self.duplicate_checker.check(sub_group["files"], file_paths, context)
+        logger.info(f"开始在后台按内容检查 {len(file_paths)} 个文件是否重复")
+
+    def on_duplicates_checked(self, context, duplicates):
+        """
+        按内容检查完成，把不重复的文件添加到提交检查时的子分组
+        """
+        main_id, sub_id, file_paths = context
+        _, main_group = find_record(self.data, ("m", main_id))
+        _, sub_group = find_record(self.data, ("s", main_id, sub_id))
+        if sub_group is None:
+            logger.warning("按内容检查完成时目标子分组已不存在，放弃添加文件")
+            return
+        self.add_checked_files(main_group, sub_group, file_paths, duplicates)
+
+    def add_checked_files(self, main_group, sub_group, file_paths, content_duplicates=None):
+        """
+        把文件添加到子分组并保存，作为一个操作记入撤销历史
+        content_duplicates 为 None 时按文件名检查重复，否则为按内容检查的结果 {路径: 已存在的同内容文件名}
+        """
+        from PyQt5.QtWidgets import QMessageBox
+        existing_file_names = [file["name"] for file in sub_group["files"]]
+        new_id = max((file["id"] for file in sub_group["files"]), default=0) + 1
+        added_files = []
+        for file_path in file_paths:
+            file_name = os.path.basename(file_path)
+            # 数据验证：检查文件内容或名称是否重复
+            if content_duplicates is not None:
+                if file_path in content_duplicates:
+                    QMessageBox.warning(self, "错误", f"文件 {file_name} 与已存在的文件 {content_duplicates[file_path]} 内容相同，请选择其他文件。")
+                    continue
+            elif file_name in existing_file_names:
+                QMessageBox.warning(self, "错误", f"文件 {file_name} 已存在，请选择其他文件。")
+                continue
+            try:
+                file_size = os.path.getsize(file_path)
+            except FileNotFoundError:
+                logger.error(f"获取文件 {file_name} 大小时出错，文件可能已被移动或删除")
+                continue
+            new_file = make_file_entry(new_id, file_name, file_size, file_path)
+            sub_group["files"].append(new_file)
+            new_id += 1
+            added_files.append(new_file)
+            logger.info(f"添加文件: {file_name}")
+        if not added_files:
+            return
+        try:
+            save_data(self.data)
+            logger.info("数据保存成功")
+        except Exception as e:
+            logger.error(f"保存数据时出错: {e}")
+            QMessageBox.critical(self, "错误", f"保存数据时出错: {e}")
+            # 回滚添加的文件
+            added_ids = {file["id"] for file in added_files}
+            sub_group["files"] = [file for file in sub_group["files"] if file["id"] not in added_ids]
+            logger.info("数据保存失败，已回滚添加的文件")
+            return
+        for file in added_files:
+            self.tag_index.add(file)
+        self.record_added_files(main_group, sub_group, added_files)
+        # 目标子分组仍是当前子分组时刷新文件列表
+        main_index = self.main_group_list.currentRow()
+        sub_index = self.sub_group_list.currentRow()
+        if 0 <= main_index < len(self.data["mainGroups"]) and self.data["mainGroups"][main_index] is main_group \
+                and 0 <= sub_index < len(main_group["subGroups"]) and main_group["subGroups"][sub_index] is sub_group:
+            self.on_sub_group_changed(sub_index)
+        logger.info("成功添加文件到列表，UI 已更新")
+
+    def record_added_files(self, main_group, sub_group, files):
+        """
+        把一次添加的文件作为一个操作记入撤销历史，撤销时一起删除
+        """
+        changes = [{"op": "delete", "key": ("f", main_group["id"], sub_group["id"], file["id"]), "name": file["name"]}
+                   for file in files]
+        label = f"添加文件 {files[0]['name']}" if len(files) == 1 else f"添加 {len(files)} 个文件"
+        self.undo_history.record(label, {"op": "batch", "changes": changes})
+
+    def refresh_after_move(self, main_index, sub_index=None, file_index=None):
+        """
+        移动记录后重新加载列表并选中移动后的位置
+        """
+        self.main_group_list.clear()
+        for main_group in self.data["mainGroups"]:
+            self.main_group_list.addItem(main_group["name"])
+        self.main_group_list.setCurrentRow(main_index)
+        if sub_index is not None:
+            # 重新加载后子分组列表没有当前行，设置当前行会触发 on_sub_group_changed
+            self.sub_group_list.setCurrentRow(sub_index)
+        if file_index is not None:
+            self.file_list.setCurrentRow(file_index)
+
+    def main_group_list_dropEvent(self, event: QDropEvent):
+        """
+        主分组排序，或把子分组移动到放下位置的主分组末尾
+        """
+        source = event.source()
+        main_groups = self.data["mainGroups"]
+        if source is self.main_group_list:
+            row = self.main_group_list.drag_row
+            target = self.main_group_list.drop_row(event.pos())
+            if 0 <= row < len(main_groups):
+                # 插入位置不计被移动的主分组本身
+                if target > row:
+                    target -= 1
+                if target != row:
+                    self.apply_move(("m", main_groups[row]["id"]), (), target)
+                    self.refresh_after_move(target)
+        elif source is self.sub_group_list:
+            main_index = self.main_group_list.currentRow()
+            sub_row = self.sub_group_list.drag_row
+            target_index = self.main_group_list.indexAt(event.pos()).row()
+            if 0 <= main_index < len(main_groups) and 0 <= target_index < len(main_groups) and \
+                    target_index != main_index and sub_row < len(main_groups[main_index]["subGroups"]):
+                sub_group = main_groups[main_index]["subGroups"][sub_row]
+                target_group = main_groups[target_index]
+                self.apply_move(("s", main_groups[main_index]["id"], sub_group["id"]),
+                                (target_group["id"],), len(target_group["subGroups"]))
+                self.refresh_after_move(target_index, target_group["subGroups"].index(sub_group))
+        self.finish_internal_drop(event)
+
+    def sub_group_list_dropEvent(self, event: QDropEvent):
+        """
+        子分组排序，或把文件移动到放下位置的子分组末尾；标签查询不参与排序
+        """
+        source = event.source()
+        main_index = self.main_group_list.currentRow()
+        if not 0 <= main_index < len(self.data["mainGroups"]):
+            event.ignore()
+            return
+        main_group = self.data["mainGroups"][main_index]
+        sub_groups = main_group["subGroups"]
+        if source is self.sub_group_list:
+            row = self.sub_group_list.drag_row
+            # 虚拟子分组始终排在真实子分组之后
+            target = min(self.sub_group_list.drop_row(event.pos()), len(sub_groups))
+            if 0 <= row < len(sub_groups):
+                if target > row:
+                    target -= 1
+                if target != row:
+                    self.apply_move(("s", main_group["id"], sub_groups[row]["id"]), (main_group["id"],), target)
+                    self.refresh_after_move(main_index, target)
+        elif source is self.file_list:
+            sub_index = self.sub_group_list.currentRow()
+            file_row = self.file_list.drag_row
+            target_index = self.sub_group_list.indexAt(event.pos()).row()
+            if 0 <= target_index < len(sub_groups) and target_index != sub_index and \
+                    0 <= file_row < len(self.displayed_files):
+                file = self.displayed_files[file_row]
+                key = self.file_record_key(file)
+                target_group = sub_groups[target_index]
+                if key is not None:
+                    self.apply_move(key, (main_group["id"], target_group["id"]), len(target_group["files"]))
+                    self.refresh_after_move(main_index, target_index, len(target_group["files"]) - 1)
+        self.finish_internal_drop(event)
+
+    def file_list_reorder(self, event: QDropEvent):
+        """
+        文件列表内拖动调整文件顺序；标签查询的结果按名称排列，不支持排序
+        """
+        main_index = self.main_group_list.currentRow()
+        sub_index = self.sub_group_list.currentRow()
+        row = self.file_list.drag_row
+        if self.get_saved_query(main_index, sub_index) is not None or \
+                not 0 <= main_index < len(self.data["mainGroups"]) or \
+                not 0 <= sub_index < len(self.data["mainGroups"][main_index]["subGroups"]):
+            event.ignore()
+            return
+        main_group = self.data["mainGroups"][main_index]
+        sub_group = main_group["subGroups"][sub_index]
+        target = self.file_list.drop_row(event.pos())
+        if 0 <= row < len(sub_group["files"]):
+            if target > row:
+                target -= 1
+            if target != row:
+                self.apply_move(("f", main_group["id"], sub_group["id"], sub_group["files"][row]["id"]),
+                                (main_group["id"], sub_group["id"]), target)
+                self.refresh_after_move(main_index, sub_index, target)
+        self.finish_internal_drop(event)
+
+    def file_record_key(self, file):
+        """
+        返回文件条目的记录键 ("f", 主分组ID, 子分组ID, 文件ID)，标签查询中的文件也能找到所属子分组
+        """
+        for main_group in self.data["mainGroups"]:
+            for sub_group in main_group["subGroups"]:
+                if any(candidate is file for candidate in sub_group["files"]):
+                    return ("f", main_group["id"], sub_group["id"], file["id"])
+        return None
 
     def file_list_dragEnterEvent(self, event: QDragEnterEvent):
         """
@@ -765,7 +1561,9 @@ class MainWindow(QMainWindow):
         """
         处理文件列表的放下事件，将拖入的文件添加到列表中
         """
-        from PyQt5.QtWidgets import QMessageBox
+        if event.source() is self.file_list:
+            self.file_list_reorder(event)
+            return
         selected_main_index = self.main_group_list.currentRow()
         selected_sub_index = self.sub_group_list.currentRow()
         logger.info(f"开始处理文件放下事件，当前主分组索引: {selected_main_index}，子分组索引: {selected_sub_index}")
@@ -773,53 +1571,12 @@ class MainWindow(QMainWindow):
             main_group = self.data["mainGroups"][selected_main_index]
             if main_group["subGroups"] and selected_sub_index < len(main_group["subGroups"]):
                 sub_group = main_group["subGroups"][selected_sub_index]
-                existing_file_names = [file["name"] for file in sub_group["files"]]
-                new_id = 1
-                if sub_group["files"]:
-                    try:
-                        new_id = max(file["id"] for file in sub_group["files"]) + 1
-                    except ValueError:
-                        logger.error("计算新文件 ID 时出错，子分组文件列表可能为空")
-                added_files = False
-                for url in event.mimeData().urls():
-                    file_path = url.toLocalFile()
-                    if os.path.isfile(file_path):
-                        file_name = os.path.basename(file_path)
-                        # 数据验证：检查文件名称是否重复
-                        if file_name in existing_file_names:
-                            QMessageBox.warning(self, "错误", f"文件 {file_name} 已存在，请选择其他文件。")
-                            continue
-                        try:
-                            file_size = os.path.getsize(file_path)
-                        except FileNotFoundError:
-                            logger.error(f"获取文件 {file_name} 大小时出错，文件可能已被移动或删除")
-                            continue
-                        new_file = {
-                            "id": new_id,
-                            "name": file_name,
-                            "size": f"{file_size}B",
-                            "path": file_path
-                        }
-                        sub_group["files"].append(new_file)
-                        new_id += 1
-                        added_files = True
-                        logger.info(f"通过拖动添加文件: {file_name}")
-                        self.file_list.addItem(file_name)  # 确保文件添加到 UI 列表中
-                if added_files:
-                    try:
-                        # 尝试保存数据
-                        save_data(self.data)
-                        logger.info("数据保存成功")
-                        self.on_sub_group_changed(selected_sub_index)
-                        # 添加成功添加的日志
-                        logger.info("成功添加文件到列表，UI 已更新")
-                    except Exception as e:
-                        # 记录保存数据时的错误信息
-                        logger.error(f"保存数据时出错: {e}")
-                        QMessageBox.critical(self, "错误", f"保存数据时出错: {e}")
-                        # 回滚添加的文件
-                        sub_group["files"] = [file for file in sub_group["files"] if file["id"] < new_id - len([url for url in event.mimeData().urls() if os.path.isfile(url.toLocalFile())])]
-                        logger.info("数据保存失败，已回滚添加的文件")
+                dropped_paths = [url.toLocalFile() for url in event.mimeData().urls()]
+                dropped_paths = [file_path for file_path in dropped_paths if os.path.isfile(file_path)]
+                if self.config.get('content_dedup', False):
+                    self.check_content_duplicates(main_group, sub_group, dropped_paths)
+                else:
+                    self.add_checked_files(main_group, sub_group, dropped_paths)
             else:
                 logger.warning("未选中主分组或子分组，无法通过拖动添加文件")
         else:
@@ -1,24 +1,91 @@
 import sys
+import argparse
 from PyQt5.QtWidgets import QApplication, QMainWindow
 from data.system.ui.main_window import MainWindow
 from data.system.log.log import setup_logger
 from data.system.config.config import load_config
+from data.system.tool.profiler import profiling_requested, start_profiling, stop_profiling
+
+def parse_args(argv):
+    """
+    解析命令行参数，未识别的参数留给 Qt 处理
+    """
+    parser = argparse.ArgumentParser(description="空想启动器")
+    parser.add_argument('--stats', choices=['top', 'failures', 'daily'],
+                        help="输出启动日志统计（启动排行、失败率、每日使用情况）后退出")
+    parser.add_argument('--stats-count', type=int, default=10, help="统计报告显示的条目数")
+    parser.add_argument('--stats-days', type=int, default=None, help="只统计最近的天数")
+    parser.add_argument('--profile', action='store_true',
+                        help="运行期间进行性能分析，退出时把 .prof 文件和内存快照写入日志目录（也可设置环境变量 KUUSOO_PROFILE=1）")
+    parser.add_argument('--export', metavar='PATH',
+                        help="把目录导出为 JSON Lines 文件后退出，扩展名为 .gz 时压缩")
+    parser.add_argument('--import', dest='import_path', metavar='PATH',
+                        help="从 JSON Lines 导出文件导入目录后退出，同名分组合并，重复文件跳过")
+    parser.add_argument('--stress', action='store_true',
+                        help="在离屏窗口上用合成目录运行界面压力测试，输出事件耗时的百分位报告后退出")
+    parser.add_argument('--stress-rounds', type=int, default=200, help="压力测试的轮数")
+    parser.add_argument('--stress-files', type=int, default=200, help="压力测试中每个子分组的文件数")
+    parser.add_argument('--stress-budget-ms', type=float, default=None,
+                        help="任一类事件的 p99 耗时超过该值（毫秒）时以非零状态退出")
+    return parser.parse_known_args(argv[1:])
+
+def run_catalog_transfer(args):
+    """
+    执行 --export 或 --import，返回进程退出码；文件无法读写或格式错误时记录日志、输出错误信息并返回 1
+    """
+    from data.system.log.log import logger
+    from data.system.tool.catalog_transfer import export_catalog, import_catalog
+    action = "导出" if args.export else "导入"
+    try:
+        if args.export:
+            print(f"已导出 {export_catalog(args.export)} 条记录到 {args.export}")
+        else:
+            added, skipped = import_catalog(args.import_path, progress=lambda count: print(f"已处理 {count} 条记录"))
+            print(f"导入完成：新增 {added} 个文件，跳过 {skipped} 个重复文件")
+    except (OSError, ValueError) as e:
+        logger.error(f"{action}目录失败: {e}")
+        print(f"{action}失败: {e}", file=sys.stderr)
+        return 1
+    return 0
 
 def main():
     """
     主函数，用于启动应用程序
     """
+    args, qt_args = parse_args(sys.argv)
+    if args.stats:
+        from data.system.tool.log_analytics import format_report
+        print(format_report(args.stats, args.stats_count, args.stats_days))
+        return
+    if args.export or args.import_path:
+        sys.exit(run_catalog_transfer(args))
+    if args.stress:
+        from data.system.tool.ui_stress import run_stress, format_stress_report, check_budget
+        result = run_stress(rounds=args.stress_rounds, files=args.stress_files)
+        print(format_stress_report(result))
+        if args.stress_budget_ms is not None:
+            over_budget = check_budget(result, args.stress_budget_ms)
+            for scenario, p99 in over_budget:
+                print(f"超出预算: {scenario} p99={p99:.2f}ms > {args.stress_budget_ms}ms")
+            sys.exit(1 if over_budget else 0)
+        return
+
     logger = setup_logger()
     logger.info('开始执行主函数')
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
     # 加载配置
     config = load_config()
     logger.info(f"成功加载配置：{config}")
-    
+
     # 创建主窗口并传递配置
     main_window = MainWindow(config=config)
     main_window.show()
-    sys.exit(app.exec_())
+    if args.profile or profiling_requested():
+        start_profiling()
+    exit_code = app.exec_()
+    # 设置窗口中开启的分析在退出时同样写入结果
+    stop_profiling()
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,44 @@
+import json
+import os
+import sys
+import pytest
+
+# 测试从仓库根目录导入 data.system.* 模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.system.tool import data_persistence
+
+@pytest.fixture
+def catalog_dir(tmp_path, monkeypatch):
+    """
+    切换到临时目录并重置数据文件的同步状态，数据文件等相对路径都指向临时目录
+    """
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('data/save')
+    reset_sync_state()
+    yield tmp_path
+    reset_sync_state()
+
+def reset_sync_state():
+    """
+    模拟进程重启：清空内存中的同步状态
+    """
+    data_persistence._sync_state.update(generation=0, stamp=None, baseline={}, journal_offset=0, journal_stamp=None)
+
+def write_catalog(data):
+    with open(data_persistence.DATA_FILE_PATH, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False)
+
+def legacy_catalog(names=("111", "222", "333"), files=3):
+    """
+    旧版本写入的数据文件：没有 rev 和 order 字段
+    """
+    return {"mainGroups": [
+        {"id": index, "name": name, "subGroups": [
+            {"id": 1, "name": f"{name}-1", "files": [
+                {"id": f, "name": f"{name}-{f}.exe", "size": "1B", "path": f"/x/{name}/{f}.exe"}
+                for f in range(1, files + 1)
+            ]}
+        ]}
+        for index, name in enumerate(names, 1)
+    ]}
@@ -0,0 +1,53 @@
+import os
+from data.system.tool.app_importer import import_system_applications, IMPORT_MAIN_GROUP_NAME
+
+def write_desktop(app_dir, name, categories, extra=""):
+    path = app_dir / f"{name}.desktop"
+    previous = os.stat(path).st_mtime_ns if path.exists() else 0
+    path.write_text(f"[Desktop Entry]\nType=Application\nName={name}\nExec={name}\nCategories={categories}\n{extra}")
+    # 保证修改时间变化，增量导入才会重新解析
+    os.utime(path, ns=(previous + 10 ** 9, previous + 10 ** 9))
+
+def imported_layout(data):
+    main_group = next(group for group in data["mainGroups"] if group["name"] == IMPORT_MAIN_GROUP_NAME)
+    return {sub_group["name"]: sorted(file["name"] for file in sub_group["files"])
+            for sub_group in main_group["subGroups"] if sub_group["files"]}
+
+def test_reimport_reconciles_hidden_and_recategorised_entries(catalog_dir, tmp_path):
+    app_dir = tmp_path / "applications"
+    app_dir.mkdir()
+    for name in ("editor", "viewer", "player"):
+        write_desktop(app_dir, name, "Utility;")
+    data = {"mainGroups": []}
+    assert import_system_applications(data, [str(app_dir)]) == (3, 0, 0)
+    assert imported_layout(data) == {"Utility": ["editor", "player", "viewer"]}
+
+    write_desktop(app_dir, "editor", "Development;")
+    write_desktop(app_dir, "viewer", "Utility;", "NoDisplay=true\n")
+    os.remove(app_dir / "player.desktop")
+    assert import_system_applications(data, [str(app_dir)]) == (0, 1, 2)
+    assert imported_layout(data) == {"Development": ["editor"]}
+
+    # 没有变化时不再解析，结果保持不变
+    assert import_system_applications(data, [str(app_dir)]) == (0, 0, 0)
+    assert imported_layout(data) == {"Development": ["editor"]}
+
+def test_reimport_restores_deleted_entries(catalog_dir, tmp_path):
+    app_dir = tmp_path / "applications"
+    app_dir.mkdir()
+    for name in ("editor", "viewer"):
+        write_desktop(app_dir, name, "Utility;")
+    data = {"mainGroups": []}
+    assert import_system_applications(data, [str(app_dir)]) == (2, 0, 0)
+
+    # 删除一个导入的条目后重新导入，未修改的入口文件也会恢复
+    main_group = next(group for group in data["mainGroups"] if group["name"] == IMPORT_MAIN_GROUP_NAME)
+    files = main_group["subGroups"][0]["files"]
+    files.remove(next(file for file in files if file["name"] == "editor"))
+    assert import_system_applications(data, [str(app_dir)]) == (1, 0, 0)
+    assert imported_layout(data) == {"Utility": ["editor", "viewer"]}
+
+    # 删除整个主分组后重新导入，所有条目都恢复
+    data["mainGroups"].remove(main_group)
+    assert import_system_applications(data, [str(app_dir)]) == (2, 0, 0)
+    assert imported_layout(data) == {"Utility": ["editor", "viewer"]}
@@ -0,0 +1,80 @@
+import copy
+from conftest import legacy_catalog
+from data.system.tool.catalog_sync import (fingerprints, merge_external_changes, stamp_local_changes, record_map,
+                                           move_record, apply_move, apply_journal_entry)
+from data.system.tool.order_keys import assign_all_order_keys
+
+def names(records):
+    return [record["name"] for record in records]
+
+def synced_pair(names_=("111", "222")):
+    """
+    返回 (本进程数据, 磁盘数据, 同步时的指纹)，两份数据在第 1 代同步
+    """
+    data = legacy_catalog(names_, files=2)
+    assign_all_order_keys(data)
+    baseline = fingerprints(data)
+    return data, copy.deepcopy(data), baseline
+
+def test_merge_takes_remote_additions_and_renames():
+    data, disk, baseline = synced_pair()
+    disk["mainGroups"][1]["name"] = "222-renamed"
+    disk["mainGroups"].append({"id": 3, "name": "333", "order": "z", "subGroups": [
+        {"id": 1, "name": "333-1", "order": "V", "files": []}]})
+    stamp_local_changes(disk, baseline, 2)
+    assert merge_external_changes(data, disk, baseline, 1) == 3
+    assert names(data["mainGroups"]) == ["111", "222-renamed", "333"]
+    assert names(data["mainGroups"][2]["subGroups"]) == ["333-1"]
+
+def test_merge_keeps_local_edit_over_remote_edit():
+    data, disk, baseline = synced_pair()
+    data["mainGroups"][0]["name"] = "local"
+    disk["mainGroups"][0]["name"] = "remote"
+    stamp_local_changes(disk, baseline, 2)
+    merge_external_changes(data, disk, baseline, 1)
+    assert data["mainGroups"][0]["name"] == "local"
+
+def test_merge_applies_remote_delete_unless_edited_locally():
+    data, disk, baseline = synced_pair()
+    del disk["mainGroups"][0]["subGroups"][0]["files"][0]
+    del disk["mainGroups"][1]["subGroups"][0]["files"][0]
+    data["mainGroups"][1]["subGroups"][0]["files"][0]["name"] = "edited.exe"
+    merge_external_changes(data, disk, baseline, 1)
+    assert [file["id"] for file in data["mainGroups"][0]["subGroups"][0]["files"]] == [2]
+    assert names(data["mainGroups"][1]["subGroups"][0]["files"]) == ["edited.exe", "222-2.exe"]
+
+def test_merge_renumbers_conflicting_local_addition():
+    data, disk, baseline = synced_pair(("111",))
+    data["mainGroups"].append({"id": 2, "name": "local", "subGroups": []})
+    disk["mainGroups"].append({"id": 2, "name": "remote", "order": "z", "subGroups": []})
+    stamp_local_changes(disk, baseline, 2)
+    merge_external_changes(data, disk, baseline, 1)
+    assert {key: record["name"] for key, record in record_map(data).items() if key[0] == "m"} == \
+        {("m", 1): "111", ("m", 2): "remote", ("m", 3): "local"}
+
+def test_move_record_orders_and_renumbers():
+    data = legacy_catalog(("111", "222"), files=3)
+    move, rekeyed = move_record(data, ("f", 1, 1, 3), (1, 1), 0)
+    assert rekeyed and move["to"] == ["f", 1, 1, 3]
+    assert names(data["mainGroups"][0]["subGroups"][0]["files"]) == ["111-3.exe", "111-1.exe", "111-2.exe"]
+    # 目标子分组中已有 ID 1，移动后分配新 ID
+    move, _ = move_record(data, ("f", 1, 1, 1), (2, 1), 1)
+    assert move["to"] == ["f", 2, 1, 4]
+    assert names(data["mainGroups"][1]["subGroups"][0]["files"]) == ["222-1.exe", "111-1.exe", "222-2.exe", "222-3.exe"]
+    assert move_record(data, ("f", 1, 1, 9), (2, 1), 0) == (None, False)
+
+def test_journal_entries_are_idempotent():
+    data = legacy_catalog(("111", "222"), files=2)
+    assign_all_order_keys(data)
+    move, _ = move_record(data, ("m", 2), (), 0)
+    expected = copy.deepcopy(data)
+    assert apply_move(data, move)
+    assert data == expected
+    record = {"id": 5, "name": "new.exe", "size": "1B", "path": "/x/new.exe", "order": "z"}
+    insert = {"op": "insert", "key": ["f", 1, 1, 5], "record": record}
+    assert apply_journal_entry(data, insert)
+    assert not apply_journal_entry(data, insert)
+    delete = {"op": "delete", "key": ["f", 1, 1, 5]}
+    assert apply_journal_entry(data, delete)
+    assert not apply_journal_entry(data, delete)
+    assert data == expected
@@ -0,0 +1,18 @@
+import json
+import pytest
+from data.system.config import config
+from data.system.config.config import Config, DEFAULT_CONFIG
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "LEGACY_CONFIG_PATH", tmp_path / "legacy.json")
+    return tmp_path / "config.json"
+
+@pytest.mark.parametrize("content", ["[1, 2]", "\"text\"", "{broken"])
+def test_invalid_config_file_falls_back_to_defaults(config_path, content):
+    config_path.write_text(content, encoding="utf-8")
+    assert Config(config_path).as_dict() == DEFAULT_CONFIG
+
+def test_valid_config_file_overrides_defaults(config_path):
+    config_path.write_text(json.dumps({"prefetch_top_n": "5"}), encoding="utf-8")
+    assert Config(config_path)["prefetch_top_n"] == 5
@@ -0,0 +1,57 @@
+import os
+from conftest import reset_sync_state, write_catalog, legacy_catalog
+from data.system.tool import data_persistence
+from data.system.tool.data_persistence import load_data, save_data, save_changes, reload_if_changed, JOURNAL_FILE_PATH
+from data.system.tool.catalog_sync import fingerprints, move_record, record_map
+
+def main_names(data):
+    return [group["name"] for group in data["mainGroups"]]
+
+def file_names(data, main_index=0):
+    return [file["name"] for file in data["mainGroups"][main_index]["subGroups"][0]["files"]]
+
+def test_move_journal_replays_against_legacy_catalog(catalog_dir):
+    write_catalog(legacy_catalog())
+    data = load_data()
+    move, rekeyed = move_record(data, ("f", 1, 1, 1), (1, 1), 2)
+    save_changes(data, [move], rekeyed)
+    assert os.path.exists(JOURNAL_FILE_PATH)
+    expected = file_names(data)
+    assert expected == ["111-2.exe", "111-3.exe", "111-1.exe"]
+    reset_sync_state()
+    assert file_names(load_data()) == expected
+
+def test_full_save_folds_journal_into_data_file(catalog_dir):
+    write_catalog(legacy_catalog())
+    data = load_data()
+    move, rekeyed = move_record(data, ("m", 1), (), 2)
+    save_changes(data, [move], rekeyed)
+    save_data(data)
+    assert not os.path.exists(JOURNAL_FILE_PATH)
+    reset_sync_state()
+    assert main_names(load_data()) == ["222", "333", "111"]
+
+def test_other_process_merges_journal_entries(catalog_dir):
+    write_catalog(legacy_catalog())
+    reader = load_data()
+    # 两个进程各有自己的同步状态，这里保存读取进程的状态，写入进程从头加载
+    reader_state = dict(data_persistence._sync_state)
+    reset_sync_state()
+    writer = load_data()
+    move, rekeyed = move_record(writer, ("m", 3), (), 0)
+    save_changes(writer, [move], rekeyed)
+    data_persistence._sync_state.update(reader_state)
+    assert reload_if_changed(reader) == 1
+    assert main_names(reader) == ["333", "111", "222"]
+
+def test_load_does_not_treat_replay_or_order_keys_as_local_edits(catalog_dir):
+    write_catalog(legacy_catalog())
+    data = load_data()
+    move, rekeyed = move_record(data, ("f", 1, 1, 1), (1, 1), 2)
+    save_changes(data, [move], rekeyed)
+    reset_sync_state()
+    # 重新加载时重放增量日志并补全排序键，保存时这些记录不应得到新的版本号
+    data = load_data()
+    assert data_persistence._sync_state["baseline"] == fingerprints(data)
+    save_data(data)
+    assert [key for key, record in record_map(data).items() if record.get("rev")] == []
@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from data.system.tool import file_hash
+from data.system.tool.file_hash import find_content_duplicates, prune_hash_cache, load_hash_cache
+
+@pytest.fixture
+def hash_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_hash, "HASH_CACHE_FILE_PATH", str(tmp_path / "save" / "hash_cache.json"))
+    monkeypatch.setattr(file_hash, "_hash_cache", None)
+    return tmp_path
+
+def write(directory, name, content):
+    path = directory / name
+    path.write_text(content)
+    return str(path)
+
+def test_find_content_duplicates(hash_cache):
+    existing = [{"name": "old.txt", "path": write(hash_cache, "old.txt", "same")}]
+    copy = write(hash_cache, "copy.txt", "same")
+    first = write(hash_cache, "new.txt", "new")
+    second = write(hash_cache, "new2.txt", "new")
+    assert find_content_duplicates(existing, [copy, first, second]) == {copy: "old.txt", second: "new.txt"}
+
+def test_prune_drops_paths_outside_catalog(hash_cache):
+    kept = write(hash_cache, "kept.txt", "a")
+    dropped = write(hash_cache, "dropped.txt", "b")
+    find_content_duplicates([], [kept, dropped])
+    prune_hash_cache({kept})
+    file_hash._hash_cache = None
+    assert list(load_hash_cache()) == [kept]
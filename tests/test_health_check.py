@@ -0,0 +1,28 @@
+import stat
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from data.system.tool.health_check import _readable, check_entries, collect_entries, report_problems
+
+def test_readable_uses_permission_bits():
+    owner = (1000, {1000})
+    assert _readable(SimpleNamespace(st_uid=1000, st_gid=1000, st_mode=stat.S_IRUSR), owner)
+    assert not _readable(SimpleNamespace(st_uid=1000, st_gid=1000, st_mode=stat.S_IROTH), owner)
+    assert _readable(SimpleNamespace(st_uid=0, st_gid=1000, st_mode=stat.S_IRGRP), owner)
+    assert not _readable(SimpleNamespace(st_uid=0, st_gid=0, st_mode=stat.S_IRUSR), owner)
+    assert _readable(SimpleNamespace(st_uid=0, st_gid=0, st_mode=0), (0, {0}))
+    assert _readable(SimpleNamespace(st_uid=0, st_gid=0, st_mode=0), None)
+
+def test_check_entries_reports_missing_and_size_changes(tmp_path):
+    (tmp_path / "ok.txt").write_text("1234")
+    (tmp_path / "grown.txt").write_text("123456")
+    files = [{"id": index, "name": name, "size": "4B", "path": str(tmp_path / name)}
+             for index, name in enumerate(("ok.txt", "grown.txt", "gone.txt"), 1)]
+    data = {"mainGroups": [{"id": 1, "name": "111", "subGroups": [{"id": 1, "name": "111-1", "files": files}]}]}
+    report = check_entries(collect_entries(data))
+    assert report["total"] == 3
+    assert [item["name"] for item in report["missing"]] == ["gone.txt"]
+    assert [(item["name"], item["actual_size"]) for item in report["size_changed"]] == [("grown.txt", 6)]
+    assert report_problems(report) == {("missing", str(tmp_path / "gone.txt")), ("size_changed", str(tmp_path / "grown.txt"))}
@@ -0,0 +1,35 @@
+import os
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from kuusoo import run_catalog_transfer
+
+def test_import_of_missing_file_exits_non_zero(catalog_dir, capsys):
+    assert run_catalog_transfer(SimpleNamespace(export=None, import_path="missing.jsonl")) == 1
+    assert "导入失败" in capsys.readouterr().err
+
+def test_import_of_invalid_file_exits_non_zero(catalog_dir, capsys):
+    with open("broken.jsonl", "w", encoding="utf-8") as file:
+        file.write("not json\n")
+    assert run_catalog_transfer(SimpleNamespace(export=None, import_path="broken.jsonl")) == 1
+    assert "第 1 行" in capsys.readouterr().err
+
+def test_export_then_import_succeeds(catalog_dir):
+    assert run_catalog_transfer(SimpleNamespace(export="catalog.jsonl", import_path=None)) == 0
+    assert run_catalog_transfer(SimpleNamespace(export=None, import_path="catalog.jsonl")) == 0
+
+def test_import_exits_non_zero_when_catalog_cannot_be_written(catalog_dir, capsys):
+    assert run_catalog_transfer(SimpleNamespace(export="catalog.jsonl", import_path=None)) == 0
+    os.makedirs(os.path.join("data", "save", "data.json"))
+    assert run_catalog_transfer(SimpleNamespace(export=None, import_path="catalog.jsonl")) == 1
+    assert "导入失败" in capsys.readouterr().err
+
+def test_import_does_not_overwrite_unreadable_catalog(catalog_dir):
+    assert run_catalog_transfer(SimpleNamespace(export="catalog.jsonl", import_path=None)) == 0
+    with open(os.path.join("data", "save", "data.json"), "w", encoding="utf-8") as file:
+        file.write("{broken")
+    assert run_catalog_transfer(SimpleNamespace(export=None, import_path="catalog.jsonl")) == 1
+    with open(os.path.join("data", "save", "data.json"), encoding="utf-8") as file:
+        assert file.read() == "{broken"
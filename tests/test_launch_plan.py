@@ -0,0 +1,111 @@
+import json
+import os
+import struct
+import pytest
+from data.system.tool import launch_plan
+from data.system.tool.launch_plan import parse_lnk, resolve_launch_plan, plan_is_valid
+
+def lnk_string(text):
+    return struct.pack('<H', len(text)) + text.encode('utf-16-le')
+
+def build_lnk(base_path, cwd=None, arguments=None, relative_path=None):
+    # HasLinkInfo | IsUnicode，其余字符串按需加上对应标志
+    flags = 0x80 | (0x02 if base_path else 0)
+    strings = b''
+    if relative_path:
+        flags |= 0x08
+        strings += lnk_string(relative_path)
+    if cwd:
+        flags |= 0x10
+        strings += lnk_string(cwd)
+    if arguments:
+        flags |= 0x20
+        strings += lnk_string(arguments)
+    header = struct.pack('<I16sI', 0x4C, b'\0' * 16, flags).ljust(0x4C, b'\0')
+    link_info = b''
+    if base_path:
+        base = base_path.encode('latin-1') + b'\0'
+        # LinkInfo 头部 0x1C 字节，只带 ANSI 版本的本地路径，后缀为空串
+        link_info = struct.pack('<7I', 0x1C + len(base) + 1, 0x1C, 0x01, 0, 0x1C, 0, 0x1C + len(base)) + base + b'\0'
+    return header + link_info + strings
+
+def test_parse_lnk_reads_target_arguments_and_cwd(tmp_path):
+    shortcut = tmp_path / "app.lnk"
+    shortcut.write_bytes(build_lnk("C:\\Tools\\app.exe", cwd="C:\\Tools", arguments="--fast"))
+    assert parse_lnk(str(shortcut)) == {"target": "C:\\Tools\\app.exe", "arguments": "--fast", "cwd": "C:\\Tools"}
+
+def test_parse_lnk_falls_back_to_relative_path(tmp_path):
+    shortcut = tmp_path / "app.lnk"
+    shortcut.write_bytes(build_lnk(None, relative_path=os.path.join("bin", "app.exe")))
+    link = parse_lnk(str(shortcut))
+    assert link["target"] == str(tmp_path / "bin" / "app.exe")
+    assert link["arguments"] == "" and link["cwd"] is None
+
+def test_parse_lnk_rejects_other_files(tmp_path):
+    other = tmp_path / "notes.lnk"
+    other.write_bytes(b"not a shortcut")
+    with pytest.raises(ValueError):
+        parse_lnk(str(other))
+
+@pytest.mark.skipif(os.name == 'nt', reason="POSIX 可执行文件")
+def test_executable_without_magic_is_not_exec(tmp_path, monkeypatch):
+    monkeypatch.setattr(launch_plan, "_posix_handler_plan", lambda path: None)
+    document = tmp_path / "report.txt"
+    document.write_text("不是程序")
+    document.chmod(0o755)
+    assert resolve_launch_plan(str(document))["kind"] == "shell"
+    script = tmp_path / "run.sh"
+    script.write_text("#!/bin/sh\necho ok\n")
+    script.chmod(0o755)
+    plan = resolve_launch_plan(str(script))
+    assert plan["kind"] == "script" and plan["argv"] == ["/bin/sh", str(script)]
+
+def test_expired_plan_is_invalid():
+    assert plan_is_valid({"kind": "shell", "stamps": []})
+    assert not plan_is_valid({"kind": "handler", "stamps": [], "expires": 0})
+
+@pytest.fixture
+def plan_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(launch_plan, "LAUNCH_PLAN_FILE_PATH", str(tmp_path / "save" / "launch_plans.json"))
+    monkeypatch.setattr(launch_plan, "_launch_plans", {})
+    return tmp_path
+
+def test_save_prunes_missing_and_least_recently_used(plan_cache, monkeypatch):
+    monkeypatch.setattr(launch_plan, "LAUNCH_PLAN_MAX_ENTRIES", 2)
+    paths = []
+    for name in ("a", "b", "c"):
+        path = plan_cache / name
+        path.write_text(name)
+        paths.append(str(path))
+        launch_plan._store_plan(str(path), resolve_launch_plan(str(path)))
+    launch_plan._store_plan(str(plan_cache / "gone"), {"kind": "shell", "stamps": []})
+    # 使用过的方案移到末尾，不会被丢弃
+    assert launch_plan.get_cached_launch_plan(paths[0]) is not None
+    launch_plan.save_launch_plans()
+    with open(launch_plan.LAUNCH_PLAN_FILE_PATH, encoding='utf-8') as file:
+        assert list(json.load(file)) == [paths[2], paths[0]]
+    assert os.listdir(os.path.dirname(launch_plan.LAUNCH_PLAN_FILE_PATH)) == ["launch_plans.json"]
+
+def test_cache_miss_opens_with_system_and_queues_refresh(plan_cache, monkeypatch):
+    opened, queued = [], []
+    monkeypatch.setattr(launch_plan, "open_with_system", opened.append)
+    monkeypatch.setattr(launch_plan, "refresh_launch_plans", queued.append)
+    monkeypatch.setattr(launch_plan, "resolve_launch_plan", lambda path: pytest.fail("不应在调用线程中解析"))
+    target = str(plan_cache / "file.txt")
+    launch_plan.launch_with_plan(target)
+    assert opened == [target] and queued == [[target]]
+
+def test_launch_target_comes_from_cached_plan(plan_cache):
+    entry = str(plan_cache / "notes.txt")
+    program = str(plan_cache / "editor")
+    for path in (entry, program):
+        with open(path, "w") as file:
+            file.write("x")
+    # 没有缓存的方案时退回条目本身
+    assert launch_plan.get_launch_target(entry) == entry
+    launch_plan._store_plan(entry, {"kind": "handler", "argv": [program, entry], "stamps": [[program, os.stat(program).st_mtime_ns]]})
+    assert launch_plan.get_launch_target(entry) == program
+    launch_plan._store_plan(entry, {"kind": "shortcut", "command": f'"{program}" --fast', "stamps": []})
+    assert launch_plan.get_launch_target(entry) == program
+    launch_plan._store_plan(entry, {"kind": "shell", "stamps": []})
+    assert launch_plan.get_launch_target(entry) == entry
@@ -0,0 +1,27 @@
+import time
+from data.system.tool import launch_prefetch
+from data.system.tool.launch_prefetch import start_prefetch
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_requests_share_one_worker_and_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(launch_prefetch, "_prefetch_state", {"used": 0})
+    monkeypatch.setattr(launch_prefetch, "_warmed_files", {})
+    paths = []
+    for index in range(4):
+        path = tmp_path / f"target{index}.bin"
+        path.write_bytes(b"x" * 100)
+        paths.append(str(path))
+    # 每个悬停请求单独提交，四个请求共享 250 字节的预算
+    for path in paths:
+        start_prefetch([path], 250)
+    assert wait_for(lambda: launch_prefetch._prefetch_state["used"] == 250)
+    worker = launch_prefetch._prefetch_thread
+    assert wait_for(lambda: launch_prefetch._prefetch_queue.empty())
+    start_prefetch([paths[0]], 250)
+    assert launch_prefetch._prefetch_thread is worker
+    assert len(launch_prefetch._warmed_files) == 3
@@ -0,0 +1,34 @@
+import threading
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtCore import Qt
+from data.system.tool.launch_scheduler import LaunchScheduler
+
+def run_batch(scheduler, items):
+    finished = threading.Event()
+    scheduler.finished.connect(lambda succeeded, failures: finished.set(), Qt.DirectConnection)
+    for name, priority in items:
+        scheduler.submit(name, name, priority=priority)
+    scheduler.start()
+    assert finished.wait(5)
+
+def test_lower_priority_value_launches_first():
+    launched = []
+    scheduler = LaunchScheduler(concurrency=1, stagger_ms=0, launcher=launched.append)
+    run_batch(scheduler, [("a", 0), ("b", -3), ("c", -1), ("d", -3)])
+    assert launched == ["b", "d", "c", "a"]
+
+def test_start_while_last_worker_exits_launches_everything():
+    launched = []
+    scheduler = LaunchScheduler(concurrency=1, stagger_ms=0, launcher=launched.append)
+    # 工作线程刚取完队列时再次提交，新条目不能留给正在退出的线程
+    for index in range(300):
+        scheduler.submit(str(index), str(index))
+        scheduler.start()
+    for _ in range(500):
+        if len(launched) == 300 and not scheduler.is_running():
+            break
+        threading.Event().wait(0.01)
+    assert sorted(launched, key=int) == [str(index) for index in range(300)]
@@ -0,0 +1,49 @@
+import random
+import pytest
+from data.system.tool.order_keys import (key_between, keys_between, assign_order_keys, sort_by_order,
+                                         MAX_ORDER_KEY_LENGTH)
+
+def test_key_between_is_strictly_between():
+    rng = random.Random(7)
+    keys = [key_between()]
+    for _ in range(500):
+        position = rng.randint(0, len(keys))
+        before = keys[position - 1] if position > 0 else None
+        after = keys[position] if position < len(keys) else None
+        key = key_between(before, after)
+        assert (before is None or before < key) and (after is None or key < after)
+        keys.insert(position, key)
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+
+def test_key_between_rejects_unordered_bounds():
+    with pytest.raises(ValueError):
+        key_between("V", "F")
+
+def test_keys_between_are_sorted_and_short():
+    keys = keys_between("A", "B", 1000)
+    assert len(keys) == 1000 and keys == sorted(keys) and len(set(keys)) == 1000
+    assert all("A" < key < "B" for key in keys)
+    assert max(len(key) for key in keys) <= 4
+
+def test_assign_order_keys_fills_gaps_deterministically():
+    records = [{"id": 1}, {"id": 2, "order": "F"}, {"id": 3}, {"id": 4}, {"id": 5, "order": "x"}]
+    again = [dict(record) for record in records]
+    assert assign_order_keys(records) == 3
+    assert assign_order_keys(again) == 3
+    assert records == again
+    keys = [record["order"] for record in records]
+    assert keys == sorted(keys) and keys[1] == "F" and keys[4] == "x"
+    assert assign_order_keys(records) == 0
+
+def test_assign_order_keys_repairs_order_and_rebalances():
+    records = [{"id": 1, "order": "V"}, {"id": 2, "order": "F"}]
+    assert assign_order_keys(records) == 1
+    assert records[0]["order"] == "V" and records[1]["order"] > "V"
+    long_keys = [{"id": 1, "order": "V" * (MAX_ORDER_KEY_LENGTH + 1)}, {"id": 2, "order": "W"}]
+    assert assign_order_keys(long_keys, rebalance=True) == 2
+    assert all(len(record["order"]) <= MAX_ORDER_KEY_LENGTH for record in long_keys)
+
+def test_sort_by_order_puts_unkeyed_records_last():
+    records = [{"id": 1}, {"id": 2, "order": "V"}, {"id": 3, "order": "F"}, {"id": 4}]
+    sort_by_order(records)
+    assert [record["id"] for record in records] == [3, 2, 1, 4]
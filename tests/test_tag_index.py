@@ -0,0 +1,48 @@
+import json
+import pytest
+from data.system.tool.file_entry import file_entry_hook, make_file_entry
+from data.system.tool.tag_index import TagIndex, TagQueryError, parse_query
+
+def test_parse_query_precedence_and_implicit_and():
+    assert parse_query("tag:dev tag:db OR NOT tag:legacy") == \
+        ('OR', ('AND', ('TAG', 'dev'), ('TAG', 'db')), ('NOT', ('TAG', 'legacy')))
+    assert parse_query("tag:Dev and (tag:a or tag:b)") == \
+        ('AND', ('TAG', 'dev'), ('OR', ('TAG', 'a'), ('TAG', 'b')))
+
+@pytest.mark.parametrize("query", ["", "tag:a AND", "(tag:a", "tag:a )", "dev", "OR tag:a"])
+def test_parse_query_rejects_invalid(query):
+    with pytest.raises(TagQueryError):
+        parse_query(query)
+
+def entry(file_id, *tags):
+    file = make_file_entry(file_id, f"file{file_id}.exe", 1, f"C:/apps/file{file_id}.exe")
+    file["tags"] = list(tags)
+    return file
+
+def test_incremental_add_and_remove_match_build():
+    files = [entry(1, "dev", "db"), entry(2, "dev"), entry(3, "Legacy")]
+    data = {"mainGroups": [{"id": 1, "name": "m", "subGroups": [{"id": 1, "name": "s", "files": files[:2]}]}]}
+    index = TagIndex()
+    index.build(data)
+    index.add(files[2])
+    assert index.query("tag:dev NOT tag:db") == [files[1]]
+    assert index.query("NOT tag:dev") == [files[2]]
+    index.remove(files[0])
+    assert index.query("tag:db") == []
+    assert index.all_tags() == ["dev", "legacy"]
+    index.set_tags(files[1], ["db ", ""])
+    assert index.query("tag:db") == [files[1]] and index.all_tags() == ["db", "legacy"]
+
+def test_plain_dict_entries_can_be_indexed():
+    # file_entry_hook 无法转换时保留为普通字典，例如大小不是整数或带有未知的键
+    entries = json.loads('[{"id": 1, "name": "a.exe", "size": "x", "path": "C:/a.exe", "tags": ["dev"]},'
+                         ' {"id": 2, "name": "b.exe", "size": 1, "path": "C:/b.exe", "extra": 1}]',
+                         object_hook=file_entry_hook)
+    assert all(type(file) is dict for file in entries)
+    data = {"mainGroups": [{"id": 1, "name": "m", "subGroups": [{"id": 1, "name": "s", "files": entries}]}]}
+    index = TagIndex()
+    index.build(data)
+    assert index.query("tag:dev") == [entries[0]]
+    assert index.query("NOT tag:dev") == [entries[1]]
+    index.remove(entries[0])
+    assert index.query("tag:dev") == []
@@ -0,0 +1,88 @@
+from conftest import reset_sync_state, write_catalog, legacy_catalog
+from data.system.tool.data_persistence import load_data
+from data.system.tool.undo_history import UndoHistory, apply_change, change_weight
+
+def main_names(data):
+    return [group["name"] for group in data["mainGroups"]]
+
+def file_ids(data, main_index=0, sub_index=0):
+    return [file["id"] for file in data["mainGroups"][main_index]["subGroups"][sub_index]["files"]]
+
+def test_delete_undo_reload_keeps_position(catalog_dir):
+    write_catalog(legacy_catalog(("111", "222")))
+    data = load_data()
+    history = UndoHistory()
+    history.perform(data, "删除主分组 222", {"op": "delete", "key": ("m", 2)})
+    assert main_names(data) == ["111"]
+    assert history.undo(data) == "删除主分组 222"
+    assert main_names(data) == ["111", "222"]
+    reset_sync_state()
+    assert main_names(load_data()) == ["111", "222"]
+
+def test_delete_first_undo_reload_keeps_children(catalog_dir):
+    write_catalog(legacy_catalog())
+    data = load_data()
+    history = UndoHistory()
+    history.perform(data, "删除主分组 111", {"op": "delete", "key": ("m", 1)})
+    history.undo(data)
+    reset_sync_state()
+    reloaded = load_data()
+    assert main_names(reloaded) == ["111", "222", "333"]
+    assert [len(group["subGroups"][0]["files"]) for group in reloaded["mainGroups"]] == [3, 3, 3]
+
+def test_redo_after_undo_deletes_again(catalog_dir):
+    write_catalog(legacy_catalog())
+    data = load_data()
+    history = UndoHistory()
+    history.perform(data, "删除文件", {"op": "delete", "key": ("f", 2, 1, 2)})
+    history.undo(data)
+    assert file_ids(data, 1) == [1, 2, 3]
+    assert history.redo(data) == "删除文件"
+    assert file_ids(data, 1) == [1, 3]
+    reset_sync_state()
+    assert file_ids(load_data(), 1) == [1, 3]
+
+def test_move_undo_restores_original_id(catalog_dir):
+    data = legacy_catalog(("111",), files=2)
+    data["mainGroups"][0]["subGroups"].append(
+        {"id": 2, "name": "111-2", "files": [{"id": 1, "name": "other.exe", "size": "1B", "path": "/x/other.exe"}]})
+    write_catalog(data)
+    data = load_data()
+    history = UndoHistory()
+    # 目标子分组中已有 ID 1，移动时重新编号
+    inverse = history.perform(data, "移动", {"op": "move", "key": ("f", 1, 1, 1), "parent": (1, 2), "index": 1})
+    assert inverse["key"] == ("f", 1, 2, 2)
+    history.undo(data)
+    assert file_ids(data, 0, 0) == [1, 2]
+    assert file_ids(data, 0, 1) == [1]
+
+def test_add_undo_checks_name():
+    data = legacy_catalog(("111",))
+    # 记录已被替换为同 ID 的其他记录时不删除
+    assert apply_change(data, {"op": "delete", "key": ("m", 1), "name": "其他"}) is None
+    assert main_names(data) == ["111"]
+
+def test_batch_inverse_reverses_order():
+    data = legacy_catalog(("111",), files=3)
+    changes = [{"op": "delete", "key": ("f", 1, 1, file_id)} for file_id in (1, 3)]
+    inverse, entries, _ = apply_change(data, {"op": "batch", "changes": changes})
+    assert len(entries) == 2
+    assert file_ids(data) == [2]
+    apply_change(data, inverse)
+    assert file_ids(data) == [1, 2, 3]
+
+def test_history_is_bounded(catalog_dir):
+    write_catalog(legacy_catalog(("111", "222", "333"), files=5))
+    data = load_data()
+    # 每个主分组连同子分组和文件共 7 条记录
+    assert change_weight({"op": "insert", "record": data["mainGroups"][0]}) == 7
+    history = UndoHistory(limit=50, max_records=10)
+    history.perform(data, "删除 111", {"op": "delete", "key": ("m", 1)})
+    history.perform(data, "删除文件", {"op": "delete", "key": ("f", 2, 1, 1)})
+    assert [label for label, _, _ in history.undo_stack] == ["删除 111", "删除文件"]
+    history.perform(data, "删除 333", {"op": "delete", "key": ("m", 3)})
+    assert [label for label, _, _ in history.undo_stack] == ["删除文件", "删除 333"]
+    limited = UndoHistory(limit=1)
+    limited.perform(data, "删除文件 2", {"op": "delete", "key": ("f", 2, 1, 2)})
+    limited.perform(data, "删除文件 3", {"op": "delete", "key": ("f", 2, 1, 3)})
+    assert limited.undo_label() == "删除文件 3" and len(limited.undo_stack) == 1